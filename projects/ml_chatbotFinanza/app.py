@@ -1,28 +1,129 @@
 import streamlit as st
+import logging
 import os
-import requests
+import time
+import uuid
+from pathlib import Path
 from dotenv import load_dotenv
 
+from cache_respuestas import CacheRespuestas
+from gateway_llm import ErrorLLM, GatewayLLM
+from historial import GestorHistorial, tokens_mensajes
+
+logger = logging.getLogger("chatbot")
+
 # region Funciones
+@st.cache_resource
+def obtener_gateway():
+    """
+    Un solo gateway para todo el proceso (todas las sesiones de Streamlit):
+    cupo de pedidos simultáneos, reintentos, modelo de respaldo y
+    conexiones keep-alive compartidas (ver gateway_llm.py).
+    """
+    return GatewayLLM(
+        GROQ_BASE_URL,
+        GROQ_API_KEY,
+        GROQ_MODEL,
+        modelo_respaldo=GROQ_MODEL_RESPALDO,
+        max_concurrencia=MAX_CONCURRENCIA,
+        timeout=TIMEOUT,
+    )
+
+
+@st.cache_resource
+def obtener_cache():
+    """Caché de respuestas compartida por todas las sesiones (ver cache_respuestas.py)."""
+    return CacheRespuestas(Path(__file__).parent / "data" / "cache_respuestas.sqlite")
+
+
+def id_sesion():
+    # para que la cola del gateway reparta los turnos entre sesiones
+    if "id_sesion" not in st.session_state:
+        st.session_state.id_sesion = uuid.uuid4().hex
+    return st.session_state.id_sesion
+
+
+def armar_mensajes(prompt_usuario, historial):
+    # historial sin duplicados, con tope de tokens y resumen de lo viejo (ver historial.py)
+    contexto = gestor_historial.contexto(historial, prompt_usuario, st.session_state)
+    mensajes = [prompt_sistema] + contexto + [{"role":"user","content":prompt_usuario}]
+    logger.info("Pedido: %d mensajes, ~%d tokens de entrada", len(mensajes), tokens_mensajes(mensajes))
+    return mensajes
+
+
 def consultar_groq(prompt_usuario, historial):
-    url = "https://api.groq.com/openai/v1/chat/completions"
-    # Mantener solo los últimos 5 mensajes del historial
-    historial_reciente = historial[-5:] if len(historial) > 5 else historial
-
-    headers = {
-        "Authorization": f"Bearer {GROQ_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    data = {
-        "model": "llama-3.1-8b-instant",
-        "messages": [prompt_sistema] + historial_reciente + [{"role":"user","content":prompt_usuario}]
-    }
-
-    response = requests.post(url, headers=headers, json=data)
-    if response.status_code == 200:
-        return response.json()["choices"][0]["message"]["content"]
-    else:
-        return f"Error {response.status_code}: {response.text}"
+    """Respuesta completa en una sola llamada (modo sin streaming). Lanza ErrorLLM."""
+    mensajes = armar_mensajes(prompt_usuario, historial)
+    inicio = time.perf_counter()
+    respuesta = obtener_gateway().completar(mensajes, id_sesion())
+    logger.info("Turno sin streaming: total %.3fs", time.perf_counter() - inicio)
+    return respuesta
+
+
+def consultar_groq_stream(prompt_usuario, historial):
+    """
+    Generador con los fragmentos de la respuesta a medida que llegan
+    (`"stream": true`). Lanza ErrorLLM.
+    """
+    mensajes = armar_mensajes(prompt_usuario, historial)
+    inicio = time.perf_counter()
+    primer_token = None
+    for fragmento in obtener_gateway().stream(mensajes, id_sesion()):
+        if primer_token is None:
+            primer_token = time.perf_counter() - inicio
+        yield fragmento
+    logger.info(
+        "Turno con streaming: primer token %.3fs, total %.3fs",
+        primer_token if primer_token is not None else float("nan"),
+        time.perf_counter() - inicio,
+    )
+
+
+def mostrar_respuesta(placeholder, prompt, historial):
+    """
+    Respuesta de la caché si la pregunta ya se hizo (o una muy parecida);
+    si no, la del modelo, que se guarda para la próxima. Con conversación
+    previa la respuesta depende de ella: no se busca ni se guarda.
+    """
+    cache = obtener_cache() if USAR_CACHE and not historial else None
+    if cache is not None:
+        guardada = cache.buscar(prompt)
+        if guardada is not None:
+            logger.info("Respuesta desde la caché: %s", cache.resumen())
+            return guardada
+
+    inicio = time.perf_counter()
+    respuesta, completa = generar_respuesta(placeholder, prompt, historial)
+    if cache is not None and completa:
+        cache.guardar(prompt, respuesta, time.perf_counter() - inicio)
+    return respuesta
+
+
+def generar_respuesta(placeholder, prompt, historial):
+    """
+    Va escribiendo la respuesta del modelo en el placeholder. Devuelve el
+    texto y si llegó completo (si no, lleva el aviso de error al final).
+    """
+    respuesta = ""
+    try:
+        if not STREAMING:
+            return consultar_groq(prompt, historial), True
+
+        ultima_vez = 0.0
+        for fragmento in consultar_groq_stream(prompt, historial):
+            respuesta += fragmento
+            # como mucho ~20 redibujos por segundo: cada uno viaja al navegador
+            if time.perf_counter() - ultima_vez >= 0.05:
+                placeholder.markdown(
+                    f"<div class='bot-message'><b>Asistente:</b> {respuesta}▌</div>",
+                    unsafe_allow_html=True
+                )
+                ultima_vez = time.perf_counter()
+        return respuesta, True
+    except ErrorLLM as ex:
+        logger.warning("Turno sin respuesta completa: %s", ex)
+        aviso = f"⚠️ {ex}"
+        return (f"{respuesta}\n\n{aviso}" if respuesta else aviso), False
 
 # endregion
 
@@ -54,6 +155,23 @@ st.markdown("""
 #Cargando la clave para conectar con la AI
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+# Para probar contra el mock local: GROQ_BASE_URL=http://127.0.0.1:8001/v1 (ver mock_llm_server.py)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com/openai/v1").rstrip("/")
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+# modelo de respaldo si el principal sigue con 429/5xx tras los reintentos (opcional,
+# p. ej. GROQ_MODEL_RESPALDO=gemma2-9b-it); conviene uno igual de liviano: los grandes
+# tienen límites de uso más bajos y responden más lento. Sin definir no hay respaldo.
+GROQ_MODEL_RESPALDO = os.getenv("GROQ_MODEL_RESPALDO") or None
+# pedidos simultáneos a Groq desde este proceso; el resto espera su turno
+MAX_CONCURRENCIA = int(os.getenv("CHATBOT_MAX_CONCURRENCIA", "4"))
+# CHATBOT_STREAMING=0 vuelve a la respuesta de una sola vez
+STREAMING = os.getenv("CHATBOT_STREAMING", "1") != "0"
+# CHATBOT_CACHE=0 siempre consulta al modelo
+USAR_CACHE = os.getenv("CHATBOT_CACHE", "1") != "0"
+# (conexión, lectura): con streaming la lectura es el tiempo máximo entre fragmentos
+TIMEOUT = (5, 60)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 
 # endregion
 
@@ -72,6 +190,12 @@ prompt_sistema = {
 
 # endregion
 
+# region Historial
+# tope de tokens del historial que acompaña cada pregunta (el prompt de sistema va aparte)
+gestor_historial = GestorHistorial(presupuesto_tokens=1200, turnos_ventana=6)
+
+# endregion
+
 
 # region Cargar Historial
 #st.session_state es para mantener el historial
@@ -96,22 +220,20 @@ for msg in st.session_state.mensajes:
 # region Entrada del usuario
 #:= se llama walrus operator = Guarda el valor que el usuario escribió en prompt, y si no está vacío, ejecuta el bloque
 if prompt := st.chat_input("Escribe tu pregunta sobre Finanzas ..."):
-    #Guardamos el msg del usuario
+    # historial anterior a esta pregunta (la pregunta va aparte en el pedido)
+    historial = list(st.session_state.mensajes)
+    #Guardamos el msg del usuario (una sola vez)
     st.session_state.mensajes.append({"role":"user","content":prompt})
     st.chat_message("user", avatar="🤓").markdown(
         f"<div class='user-message'><b>Tú:</b> {prompt}</div>",
         unsafe_allow_html=True
     )
-    st.session_state.mensajes.append({
-        "role" : "user",
-        "content" : prompt
-    })
-    
+
     with st.chat_message("assistant", avatar="🧙🏻‍♂️"):
         placeholder = st.empty()
         placeholder.markdown("<div class='bot-message'>💭 Estoy pensando...</div>", unsafe_allow_html=True)
 
-        respuesta = consultar_groq(prompt, st.session_state.mensajes)
+        respuesta = mostrar_respuesta(placeholder, prompt, historial)
 
         # Reemplazar el placeholder con la respuesta real
         placeholder.markdown(
@@ -122,4 +244,25 @@ if prompt := st.chat_input("Escribe tu pregunta sobre Finanzas ..."):
     
     st.session_state.mensajes.append({"role":"assistant","content":respuesta})
 
+# endregion
+
+# region Caché
+if USAR_CACHE:
+    resumen_cache = obtener_cache().resumen()
+    st.sidebar.caption(
+        f"Caché: {resumen_cache['tasa_aciertos']:.0%} de aciertos en {resumen_cache['consultas']} consultas, "
+        f"{resumen_cache['segundos_ahorrados']:.0f} s ahorrados"
+    )
+
+# endregion
+
+# region Gateway
+resumen_gateway = obtener_gateway().resumen()
+if "latencia_upstream_s" in resumen_gateway:
+    st.sidebar.caption(
+        f"Groq: p95 {resumen_gateway['latencia_upstream_s']['p95']:.1f} s, "
+        f"espera en cola p95 {resumen_gateway['espera_cola_s']['p95']:.1f} s, "
+        f"{resumen_gateway.get('reintentos', 0)} reintentos, {resumen_gateway.get('respaldos', 0)} respaldos"
+    )
+
 # endregion
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Prueba de carga del chatbot sin navegador ni Groq.
+
+Levanta mock_llm_server.py en este proceso, apunta la app a él
+(GROQ_BASE_URL) y maneja N sesiones a la vez con `AppTest` de Streamlit:
+cada sesión arranca con un historial largo y hace `--turnos` preguntas.
+Cada AppTest es una sesión de Streamlit independiente en el mismo proceso,
+así que comparten el gateway y la caché como en el servidor real.
+
+    python bench_carga.py --sesiones 8 --turnos 3 --historial 40
+    python bench_carga.py --sesiones 16 --latencia 1.0 --retardo-token 0.03 --json base.json
+
+Reporta:
+- latencia del rerun que procesa cada pregunta (p50/p95): todo el script,
+  redibujo del historial incluido
+- tiempo al primer token (p95), tomado del log de la app
+- memoria por sesión (tracemalloc, con el historial ya cargado y después
+  de una sesión de calentamiento)
+- turnos por segundo con todas las sesiones en paralelo
+
+La caché de respuestas se desactiva (CHATBOT_CACHE=0) salvo con `--con-cache`.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+from streamlit.testing.v1 import AppTest
+
+from mock_llm_server import MockLLMServer
+
+APP = Path(__file__).parent / "app.py"
+
+
+def historial_largo(turnos):
+    mensajes = []
+    for i in range(turnos):
+        mensajes.append({"role": "user", "content": f"Pregunta {i}: ¿cómo armo un presupuesto para el mes {i}?"})
+        mensajes.append({"role": "assistant", "content": f"Respuesta {i}. " + "Anota ingresos y gastos fijos. " * 25})
+    return mensajes
+
+
+class CapturaTTFT(logging.Handler):
+    """Junta el tiempo al primer token que la app loguea en cada turno con streaming."""
+
+    def __init__(self):
+        super().__init__()
+        self.valores = []
+        self._lock_valores = threading.Lock()
+
+    def emit(self, record):
+        if record.getMessage().startswith("Turno con streaming") and record.args:
+            with self._lock_valores:
+                self.valores.append(record.args[0])
+
+
+def percentil(valores, q):
+    if not valores:
+        return float("nan")
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(q * len(ordenados)))]
+
+
+def nueva_sesion(historial, timeout):
+    at = AppTest.from_file(str(APP), default_timeout=timeout)
+    at.session_state["mensajes"] = list(historial)
+    at.run()
+    return at
+
+
+def correr_sesion(at, turnos, latencias, errores, indice):
+    for t in range(turnos):
+        inicio = time.perf_counter()
+        at.chat_input[0].set_value(f"Sesión {indice}, pregunta {t}: ¿qué es el interés compuesto?").run()
+        latencias.append(time.perf_counter() - inicio)
+        if at.exception:
+            errores.append(str(at.exception[0].value))
+
+
+def medir_memoria(n, historial, timeout):
+    """Bytes por sesión viva (AppTest + session_state con el historial)."""
+    # una sesión antes de medir: la carga de módulos (streamlit, numpy) y de
+    # los recursos compartidos (gateway, caché) se paga una vez por proceso,
+    # no es de cada sesión
+    nueva_sesion(historial, timeout)
+    tracemalloc.start()
+    antes = tracemalloc.get_traced_memory()[0]
+    sesiones = [nueva_sesion(historial, timeout) for _ in range(n)]
+    despues = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return sesiones, (despues - antes) / n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sesiones", type=int, default=8, help="Sesiones simultáneas")
+    parser.add_argument("--turnos", type=int, default=3, help="Preguntas por sesión")
+    parser.add_argument("--historial", type=int, default=40, help="Turnos previos en cada sesión")
+    parser.add_argument("--latencia", type=float, default=0.5, help="Mock: segundos hasta el primer token")
+    parser.add_argument("--retardo-token", type=float, default=0.02, help="Mock: segundos entre tokens")
+    parser.add_argument("--tokens", type=int, default=80, help="Mock: palabras por respuesta")
+    parser.add_argument("--prob-429", type=float, default=0.0, help="Mock: fracción de pedidos con 429")
+    parser.add_argument("--sin-streaming", action="store_true")
+    parser.add_argument("--con-cache", action="store_true")
+    parser.add_argument("--timeout", type=float, default=120, help="Tope de cada rerun (s)")
+    parser.add_argument("--json", type=Path, default=None, help="Guarda el reporte en este archivo")
+    args = parser.parse_args()
+
+    captura = CapturaTTFT()
+    logger_app = logging.getLogger("chatbot")
+    logger_app.addHandler(captura)
+    # el log de cada turno va solo a la captura, no a la consola
+    logger_app.propagate = False
+
+    with MockLLMServer(
+        latencia=args.latencia,
+        retardo_token=args.retardo_token,
+        tokens=args.tokens,
+        prob_429=args.prob_429,
+        retry_after=0,
+    ) as mock:
+        # la app lee la configuración del entorno en cada rerun
+        os.environ["GROQ_BASE_URL"] = mock.base_url
+        os.environ["GROQ_API_KEY"] = "mock"
+        os.environ["CHATBOT_STREAMING"] = "0" if args.sin_streaming else "1"
+        os.environ["CHATBOT_CACHE"] = "1" if args.con_cache else "0"
+
+        historial = historial_largo(args.historial)
+        sesiones, bytes_por_sesion = medir_memoria(args.sesiones, historial, args.timeout)
+
+        latencias, errores = [], []
+        hilos = [
+            threading.Thread(target=correr_sesion, args=(at, args.turnos, latencias, errores, i))
+            for i, at in enumerate(sesiones)
+        ]
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        total = time.perf_counter() - inicio
+
+        reporte = {
+            "sesiones": args.sesiones,
+            "turnos_por_sesion": args.turnos,
+            "historial": args.historial,
+            "streaming": not args.sin_streaming,
+            "turnos_completados": len(latencias),
+            "errores": len(errores),
+            "rerun_p50_s": percentil(latencias, 0.50),
+            "rerun_p95_s": percentil(latencias, 0.95),
+            "ttft_p95_s": percentil(captura.valores, 0.95),
+            "ttft_mediana_s": statistics.median(captura.valores) if captura.valores else float("nan"),
+            "memoria_por_sesion_kb": bytes_por_sesion / 1024,
+            "turnos_por_segundo": len(latencias) / total if total > 0 else 0.0,
+            "pedidos_al_mock": mock.pedidos,
+        }
+
+    print(f"{args.sesiones} sesiones x {args.turnos} turnos, historial de {args.historial} turnos")
+    print(f"  rerun p50/p95:       {reporte['rerun_p50_s']:.2f} / {reporte['rerun_p95_s']:.2f} s")
+    print(f"  primer token p95:    {reporte['ttft_p95_s']:.2f} s")
+    print(f"  memoria por sesión:  {reporte['memoria_por_sesion_kb']:.0f} KB")
+    print(f"  throughput:          {reporte['turnos_por_segundo']:.2f} turnos/s")
+    print(f"  errores:             {reporte['errores']}")
+    for error in errores[:3]:
+        print(f"    {error}")
+
+    if args.json is not None:
+        args.json.write_text(json.dumps(reporte, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Reporte en {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""
+Caché de respuestas delante de la llamada al modelo.
+
+Muchas preguntas se repiten casi igual ("¿qué es un presupuesto?", "¿cómo
+ahorro?"). `CacheRespuestas.buscar` prueba dos niveles:
+
+1) exacto: la pregunta normalizada (minúsculas, sin tildes ni signos)
+2) semántico: un embedding local por hashing (palabras + trigramas de
+   caracteres, sin modelos ni red) y similitud coseno contra todas las
+   entradas de una vez con NumPy; vale si supera `umbral` y la pregunta
+   guardada tiene la misma `firma`: el mismo interrogativo, las mismas
+   negaciones y los mismos números ("¿qué es el ahorro?" no responde a
+   "¿por qué ahorro?", ni "si gano 1000" a "si gano 5000")
+
+Cada entrada vence a los `ttl` segundos y, si se pasa de `capacidad`, se
+descarta la menos usada recientemente (LRU). Todo se guarda en SQLite, así
+que la caché sobrevive reinicios y la comparten todas las sesiones del
+proceso (la app la crea una vez con st.cache_resource).
+
+Las preguntas sin palabras de contenido ("¿y eso?", "¿por qué?") dependen
+de la conversación: no se buscan ni se guardan (`min_palabras`). Por lo
+mismo, la app solo usa la caché en la primera pregunta de la sesión.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+_PALABRA = re.compile(r"\w+")
+
+# palabras que no aportan al significado de la pregunta
+STOPWORDS = frozenset(
+    "a al como con cual cuales de del el en es esta este eso la las lo los me mi mis "
+    "para por que se si su sus te tu un una uno y o".split()
+)
+
+INTERROGATIVOS = frozenset(
+    "que cual cuales como cuanto cuanta cuantos cuantas cuando donde quien quienes".split()
+)
+NEGACIONES = frozenset("no ni nunca jamas tampoco nada ninguno ninguna".split())
+
+
+def normalizar(texto):
+    texto = unicodedata.normalize("NFKD", texto.lower())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return " ".join(_PALABRA.findall(texto))
+
+
+def palabras_contenido(texto_normalizado):
+    return [p for p in texto_normalizado.split() if p not in STOPWORDS]
+
+
+def firma(texto_normalizado):
+    """
+    Lo que tiene que coincidir exacto para reusar una respuesta: el
+    interrogativo ("por que" y "para que" cuentan como uno), las negaciones
+    y los números. El embedding no los distingue bien.
+    """
+    palabras = texto_normalizado.split()
+    interrogativo = None
+    for i, palabra in enumerate(palabras):
+        if palabra in INTERROGATIVOS:
+            previa = palabras[i - 1] if i > 0 else ""
+            interrogativo = f"{previa} {palabra}" if previa in ("por", "para") else palabra
+            break
+    negaciones = tuple(p for p in palabras if p in NEGACIONES)
+    numeros = tuple(p for p in palabras if p.isdigit())
+    return interrogativo, negaciones, numeros
+
+
+def _hash(rasgo):
+    return int.from_bytes(hashlib.blake2b(rasgo.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def embedding(texto_normalizado, dimension=512):
+    """
+    Vector unitario por "hashing trick": cada palabra y cada trigrama de
+    caracteres suma ±1 en la posición que indica su hash. Los trigramas
+    hacen que "ahorrar" y "ahorro" queden cerca.
+    """
+    vector = np.zeros(dimension, dtype=np.float32)
+    palabras = palabras_contenido(texto_normalizado)
+    rasgos = [f"w:{p}" for p in palabras]
+    for palabra in palabras:
+        relleno = f" {palabra} "
+        rasgos += [f"c:{relleno[i:i + 3]}" for i in range(len(relleno) - 2)]
+    for rasgo in rasgos:
+        h = _hash(rasgo)
+        # el bit alto decide el signo: los choques de hash se compensan
+        vector[h % dimension] += 1.0 if h >> 63 else -1.0
+    norma = np.linalg.norm(vector)
+    return vector / norma if norma > 0 else vector
+
+
+class CacheRespuestas:
+    def __init__(self, ruta, umbral=0.85, ttl=7 * 24 * 3600, capacidad=2000, dimension=512, min_palabras=1):
+        self.ruta = Path(ruta)
+        self.umbral = umbral
+        self.ttl = ttl
+        self.capacidad = capacidad
+        self.dimension = dimension
+        self.min_palabras = min_palabras
+
+        self._lock = threading.Lock()
+        # clave normalizada -> (respuesta, latencia original, creada); orden = uso (LRU)
+        self._entradas = OrderedDict()
+        # fila i de la matriz = embedding de self._claves[i]; self._firmas[i] = su firma
+        self._claves = []
+        self._firmas = []
+        self._matriz = np.zeros((0, dimension), dtype=np.float32)
+
+        self.estadisticas = {
+            "consultas": 0,
+            "aciertos_exactos": 0,
+            "aciertos_semanticos": 0,
+            "segundos_ahorrados": 0.0,
+        }
+
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.ruta, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS respuestas ("
+            " clave TEXT PRIMARY KEY,"
+            " respuesta TEXT NOT NULL,"
+            " latencia REAL NOT NULL,"
+            " creada REAL NOT NULL,"
+            " usada REAL NOT NULL"
+            ")"
+        )
+        self.conn.commit()
+        self._cargar()
+
+    # ---------- disco ----------
+
+    def _cargar(self):
+        vencimiento = time.time() - self.ttl
+        with self.conn:
+            self.conn.execute("DELETE FROM respuestas WHERE creada < ?", (vencimiento,))
+        filas = self.conn.execute(
+            "SELECT clave, respuesta, latencia, creada FROM respuestas ORDER BY usada DESC LIMIT ?",
+            (self.capacidad,),
+        ).fetchall()
+        # de menos a más usada, para que el orden del OrderedDict sea el LRU
+        for clave, respuesta, latencia, creada in reversed(filas):
+            self._entradas[clave] = (respuesta, latencia, creada)
+        self._reconstruir_matriz()
+
+    def _reconstruir_matriz(self):
+        self._claves = list(self._entradas)
+        self._firmas = [firma(c) for c in self._claves]
+        if self._claves:
+            self._matriz = np.stack([embedding(c, self.dimension) for c in self._claves])
+        else:
+            self._matriz = np.zeros((0, self.dimension), dtype=np.float32)
+
+    # ---------- uso ----------
+
+    def _clave_valida(self, pregunta):
+        clave = normalizar(pregunta)
+        if len(palabras_contenido(clave)) < self.min_palabras:
+            return None
+        return clave
+
+    def _quitar(self, clave):
+        i = self._claves.index(clave)
+        del self._entradas[clave]
+        del self._claves[i]
+        del self._firmas[i]
+        self._matriz = np.delete(self._matriz, i, axis=0)
+        with self.conn:
+            self.conn.execute("DELETE FROM respuestas WHERE clave = ?", (clave,))
+
+    def buscar(self, pregunta):
+        """Respuesta guardada para `pregunta` (o una muy parecida), o None."""
+        inicio = time.perf_counter()
+        clave = self._clave_valida(pregunta)
+        if clave is None:
+            return None
+
+        with self._lock:
+            self.estadisticas["consultas"] += 1
+            encontrada, tipo = None, None
+            if clave in self._entradas:
+                encontrada, tipo = clave, "aciertos_exactos"
+            elif self._claves:
+                similitudes = self._matriz @ embedding(clave, self.dimension)
+                # solo compiten las preguntas con la misma firma
+                propia = firma(clave)
+                similitudes[[f != propia for f in self._firmas]] = -1.0
+                mejor = int(np.argmax(similitudes))
+                if similitudes[mejor] >= self.umbral:
+                    encontrada, tipo = self._claves[mejor], "aciertos_semanticos"
+            if encontrada is None:
+                return None
+
+            respuesta, latencia, creada = self._entradas[encontrada]
+            if time.time() - creada > self.ttl:
+                self._quitar(encontrada)
+                return None
+
+            self._entradas.move_to_end(encontrada)
+            with self.conn:
+                self.conn.execute("UPDATE respuestas SET usada = ? WHERE clave = ?", (time.time(), encontrada))
+            self.estadisticas[tipo] += 1
+            self.estadisticas["segundos_ahorrados"] += max(0.0, latencia - (time.perf_counter() - inicio))
+            return respuesta
+
+    def guardar(self, pregunta, respuesta, latencia):
+        """`latencia`: lo que tardó el modelo, para estimar el ahorro de cada acierto."""
+        clave = self._clave_valida(pregunta)
+        if clave is None:
+            return
+        ahora = time.time()
+        with self._lock:
+            if clave in self._entradas:
+                self._quitar(clave)
+            while len(self._entradas) >= self.capacidad:
+                # la menos usada recientemente
+                self._quitar(next(iter(self._entradas)))
+
+            self._entradas[clave] = (respuesta, latencia, ahora)
+            self._claves.append(clave)
+            self._firmas.append(firma(clave))
+            self._matriz = np.vstack([self._matriz, embedding(clave, self.dimension)[None, :]])
+            with self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO respuestas (clave, respuesta, latencia, creada, usada)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (clave, respuesta, latencia, ahora, ahora),
+                )
+
+    def resumen(self):
+        """Tasa de aciertos y segundos ahorrados desde que arrancó el proceso."""
+        with self._lock:
+            e = dict(self.estadisticas)
+            e["entradas"] = len(self._entradas)
+        aciertos = e["aciertos_exactos"] + e["aciertos_semanticos"]
+        e["tasa_aciertos"] = aciertos / e["consultas"] if e["consultas"] else 0.0
+        return e
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,319 @@
+"""
+Gateway único (por proceso) hacia la API de chat de Groq.
+
+Antes cada sesión de Streamlit llamaba a Groq por su cuenta, sin timeout;
+ante un 429 el usuario veía "Error 429: ...". Todas las sesiones pasan
+ahora por un `GatewayLLM` compartido (la app lo crea con st.cache_resource):
+
+- como mucho `max_concurrencia` pedidos en curso; el resto espera en una
+  cola justa (`ColaJusta`: por turnos entre sesiones, en orden de llegada
+  dentro de cada una) hasta `espera_maxima` segundos
+- 429 / 5xx / timeouts / errores de conexión se reintentan con backoff
+  exponencial con jitter, o lo que pida el header Retry-After; durante la
+  espera el pedido suelta su lugar y después vuelve a la cola
+- si el modelo principal sigue fallando, se prueba `modelo_respaldo`
+- en streaming solo se reintenta antes del primer fragmento
+- contadores y tiempos de espera en cola y de latencia de Groq (`resumen`)
+
+Los errores (incluida una respuesta mal formada o cualquier otra falla de
+requests) llegan al llamador como `ErrorLLM` con un mensaje para el usuario.
+"""
+import email.utils
+import json
+import logging
+import random
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger("chatbot.gateway")
+
+ESTADOS_REINTENTABLES = (429, 500, 502, 503, 504)
+
+
+class ErrorLLM(Exception):
+    """Falla que no se pudo resolver con reintentos ni con el modelo de respaldo."""
+
+
+def parse_retry_after(valor):
+    """Segundos de un Retry-After (número o fecha HTTP), o None."""
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        fecha = email.utils.parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, fecha.timestamp() - time.time())
+
+
+def leer_sse(response):
+    """Fragmentos de texto de una respuesta con `"stream": true` (eventos `data: {...}`)."""
+    # se lee hasta el final (no se corta en [DONE]) para que la conexión
+    # vuelva al pool y se reutilice
+    for linea in response.iter_lines():
+        # bytes: text/event-stream sin charset se decodificaría como latin-1
+        linea = linea.decode("utf-8")
+        if not linea.startswith("data:"):
+            continue
+        datos = linea[len("data:"):].strip()
+        if datos == "[DONE]":
+            continue
+        try:
+            evento = json.loads(datos)
+            # un evento sin choices (p. ej. solo con el uso de tokens) no trae texto
+            fragmento = evento["choices"][0]["delta"].get("content") if evento.get("choices") else None
+        except (ValueError, LookupError, TypeError, AttributeError) as ex:
+            raise ErrorLLM("El servicio devolvió una respuesta inválida. Intenta de nuevo.") from ex
+        if fragmento:
+            yield fragmento
+
+
+class ColaJusta:
+    """
+    Semáforo con `cupos` lugares que atiende por turnos entre sesiones:
+    una sesión con varios pedidos en espera no deja atrás a las demás.
+    """
+
+    def __init__(self, cupos):
+        self.cupos = cupos
+        self._libres = cupos
+        self._cond = threading.Condition()
+        # sesión -> pedidos esperando; el orden del dict es el turno
+        self._esperando = OrderedDict()
+
+    def _es_el_turno(self, ticket):
+        if self._libres <= 0 or not self._esperando:
+            return False
+        primera = next(iter(self._esperando.values()))
+        return primera[0] is ticket
+
+    def _sacar(self, sesion, ticket):
+        pedidos = self._esperando[sesion]
+        pedidos.remove(ticket)
+        if pedidos:
+            # la sesión vuelve al final de la ronda
+            self._esperando.move_to_end(sesion)
+        else:
+            del self._esperando[sesion]
+
+    def entrar(self, sesion, timeout):
+        """True si consiguió lugar antes de `timeout` segundos."""
+        ticket = object()
+        limite = time.monotonic() + timeout
+        with self._cond:
+            self._esperando.setdefault(sesion, deque()).append(ticket)
+            while not self._es_el_turno(ticket):
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._sacar(sesion, ticket)
+                    # puede que ahora le toque a otro
+                    self._cond.notify_all()
+                    return False
+                self._cond.wait(restante)
+            self._sacar(sesion, ticket)
+            self._libres -= 1
+            return True
+
+    def salir(self):
+        with self._cond:
+            self._libres += 1
+            self._cond.notify_all()
+
+    @property
+    def en_espera(self):
+        with self._cond:
+            return sum(len(p) for p in self._esperando.values())
+
+
+class MetricasGateway:
+    """Contadores y últimas `ventana` muestras de cada tiempo (para p50/p95)."""
+
+    def __init__(self, ventana=1000):
+        self._lock = threading.Lock()
+        self.contadores = Counter()
+        self._muestras = {}
+        self._ventana = ventana
+
+    def incr(self, nombre, n=1):
+        with self._lock:
+            self.contadores[nombre] += n
+
+    def observar(self, nombre, segundos):
+        with self._lock:
+            self._muestras.setdefault(nombre, deque(maxlen=self._ventana)).append(segundos)
+
+    def resumen(self):
+        with self._lock:
+            resumen = dict(self.contadores)
+            for nombre, muestras in self._muestras.items():
+                ordenadas = sorted(muestras)
+                resumen[nombre] = {
+                    "n": len(ordenadas),
+                    "p50": ordenadas[len(ordenadas) // 2],
+                    "p95": ordenadas[min(len(ordenadas) - 1, int(0.95 * len(ordenadas)))],
+                    "max": ordenadas[-1],
+                }
+        return resumen
+
+
+class GatewayLLM:
+    def __init__(
+        self,
+        base_url,
+        api_key,
+        modelo,
+        modelo_respaldo=None,
+        max_concurrencia=4,
+        espera_maxima=30.0,
+        timeout=(5, 60),
+        max_reintentos=2,
+        backoff_base=0.5,
+        backoff_maximo=20.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key
+        self.modelo = modelo
+        self.modelo_respaldo = modelo_respaldo
+        self.espera_maxima = espera_maxima
+        # (conexión, lectura): con streaming la lectura es el tiempo máximo entre fragmentos
+        self.timeout = timeout
+        self.max_reintentos = max_reintentos
+        self.backoff_base = backoff_base
+        # un Retry-After más largo que esto pasa directo al modelo de respaldo
+        self.backoff_maximo = backoff_maximo
+
+        self.cola = ColaJusta(max_concurrencia)
+        self.metricas = MetricasGateway()
+
+        # conexiones keep-alive compartidas por todos los pedidos
+        self.sesion = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrencia)
+        self.sesion.mount("https://", adaptador)
+        self.sesion.mount("http://", adaptador)
+
+    # ---------- cupos ----------
+
+    def _entrar(self, sesion):
+        inicio = time.perf_counter()
+        if not self.cola.entrar(sesion, self.espera_maxima):
+            self.metricas.incr("rechazados_cola")
+            raise ErrorLLM("Hay muchas consultas en curso. Intenta de nuevo en unos segundos.")
+        self.metricas.observar("espera_cola_s", time.perf_counter() - inicio)
+
+    # ---------- pedidos con reintentos ----------
+
+    def _backoff(self, intento):
+        # "full jitter": aleatorio entre 0 y base * 2^intento
+        return random.uniform(0, min(self.backoff_maximo, self.backoff_base * 2 ** intento))
+
+    def _abrir(self, mensajes, stream, sesion):
+        """
+        Respuesta 200 (sin leer si es streaming), el modelo que la dio y
+        desde cuándo se mide la latencia. Cada intento toma un lugar de la
+        cola; el que sale bien lo devuelve tomado y el llamador lo suelta
+        con `self.cola.salir()` al terminar de leer.
+        """
+        ultimo_error = None
+        inicio = None
+        modelos = [self.modelo] + ([self.modelo_respaldo] if self.modelo_respaldo else [])
+        for modelo in modelos:
+            if modelo != self.modelo:
+                self.metricas.incr("respaldos")
+                logger.warning("Uso el modelo de respaldo %s (%s)", modelo, ultimo_error)
+
+            for intento in range(self.max_reintentos + 1):
+                self._entrar(sesion)
+                inicio = inicio if inicio is not None else time.perf_counter()
+                tomado = True
+                try:
+                    self.metricas.incr("pedidos_upstream")
+                    try:
+                        response = self.sesion.post(
+                            f"{self.base_url}/chat/completions",
+                            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+                            json={"model": modelo, "messages": mensajes, "stream": stream},
+                            stream=stream,
+                            timeout=self.timeout,
+                        )
+                        if response.status_code != 200:
+                            with response:
+                                texto = response.text
+                    except (requests.Timeout, requests.ConnectionError) as ex:
+                        ultimo_error = type(ex).__name__
+                        espera = self._backoff(intento)
+                    except requests.RequestException as ex:
+                        # URL inválida, demasiadas redirecciones, cuerpo cortado...: reintentar no cambia nada
+                        self.metricas.incr("errores")
+                        logger.warning("%s en %s: %s", type(ex).__name__, modelo, ex)
+                        raise ErrorLLM("No se pudo consultar el servicio. Intenta de nuevo en unos minutos.") from ex
+                    else:
+                        if response.status_code == 200:
+                            tomado = False
+                            return response, modelo, inicio
+                        if response.status_code not in ESTADOS_REINTENTABLES:
+                            # pedido inválido, clave incorrecta...: reintentar no cambia nada
+                            self.metricas.incr("errores")
+                            raise ErrorLLM(f"Error {response.status_code}: {texto}")
+                        ultimo_error = f"HTTP {response.status_code}"
+                        retry_after = parse_retry_after(response.headers.get("retry-after"))
+                        espera = retry_after if retry_after is not None else self._backoff(intento)
+                finally:
+                    # el backoff se espera sin lugar: mientras tanto lo usan otras sesiones
+                    if tomado:
+                        self.cola.salir()
+
+                self.metricas.incr("fallas_" + ultimo_error.replace("HTTP ", "http_"))
+                if espera > self.backoff_maximo:
+                    logger.warning("%s con Retry-After de %.0fs en %s, no espero", ultimo_error, espera, modelo)
+                    break
+                if intento < self.max_reintentos:
+                    self.metricas.incr("reintentos")
+                    logger.info("%s en %s, reintento %d/%d en %.1fs", ultimo_error, modelo, intento + 1, self.max_reintentos, espera)
+                    time.sleep(espera)
+
+        self.metricas.incr("errores")
+        raise ErrorLLM(f"El servicio no está disponible ahora ({ultimo_error}). Intenta de nuevo en unos minutos.")
+
+    def completar(self, mensajes, sesion="default"):
+        """Respuesta completa en una sola llamada."""
+        response, _, inicio = self._abrir(mensajes, False, sesion)
+        try:
+            with response:
+                contenido = response.json()["choices"][0]["message"]["content"]
+        except (ValueError, LookupError, TypeError) as ex:
+            self.metricas.incr("respuestas_invalidas")
+            raise ErrorLLM("El servicio devolvió una respuesta inválida. Intenta de nuevo.") from ex
+        finally:
+            self.cola.salir()
+        self.metricas.observar("latencia_upstream_s", time.perf_counter() - inicio)
+        return contenido
+
+    def stream(self, mensajes, sesion="default"):
+        """Generador con los fragmentos de la respuesta; el cupo se libera al terminar o cerrarlo."""
+        response, _, inicio = self._abrir(mensajes, True, sesion)
+        try:
+            with response:
+                try:
+                    yield from leer_sse(response)
+                except requests.RequestException as ex:
+                    # ya se mostró parte de la respuesta: no se puede reintentar
+                    self.metricas.incr("cortes_stream")
+                    raise ErrorLLM("Se cortó la respuesta. Intenta de nuevo.") from ex
+                except ErrorLLM:
+                    self.metricas.incr("respuestas_invalidas")
+                    raise
+        finally:
+            self.cola.salir()
+        self.metricas.observar("latencia_upstream_s", time.perf_counter() - inicio)
+
+    def resumen(self):
+        resumen = self.metricas.resumen()
+        resumen["en_cola"] = self.cola.en_espera
+        return resumen
@@ -0,0 +1,211 @@
+"""
+Historial que se manda al modelo en cada turno, con un tope de tokens.
+
+Antes se mandaban los últimos 5 mensajes tal cual: el corte caía en
+cualquier lado (a veces a mitad de un turno) y lo anterior se perdía.
+`GestorHistorial.contexto` arma los mensajes así:
+
+- saca los mensajes repetidos seguidos (mismo rol y texto)
+- agrupa en turnos (pregunta del usuario + respuesta del asistente)
+- los turnos que salen de la ventana reciente se pliegan en un resumen
+  corto que se guarda en la sesión y se va actualizando (no se recalcula
+  en cada turno ni llama al modelo)
+- de la ventana entran los últimos turnos (el más nuevo recortado si solo
+  él ya se pasa del presupuesto) y, del resto, los más parecidos a la
+  pregunta actual mientras alcance
+- los turnos de la ventana que no entran suman una línea al resumen de
+  ese turno (no se guarda: en la próxima pregunta pueden volver a entrar)
+
+Los tokens se cuentan con tiktoken si está instalado; si no, con una
+estimación local por palabras.
+"""
+import re
+
+try:
+    import tiktoken
+    _ENCODER = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    # no instalado, o sin el archivo del encoding (se descarga la primera vez)
+    _ENCODER = None
+
+_PIEZAS = re.compile(r"\w+|[^\w\s]")
+_PALABRAS = re.compile(r"\w{4,}")
+_FIN_ORACION = re.compile(r"[.!?](\s|$)")
+
+# rol y separadores que agrega el formato de chat a cada mensaje
+TOKENS_POR_MENSAJE = 4
+
+
+def estimar_tokens(texto):
+    if _ENCODER is not None:
+        return len(_ENCODER.encode(texto))
+    # en español una palabra son ~1.3 tokens; cada signo, uno
+    return int(sum(1.3 if pieza[0].isalnum() else 1 for pieza in _PIEZAS.findall(texto))) + 1
+
+
+def tokens_mensajes(mensajes):
+    return sum(estimar_tokens(msg["content"]) + TOKENS_POR_MENSAJE for msg in mensajes)
+
+
+def quitar_duplicados(mensajes):
+    limpios = []
+    for msg in mensajes:
+        if limpios and limpios[-1]["role"] == msg["role"] and limpios[-1]["content"] == msg["content"]:
+            continue
+        limpios.append(msg)
+    return limpios
+
+
+def agrupar_turnos(mensajes):
+    """Lista de turnos; cada turno empieza con un mensaje del usuario."""
+    turnos = []
+    for msg in mensajes:
+        if msg["role"] == "user" or not turnos:
+            turnos.append([msg])
+        else:
+            turnos[-1].append(msg)
+    return turnos
+
+
+def primera_oracion(texto, max_caracteres=160):
+    texto = " ".join(texto.split())
+    fin = _FIN_ORACION.search(texto)
+    oracion = texto[:fin.end()].strip() if fin else texto
+    if len(oracion) > max_caracteres:
+        oracion = oracion[:max_caracteres].rstrip() + "…"
+    return oracion
+
+
+def resumir_turno(turno):
+    partes = []
+    for msg in turno:
+        quien = "Usuario" if msg["role"] == "user" else "Asistente"
+        partes.append(f"{quien}: {primera_oracion(msg['content'])}")
+    return "- " + " / ".join(partes)
+
+
+def recortar_texto(texto, max_tokens):
+    """Las primeras palabras de `texto` que entran en `max_tokens` (con "…" si se cortó)."""
+    if estimar_tokens(texto) <= max_tokens:
+        return texto
+    palabras = texto.split()
+    desde, hasta = 0, len(palabras)
+    while desde < hasta:
+        medio = (desde + hasta + 1) // 2
+        if estimar_tokens(" ".join(palabras[:medio]) + "…") <= max_tokens:
+            desde = medio
+        else:
+            hasta = medio - 1
+    return " ".join(palabras[:desde]) + "…"
+
+
+def recortar_turno(turno, max_tokens):
+    """El turno con su mensaje más largo recortado para entrar en `max_tokens`; None si ni así entra."""
+    largo = max(range(len(turno)), key=lambda i: len(turno[i]["content"]))
+    disponible = max_tokens - tokens_mensajes(turno[:largo] + turno[largo + 1:]) - TOKENS_POR_MENSAJE
+    if disponible < 2:
+        return None
+    recortado = dict(turno[largo], content=recortar_texto(turno[largo]["content"], disponible))
+    return turno[:largo] + [recortado] + turno[largo + 1:]
+
+
+def mensaje_resumen(lineas):
+    return {"role": "system", "content": "Resumen de la conversación anterior:\n" + "\n".join(lineas)}
+
+
+def palabras_clave(texto):
+    return {p.lower() for p in _PALABRAS.findall(texto)}
+
+
+class GestorHistorial:
+    """
+    `estado` es donde se guarda el resumen entre turnos (en la app,
+    st.session_state; cualquier dict sirve para pruebas).
+    """
+
+    def __init__(self, presupuesto_tokens=1200, turnos_ventana=6, turnos_minimos=2, presupuesto_resumen=300):
+        # tokens para historial + resumen (sin contar el prompt de sistema ni la pregunta)
+        self.presupuesto_tokens = presupuesto_tokens
+        self.turnos_ventana = turnos_ventana
+        self.turnos_minimos = turnos_minimos
+        self.presupuesto_resumen = presupuesto_resumen
+
+    def _plegar(self, turnos, estado):
+        """Agrega al resumen los turnos que salieron de la ventana desde la última vez."""
+        if "resumen_lineas" not in estado or estado["resumen_turnos"] > len(turnos):
+            # sesión nueva (o se borró el chat)
+            estado["resumen_lineas"] = []
+            estado["resumen_turnos"] = 0
+
+        hasta = max(0, len(turnos) - self.turnos_ventana)
+        if hasta <= estado["resumen_turnos"]:
+            return
+        lineas = estado["resumen_lineas"] + [resumir_turno(t) for t in turnos[estado["resumen_turnos"]:hasta]]
+        # resumen rodante: si no entra, se van las líneas más viejas
+        while len(lineas) > 1 and estimar_tokens("\n".join(lineas)) > self.presupuesto_resumen:
+            lineas.pop(0)
+        estado["resumen_lineas"] = lineas
+        estado["resumen_turnos"] = hasta
+
+    def _elegir(self, ventana, prompt_usuario, presupuesto):
+        """
+        (turnos que entran, turnos que quedan afuera). Primero los últimos,
+        mientras alcance; después, cada turno que queda afuera ocupa una
+        línea del resumen y, con lo que sobra, entran los más relevantes en
+        lugar de su línea.
+        """
+        lineas = [estimar_tokens(resumir_turno(t)) + 1 for t in ventana]
+        restante = presupuesto
+        elegidos = {}
+
+        # los últimos, del más nuevo al más viejo; el más nuevo se recorta si
+        # no entra, dejando lugar (si se puede) para el resumen de los demás
+        primero_fijo = max(0, len(ventana) - self.turnos_minimos)
+        for i in reversed(range(primero_fijo, len(ventana))):
+            turno = ventana[i]
+            if tokens_mensajes(turno) > restante:
+                if elegidos:
+                    break
+                turno = recortar_turno(turno, restante - sum(lineas[:i])) or recortar_turno(turno, restante)
+                if turno is None:
+                    break
+            elegidos[i] = turno
+            restante -= tokens_mensajes(turno)
+
+        restante -= sum(lineas[i] for i in range(len(ventana)) if i not in elegidos)
+
+        clave = palabras_clave(prompt_usuario)
+        puntajes = []
+        for i in range(primero_fijo):
+            texto = " ".join(msg["content"] for msg in ventana[i])
+            coincidencias = len(clave & palabras_clave(texto)) / (len(clave) or 1)
+            # a igual relevancia, gana el más nuevo
+            puntajes.append((coincidencias + 0.1 * (i + 1) / primero_fijo, i))
+
+        for _, i in sorted(puntajes, reverse=True):
+            costo = tokens_mensajes(ventana[i]) - lineas[i]
+            if costo <= restante:
+                elegidos[i] = ventana[i]
+                restante -= costo
+        return (
+            [elegidos[i] for i in sorted(elegidos)],
+            [t for i, t in enumerate(ventana) if i not in elegidos],
+        )
+
+    def contexto(self, mensajes, prompt_usuario, estado):
+        """Mensajes a mandar entre el prompt de sistema y la pregunta actual."""
+        turnos = agrupar_turnos(quitar_duplicados(mensajes))
+        self._plegar(turnos, estado)
+
+        lineas = estado["resumen_lineas"]
+        ventana = turnos[estado["resumen_turnos"]:]
+        # el encabezado del resumen se reserva siempre: puede hacer falta para los turnos que no entren
+        presupuesto = self.presupuesto_tokens - tokens_mensajes([mensaje_resumen(lineas)])
+        elegidos, afuera = self._elegir(ventana, prompt_usuario, presupuesto)
+        lineas = lineas + [resumir_turno(t) for t in afuera]
+
+        historial = [msg for turno in elegidos for msg in turno]
+        # si la estimación por líneas se quedó corta, se van las más viejas
+        while lineas and tokens_mensajes([mensaje_resumen(lineas)] + historial) > self.presupuesto_tokens:
+            lineas = lineas[1:]
+        return ([mensaje_resumen(lineas)] if lineas else []) + historial
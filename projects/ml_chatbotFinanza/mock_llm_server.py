@@ -0,0 +1,227 @@
+"""
+Servidor local compatible con la API de chat de OpenAI/Groq, para probar el
+chatbot sin gastar llamadas reales.
+
+    python mock_llm_server.py --port 8001 --latencia 0.5 --retardo-token 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8001/v1 streamlit run app.py
+
+Atiende POST /v1/chat/completions con y sin `"stream": true` (SSE, igual que
+Groq: líneas `data: {...}` y `data: [DONE]`). La respuesta es un texto fijo
+de `--tokens` palabras que repite la última pregunta del usuario. Con
+`--prob-429` una fracción de los pedidos responde 429 con Retry-After, para
+probar los reintentos y el modelo de respaldo de gateway_llm.py. Desde las
+pruebas, `fallas` fija el estado de los próximos pedidos (p. ej. [429, 503]);
+con `sse_invalido` el stream manda un evento mal formado después del primero.
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RELLENO = (
+    "Un presupuesto ayuda a ordenar tus ingresos y gastos para que puedas ahorrar "
+    "una parte cada mes y cubrir imprevistos sin endeudarte."
+).split()
+
+
+def texto_respuesta(pregunta, tokens):
+    palabras = f"(respuesta simulada a: {pregunta})".split()
+    while len(palabras) < tokens:
+        palabras.extend(RELLENO)
+    return palabras[:tokens]
+
+
+def ultima_pregunta(mensajes):
+    for msg in reversed(mensajes):
+        if msg.get("role") == "user":
+            return msg.get("content", "")
+    return ""
+
+
+class MockLLMServer:
+    """
+    Uso desde pruebas o benchmarks:
+
+        with MockLLMServer(latencia=0.2) as mock:
+            os.environ["GROQ_BASE_URL"] = mock.base_url
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latencia=0.3, retardo_token=0.01, tokens=60,
+                 prob_429=0.0, retry_after=1, sse_invalido=False):
+        self.host = host
+        self.port = port
+        # segundos antes del primer token y entre tokens
+        self.latencia = latencia
+        self.retardo_token = retardo_token
+        self.tokens = tokens
+        # fracción de pedidos que responden 429 (límite de uso simulado)
+        self.prob_429 = prob_429
+        self.retry_after = retry_after
+        # el stream se rompe después del primer token (respuesta inválida)
+        self.sse_invalido = sse_invalido
+        # estados que responden los próximos pedidos, en orden, antes que prob_429
+        self.fallas = deque()
+        # (modelo, pregunta) de cada pedido recibido, en orden de llegada
+        self.recibidos = []
+        self.pedidos = 0
+        self.rechazados = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://{self.host}:{self.port}/v1"
+
+    def _contar(self, pedido):
+        """Estado de error con el que se rechaza este pedido, o None."""
+        with self._lock:
+            self.pedidos += 1
+            self.recibidos.append((pedido.get("model"), ultima_pregunta(pedido.get("messages", []))))
+            if self.fallas:
+                estado = self.fallas.popleft()
+            else:
+                estado = 429 if random.random() < self.prob_429 else None
+            if estado is not None:
+                self.rechazados += 1
+            return estado
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 para que el cliente pueda reutilizar la conexión
+            protocol_version = "HTTP/1.1"
+
+            def _json(self, status, cuerpo, headers=None):
+                datos = json.dumps(cuerpo).encode("utf-8")
+                self.send_response(status)
+                for nombre, valor in (headers or {}).items():
+                    self.send_header(nombre, valor)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(datos)))
+                self.end_headers()
+                self.wfile.write(datos)
+
+            def _chunk(self, datos):
+                self.wfile.write(f"{len(datos):x}\r\n".encode("ascii") + datos + b"\r\n")
+                self.wfile.flush()
+
+            def do_POST(self):
+                if self.path.rstrip("/") != "/v1/chat/completions":
+                    self._json(404, {"error": {"message": "no encontrado"}})
+                    return
+                largo = int(self.headers.get("Content-Length", 0))
+                pedido = json.loads(self.rfile.read(largo) or b"{}")
+                estado = mock._contar(pedido)
+                if estado == 429:
+                    self._json(
+                        429,
+                        {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_exceeded"}},
+                        {"Retry-After": str(mock.retry_after)},
+                    )
+                    return
+                if estado is not None:
+                    self._json(estado, {"error": {"message": f"Error {estado} (mock)"}})
+                    return
+
+                modelo = pedido.get("model", "mock")
+                palabras = texto_respuesta(ultima_pregunta(pedido.get("messages", [])), mock.tokens)
+                id_respuesta = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+                time.sleep(mock.latencia)
+
+                if not pedido.get("stream"):
+                    time.sleep(mock.retardo_token * len(palabras))
+                    self._json(200, {
+                        "id": id_respuesta,
+                        "object": "chat.completion",
+                        "model": modelo,
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": " ".join(palabras)},
+                            "finish_reason": "stop",
+                        }],
+                    })
+                    return
+
+                # SSE con transferencia chunked: la conexión sigue viva al final
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for i, palabra in enumerate(palabras):
+                    if i:
+                        time.sleep(mock.retardo_token)
+                    evento = {
+                        "id": id_respuesta,
+                        "object": "chat.completion.chunk",
+                        "model": modelo,
+                        "choices": [{
+                            "index": 0,
+                            "delta": {"content": palabra if i == 0 else " " + palabra},
+                            "finish_reason": None,
+                        }],
+                    }
+                    self._chunk(f"data: {json.dumps(evento)}\n\n".encode("utf-8"))
+                    if mock.sse_invalido:
+                        self._chunk(b'data: {"choices": [\n\n')
+                self._chunk(b"data: [DONE]\n\n")
+                self._chunk(b"")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._server.daemon_threads = True
+        # con port=0 el sistema elige uno libre
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mock local de la API de chat (OpenAI/Groq)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latencia", type=float, default=0.3, help="Segundos hasta el primer token")
+    parser.add_argument("--retardo-token", type=float, default=0.01, help="Segundos entre tokens")
+    parser.add_argument("--tokens", type=int, default=60, help="Palabras por respuesta")
+    parser.add_argument("--prob-429", type=float, default=0.0, help="Fracción de pedidos que responden 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="Segundos del Retry-After de los 429")
+    args = parser.parse_args()
+
+    mock = MockLLMServer(
+        args.host, args.port, args.latencia, args.retardo_token, args.tokens,
+        prob_429=args.prob_429, retry_after=args.retry_after,
+    ).start()
+    print(f"Mock LLM escuchando en {mock.base_url} (Ctrl+C para salir)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import pytest
+
+from cache_respuestas import CacheRespuestas
+
+
+@pytest.fixture
+def cache(tmp_path):
+    # umbral bajo: los pares de abajo tienen que separarse por la firma, no por el umbral
+    c = CacheRespuestas(tmp_path / "cache.sqlite", umbral=0.5)
+    yield c
+    c.close()
+
+
+@pytest.mark.parametrize("guardada, nueva", [
+    ("¿Qué es el ahorro?", "¿Por qué ahorro?"),
+    ("¿Qué es un presupuesto?", "¿Cuál es mi presupuesto?"),
+    ("¿Cuánto puedo ahorrar si gano 1000?", "¿Cuánto puedo ahorrar si gano 5000?"),
+    ("¿Debo pagar mi tarjeta completa?", "¿No debo pagar mi tarjeta completa?"),
+])
+def test_no_reusa_preguntas_distintas(cache, guardada, nueva):
+    cache.guardar(guardada, "respuesta", 1.0)
+    assert cache.buscar(nueva) is None
+    assert cache.buscar(guardada) == "respuesta"
+
+
+def test_reusa_la_misma_pregunta_con_otra_forma(cache):
+    cache.guardar("¿Qué es un presupuesto?", "respuesta", 1.0)
+    assert cache.buscar("que es un presupuesto") == "respuesta"
+    assert cache.buscar("¿Qué es un presupuesto personal?") == "respuesta"
+    assert cache.resumen()["aciertos_semanticos"] == 1
+
+
+def test_firmas_sobreviven_reinicio(tmp_path):
+    ruta = tmp_path / "cache.sqlite"
+    primera = CacheRespuestas(ruta, umbral=0.5)
+    primera.guardar("¿Cuánto puedo ahorrar si gano 1000?", "respuesta", 1.0)
+    primera.close()
+
+    segunda = CacheRespuestas(ruta, umbral=0.5)
+    assert segunda.buscar("¿Cuánto puedo ahorrar si gano 5000?") is None
+    assert segunda.buscar("cuanto puedo ahorrar si gano 1000") == "respuesta"
+    segunda.close()
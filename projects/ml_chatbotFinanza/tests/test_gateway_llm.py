@@ -0,0 +1,148 @@
+import threading
+import time
+
+import pytest
+
+from gateway_llm import ErrorLLM, GatewayLLM
+from mock_llm_server import MockLLMServer, texto_respuesta
+
+MENSAJES = [{"role": "user", "content": "¿Qué es un presupuesto?"}]
+
+
+def gateway(mock, **kwargs):
+    kwargs.setdefault("max_concurrencia", 1)
+    kwargs.setdefault("espera_maxima", 5.0)
+    kwargs.setdefault("backoff_base", 0.0)
+    return GatewayLLM(mock.base_url, "clave", "modelo-principal", **kwargs)
+
+
+def modelos(mock):
+    return [modelo for modelo, _ in mock.recibidos]
+
+
+def esperar(condicion, timeout=5.0):
+    limite = time.monotonic() + timeout
+    while not condicion():
+        assert time.monotonic() < limite
+        time.sleep(0.01)
+
+
+def test_stream_entrega_los_fragmentos_en_orden():
+    with MockLLMServer(latencia=0, retardo_token=0, tokens=12) as mock:
+        g = gateway(mock)
+        fragmentos = list(g.stream(MENSAJES))
+    # [DONE] cierra el stream sin agregar texto
+    assert "".join(fragmentos) == " ".join(texto_respuesta(MENSAJES[0]["content"], 12))
+    assert len(fragmentos) == 12
+    assert g.cola._libres == 1
+
+
+def test_sse_mal_formado_es_error_llm():
+    with MockLLMServer(latencia=0, retardo_token=0, sse_invalido=True) as mock:
+        g = gateway(mock)
+        stream = g.stream(MENSAJES)
+        assert next(stream)
+        with pytest.raises(ErrorLLM):
+            next(stream)
+    assert g.metricas.contadores["respuestas_invalidas"] == 1
+    assert g.cola._libres == 1
+
+
+def test_cerrar_el_stream_antes_de_tiempo_libera_el_cupo():
+    with MockLLMServer(latencia=0, retardo_token=0.01, tokens=50) as mock:
+        g = gateway(mock)
+        stream = g.stream(MENSAJES)
+        next(stream)
+        assert g.cola._libres == 0
+        stream.close()
+        assert g.cola._libres == 1
+        # el siguiente pedido consigue lugar sin esperar
+        assert g.completar(MENSAJES)
+
+
+def test_reintenta_429_y_5xx():
+    with MockLLMServer(latencia=0, retardo_token=0, retry_after=0) as mock:
+        mock.fallas.extend([503, 429])
+        g = gateway(mock, max_reintentos=2)
+        assert g.completar(MENSAJES)
+    assert modelos(mock) == ["modelo-principal"] * 3
+    assert g.metricas.contadores["reintentos"] == 2
+    assert g.cola._libres == 1
+
+
+def test_espera_el_retry_after():
+    with MockLLMServer(latencia=0, retardo_token=0, retry_after=0.3) as mock:
+        mock.fallas.append(429)
+        g = gateway(mock)
+        inicio = time.monotonic()
+        assert g.completar(MENSAJES)
+        assert time.monotonic() - inicio >= 0.3
+
+
+def test_retry_after_largo_pasa_directo_al_respaldo():
+    with MockLLMServer(latencia=0, retardo_token=0, retry_after=60) as mock:
+        mock.fallas.append(429)
+        g = gateway(mock, modelo_respaldo="modelo-respaldo", backoff_maximo=20.0)
+        inicio = time.monotonic()
+        assert g.completar(MENSAJES)
+        assert time.monotonic() - inicio < 5
+    assert modelos(mock) == ["modelo-principal", "modelo-respaldo"]
+    assert g.metricas.contadores["respaldos"] == 1
+
+
+def test_usa_el_respaldo_al_agotar_los_reintentos():
+    with MockLLMServer(latencia=0, retardo_token=0) as mock:
+        mock.fallas.extend([503, 503])
+        g = gateway(mock, modelo_respaldo="modelo-respaldo", max_reintentos=1)
+        assert "".join(g.stream(MENSAJES))
+    assert modelos(mock) == ["modelo-principal", "modelo-principal", "modelo-respaldo"]
+
+
+def test_sin_respaldo_las_fallas_agotadas_son_error_llm():
+    with MockLLMServer(latencia=0, retardo_token=0) as mock:
+        mock.fallas.extend([503, 503])
+        g = gateway(mock, max_reintentos=1)
+        with pytest.raises(ErrorLLM):
+            g.completar(MENSAJES)
+    assert g.cola._libres == 1
+
+
+def test_error_del_pedido_no_se_reintenta():
+    with MockLLMServer(latencia=0, retardo_token=0) as mock:
+        mock.fallas.append(400)
+        g = gateway(mock, modelo_respaldo="modelo-respaldo")
+        with pytest.raises(ErrorLLM, match="400"):
+            g.completar(MENSAJES)
+    assert mock.pedidos == 1
+    assert g.cola._libres == 1
+
+
+def test_otras_fallas_de_requests_son_error_llm_sin_reintentos():
+    # sin host: requests lanza InvalidURL, que no es un timeout ni un corte de conexión
+    g = GatewayLLM("http:///v1", "clave", "modelo-principal", max_concurrencia=1, backoff_base=0.0)
+    with pytest.raises(ErrorLLM):
+        g.completar(MENSAJES)
+    assert g.metricas.contadores["pedidos_upstream"] == 1
+    assert g.cola._libres == 1
+
+
+def test_la_cola_atiende_por_turnos_entre_sesiones():
+    with MockLLMServer(latencia=0.2, retardo_token=0, tokens=3) as mock:
+        g = gateway(mock)
+
+        def pedir(sesion, pregunta):
+            hilo = threading.Thread(target=g.completar, args=([{"role": "user", "content": pregunta}], sesion))
+            hilo.start()
+            return hilo
+
+        hilos = [pedir("a", "a1")]
+        esperar(lambda: mock.pedidos == 1)
+        hilos += [pedir("a", "a2"), pedir("a", "a3")]
+        esperar(lambda: g.cola.en_espera == 2)
+        hilos.append(pedir("b", "b1"))
+        esperar(lambda: g.cola.en_espera == 3)
+        for hilo in hilos:
+            hilo.join(timeout=10)
+
+    # b no espera a que "a" vacíe su cola
+    assert [pregunta for _, pregunta in mock.recibidos] == ["a1", "a2", "b1", "a3"]
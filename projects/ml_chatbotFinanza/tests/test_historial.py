@@ -0,0 +1,64 @@
+import pytest
+
+import historial
+from historial import GestorHistorial, mensaje_resumen, resumir_turno, tokens_mensajes
+
+TEMAS = ["presupuesto", "ahorro", "tarjeta", "inversión", "deuda", "seguro", "jubilación", "impuestos", "fondo", "crédito"]
+
+
+@pytest.fixture(autouse=True)
+def sin_tiktoken(monkeypatch):
+    # la estimación por palabras: los presupuestos de abajo no dependen de tener tiktoken
+    monkeypatch.setattr(historial, "_ENCODER", None)
+
+
+def turno(n, tema):
+    return [
+        {"role": "user", "content": f"Pregunta {n}: ¿cómo manejo mi {tema}?"},
+        {"role": "assistant", "content": f"Sobre tu {tema}: empieza anotando lo que tienes. " + "Revisa cada mes y ajusta. " * 8},
+    ]
+
+
+def conversar(gestor):
+    """
+    Una conversación de 10 turnos armando el contexto antes de cada
+    pregunta, como la app. Da (contexto, líneas del resumen, turnos que
+    quedaron fuera del historial).
+    """
+    estado = {}
+    mensajes = []
+    for n, tema in enumerate(TEMAS):
+        contexto = gestor.contexto(mensajes, f"¿Y qué hago con mi {tema}?", estado)
+        lineas, historial = [], contexto
+        if contexto and contexto[0]["role"] == "system":
+            lineas = contexto[0]["content"].split("\n")[1:]
+            assert contexto[0] == mensaje_resumen(lineas)
+            historial = contexto[1:]
+
+        preguntas = {msg["content"] for msg in historial if msg["role"] == "user"}
+        turnos = [mensajes[i:i + 2] for i in range(0, len(mensajes), 2)]
+        afuera = [t for t in turnos if t[0]["content"] not in preguntas]
+        yield contexto, lineas, afuera
+        mensajes += turno(n, tema)
+
+
+def test_el_resumen_cubre_exactamente_los_turnos_que_quedan_afuera():
+    gestor = GestorHistorial(presupuesto_tokens=500, turnos_ventana=4, turnos_minimos=2, presupuesto_resumen=250)
+    afuera_de_la_ventana = 0
+    for n, (contexto, lineas, afuera) in enumerate(conversar(gestor)):
+        assert tokens_mensajes(contexto) <= 500
+        # cada turno entra completo o como una línea del resumen, nunca las dos ni ninguna
+        assert lineas == [resumir_turno(t) for t in afuera]
+        # los plegados son los n - turnos_ventana más viejos
+        afuera_de_la_ventana += len(afuera) - max(0, n - 4)
+    # además de plegar turnos viejos, quedaron afuera turnos de la ventana
+    assert afuera_de_la_ventana > 0
+
+
+@pytest.mark.parametrize("presupuesto", [150, 250, 400])
+def test_con_poco_presupuesto_se_pierden_primero_las_lineas_mas_viejas(presupuesto):
+    gestor = GestorHistorial(presupuesto_tokens=presupuesto, turnos_ventana=4, turnos_minimos=2, presupuesto_resumen=400)
+    for contexto, lineas, afuera in conversar(gestor):
+        assert tokens_mensajes(contexto) <= presupuesto
+        # lo que queda del resumen son los turnos de afuera más recientes, sin los del historial
+        assert lineas == [resumir_turno(t) for t in afuera][len(afuera) - len(lineas):]
@@ -0,0 +1,142 @@
+"""
+Lote columnar de artículos sobre Arrow.
+
+Una lista de Article guarda, por fila, un objeto con 8 referencias y sus
+strings. Para backfills grandes y procesamiento posterior conviene
+guardar columnas:
+
+- `source` como diccionario (un índice int32 por fila + las fuentes una vez)
+- el resto como columnas de strings contiguas (sin objeto Python por valor)
+- `published_ts` / `created_ts`: las fechas parseadas a timestamp[us, UTC]
+  para filtrar y ordenar; `published_at` / `created_at` guardan el string
+  original (zona, fracciones de segundo) y son lo que se exporta
+
+    batch = ArticleBatch.from_csv("data/raw/kotaku-reviews_2025-11-20.csv")
+    batch = ArticleBatch.concat([batch, ArticleBatch.from_articles(arts)])
+    with CsvArticleSink(path) as sink:
+        sink.write_article_batch(batch)
+
+Las fechas que no se pueden parsear quedan nulas en las columnas *_ts;
+el string original se exporta igual. Un CSV exportado y vuelto a leer
+devuelve las mismas filas que escribió el sink.
+Memoria comparada en benchmarks/bench_article_memory.py.
+"""
+from __future__ import annotations
+
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+from base.base_models import Article, parse_iso_datetime
+
+TIMESTAMP = pa.timestamp("us", tz="UTC")
+# columna de texto -> su versión parseada
+TIMESTAMP_FIELDS = {"published_at": "published_ts", "created_at": "created_ts"}
+ARTICLE_FIELDS = ["id", "source", "title", "url", "published_at", "text", "created_at", "fingerprint"]
+
+BATCH_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("source", pa.dictionary(pa.int32(), pa.string())),
+    ("title", pa.string()),
+    ("url", pa.string()),
+    ("published_at", pa.string()),
+    ("text", pa.string()),
+    ("created_at", pa.string()),
+    ("fingerprint", pa.string()),
+    ("published_ts", TIMESTAMP),
+    ("created_ts", TIMESTAMP),
+])
+
+# mismo fin de línea que csv.writer en CsvArticleSink
+_CSV_WRITE_OPTIONS = pa_csv.WriteOptions(include_header=False, eol="\r\n")
+
+
+def _parse_timestamps(values: pa.Array | pa.ChunkedArray) -> pa.Array | pa.ChunkedArray:
+    """Cast vectorizado si todas las fechas traen zona; si no, parseo en Python."""
+    try:
+        return pc.cast(values, TIMESTAMP)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        return pa.array([parse_iso_datetime(v) for v in values.to_pylist()], type=TIMESTAMP)
+
+
+class ArticleBatch:
+    def __init__(self, table: pa.Table):
+        self.table = table.cast(BATCH_SCHEMA) if table.schema != BATCH_SCHEMA else table
+
+    # ---------- construcción ----------
+
+    @classmethod
+    def from_articles(cls, articles: Iterable[Article]) -> ArticleBatch:
+        columns: dict[str, list] = {name: [] for name in ARTICLE_FIELDS}
+        for art in articles:
+            for name, values in columns.items():
+                values.append(getattr(art, name))
+
+        arrays = {}
+        for name in ARTICLE_FIELDS:
+            arrays[name] = pa.array(columns[name], type=pa.string())
+            if name == "source":
+                arrays[name] = arrays[name].dictionary_encode()
+        for name, ts_name in TIMESTAMP_FIELDS.items():
+            arrays[ts_name] = pa.array([parse_iso_datetime(v) for v in columns[name]], type=TIMESTAMP)
+        return cls(pa.Table.from_arrays([arrays[n] for n in BATCH_SCHEMA.names], schema=BATCH_SCHEMA))
+
+    @classmethod
+    def from_csv(cls, path: str | Path) -> ArticleBatch:
+        """Lee un CSV de data/raw directo a columnas (el lector de Arrow salta el BOM)."""
+        table = pa_csv.read_csv(
+            str(path),
+            convert_options=pa_csv.ConvertOptions(
+                column_types={name: pa.string() for name in BATCH_SCHEMA.names},
+                strings_can_be_null=False,
+            ),
+        )
+        # CSV de antes de que existiera la columna fingerprint
+        if "fingerprint" not in table.column_names:
+            fingerprints = [Article.fingerprint_of(t or "") for t in table.column("text").to_pylist()]
+            table = table.append_column("fingerprint", pa.array(fingerprints, type=pa.string()))
+
+        arrays = {name: table.column(name) for name in ARTICLE_FIELDS}
+        arrays["source"] = arrays["source"].dictionary_encode()
+        for name, ts_name in TIMESTAMP_FIELDS.items():
+            arrays[ts_name] = _parse_timestamps(arrays[name])
+        return cls(pa.Table.from_arrays([arrays[n] for n in BATCH_SCHEMA.names], schema=BATCH_SCHEMA))
+
+    @classmethod
+    def concat(cls, batches: Iterable[ArticleBatch]) -> ArticleBatch:
+        tables = [b.table for b in batches]
+        if not tables:
+            return cls(BATCH_SCHEMA.empty_table())
+        # cada lote trae su propio diccionario de fuentes: se unifican en uno
+        return cls(pa.concat_tables(tables).unify_dictionaries())
+
+    # ---------- acceso ----------
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def column(self, name: str) -> pa.ChunkedArray:
+        return self.table.column(name)
+
+    def text_table(self, columns: list[str]) -> pa.Table:
+        """Las columnas pedidas como strings, tal como se leyeron o se escribieron."""
+        return pa.table({name: self.table.column(name).cast(pa.string()) for name in columns})
+
+    def write_csv(self, file: BinaryIO, columns: list[str]):
+        """
+        Escribe las filas (sin encabezado) en un archivo binario con el
+        escritor de Arrow: no se crea ningún objeto Python por fila.
+        """
+        pa_csv.write_csv(self.text_table(columns), file, _CSV_WRITE_OPTIONS)
+
+    def iter_articles(self) -> Iterator[Article]:
+        columns = [self.text_table(ARTICLE_FIELDS).column(name).to_pylist() for name in ARTICLE_FIELDS]
+        for row in zip(*columns):
+            yield Article(*row)
@@ -1,9 +1,53 @@
+import hashlib
+import re
+import sys
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
+# parámetros de tracking que no cambian el contenido de la página
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref|cmp)$", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
 
-@dataclass
+
+def canonical_url(url: str) -> str:
+    """
+    Forma canónica de una URL para identificarla entre corridas:
+    esquema y host en minúsculas, sin fragmento, sin parámetros de tracking,
+    query ordenada y sin "/" final.
+    """
+    parts = urlsplit(url.strip())
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(k)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, urlencode(query), ""))
+
+
+def parse_iso_datetime(value: str | None) -> datetime | None:
+    """
+    ISO 8601 -> datetime en UTC (las fechas sin zona se asumen UTC).
+    Devuelve None si no se puede parsear.
+    """
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+@dataclass(frozen=True, slots=True)
 class Article:
+    """
+    Inmutable y con __slots__ (sin __dict__ por instancia). `source` se
+    interna: todos los artículos de una fuente comparten el mismo str.
+    Para lotes grandes ver base/article_batch.py (columnas Arrow).
+    """
     id: str
     source: str
     title: str
@@ -11,7 +55,31 @@ class Article:
     published_at: str  # ISO 8601 string
     text: str
     created_at: str    # fecha del scrap
+    fingerprint: str = ""  # hash del texto normalizado (se calcula solo)
+
+    def __post_init__(self):
+        # frozen: los campos derivados se fijan con object.__setattr__
+        object.__setattr__(self, "source", sys.intern(self.source))
+        if not self.fingerprint:
+            object.__setattr__(self, "fingerprint", Article.fingerprint_of(self.text))
+
+    @property
+    def published_datetime(self) -> datetime | None:
+        return parse_iso_datetime(self.published_at)
 
     @staticmethod
     def now_iso() -> str:
         return datetime.utcnow().isoformat()
+
+    @staticmethod
+    def stable_id(url: str) -> str:
+        """
+        Id estable entre corridas (hash() de Python cambia en cada proceso).
+        """
+        return hashlib.sha1(canonical_url(url).encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def fingerprint_of(text: str) -> str:
+        """Hash del texto ignorando mayúsculas y espacios: igual texto => igual huella."""
+        normalized = _WHITESPACE.sub(" ", text).strip().lower()
+        return hashlib.sha1(normalized.encode("utf-8")).hexdigest()
@@ -1,17 +1,59 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 import csv
-from typing import Iterable, List
-from pathlib import Path
+import os
+import socket
+import time
+import uuid
+from typing import Callable, Container, ContextManager, Iterable, Iterator, List, TypeVar
 
-from datetime import datetime
-from playwright.sync_api import sync_playwright, Page
+from datetime import datetime, timedelta
+from playwright.sync_api import BrowserContext, Page, Response
 from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
 
 
-from base.base_models import Article
+from base import limits
+from base.base_models import Article, canonical_url, parse_iso_datetime
+from base.browser_pool import LISTING_PRIORITY, BorrowPage, BrowserPool, ContextProfile, get_browser_pool
+from base.dedup import NearDuplicateIndex
+from base.dom_extract import Spec, extract_fields
+from base.frontier import Frontier, Lease
+from base.metrics import MetricsServer, ScraperMetrics
+from base.replay import Replay
+from base.resilience import (
+    CircuitBreaker,
+    RetryQueue,
+    TransientFetchError,
+    backoff_delay,
+    host_rate_limiter,
+    is_transient_status,
+    parse_retry_after,
+)
+from base.resource_filter import ResourceFilter
+from base.seen_store import RefreshSchedule, SeenUrlStore, SqliteSeenUrlStore, UrlValidators
+from base.sinks import ArticleSink, CsvArticleSink
+from base.static_fetch import NotModified, StaticDocument, StaticFetcher
+
+T = TypeVar("T")
+
+
+@dataclass
+class CrawlProgress:
+    """Estado de una corrida que usa el modo incremental para cortar antes."""
+    # published_at más nuevo guardado en corridas anteriores
+    watermark: str | None = None
+    # published_at más nuevo de esta corrida (nuevo watermark si termina bien)
+    newest_published: str | None = None
+    # published_at del último artículo aceptado, en orden del listado
+    last_published: str | None = None
+    # páginas de listado seguidas sin ningún link nuevo
+    seen_pages_in_row: int = 0
 
 
 class BaseNewsScraper(ABC):
@@ -23,6 +65,11 @@ class BaseNewsScraper(ABC):
     - Sobrescribe `start_urls`
     - Implementa `extract_article_links`
     - Implementa `extract_article_data`
+
+    Opcional (fast path HTTP sin navegador, ver base/static_fetch.py):
+    - Agrega "listing" y/o "article" a `static_page_types`
+    - Implementa `extract_article_links_static` / `extract_article_data_static`
+      devolviendo None cuando falten los selectores (se usa Playwright)
     """
 
     # Nombre de la fuente (IGN, PCGamer, etc.)
@@ -31,16 +78,137 @@ class BaseNewsScraper(ABC):
     # URLs iniciales donde se listan noticias
     start_urls: List[str] = []
 
+    # Listado paginado (/page/N, del más nuevo al más viejo): en modo
+    # incremental se deja de paginar tras `stop_after_seen_pages` páginas
+    # seguidas sin links nuevos o al pasar el watermark de published_at
+    paginated: bool = False
+    stop_after_seen_pages: int = 2
+    # margen para no cortar por reviews apenas más viejas que el watermark
+    # (zonas horarias, fechas de respaldo con la hora del scrap, etc.)
+    watermark_grace: timedelta = timedelta(days=1)
+
+    # Campos de listado/artículo a extraer en una sola llamada al navegador
+    # (ver base/dom_extract.py). Opcional: las subclases que lo definan
+    # pueden usar self.extract_fields(page, spec) en vez de locators.
+    listing_spec: Spec = {}
+    article_spec: Spec = {}
+
+    # Tipos de página que se intentan primero por HTTP plano: "listing", "article"
+    static_page_types: frozenset[str] = frozenset()
+
+    # Tipos de recurso que el navegador SÍ debe cargar; el resto se bloquea
+    # (imágenes, fuentes, media, CSS...). Ver base/resource_filter.py
+    needed_resource_types: frozenset[str] = frozenset({"document", "script", "xhr", "fetch"})
+
+    # Similitud (Jaccard estimada) desde la cual un artículo se considera
+    # copia de uno ya guardado y no se escribe. None desactiva el filtro.
+    near_duplicate_threshold: float | None = 0.85
+
+    # Ritmo y reintentos (ver base/resilience.py). `requests_per_second` es
+    # por host y lo comparten todos los hilos del proceso (no los procesos
+    # de run_parallel: cada uno tiene su propio token bucket); None = sin tope.
+    requests_per_second: float | None = 2.0
+    request_burst: int = 4
+    # reintentos por URL ante 429/5xx/timeouts, con backoff exponencial
+    max_retries: int = 3
+    retry_backoff_base: float = 1.0
+    retry_backoff_cap: float = 60.0
+    # fallas transitorias seguidas que pausan la fuente, y por cuánto
+    breaker_failure_threshold: int = 5
+    breaker_cooldown: float = 120.0
+
+    # crawl_mode="refresh": vuelve a revisar artículos ya guardados con
+    # pedidos condicionales. Cada cuánto, según la antigüedad del artículo
+    # (los reviews recientes cambian más), y cuántos como máximo por corrida
+    # para repartir el trabajo en varios días.
+    refresh_schedule: RefreshSchedule = (
+        (timedelta(days=7), timedelta(days=1)),
+        (timedelta(days=60), timedelta(days=7)),
+        (None, timedelta(days=30)),
+    )
+    refresh_batch_size: int = 200
+
     #vamos a guardar los datos en esta carpeta data/raw
-    def __init__(self, output_dir: str = "data/raw", meta_dir: str = "data/meta"):
+    def __init__(
+        self,
+        output_dir: str = "data/raw",
+        meta_dir: str = "data/meta",
+        max_concurrency: int = 1,
+        output_format: str = "csv",
+        crawl_mode: str = "incremental",
+        metrics_port: int | None = None,
+    ):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        # "csv" (un archivo por fuente y día) o "parquet" (ver base/parquet_store.py)
+        if output_format not in ("csv", "parquet"):
+            raise ValueError(f"output_format desconocido: {output_format}")
+        self.output_format = output_format
+        # data/raw -> data/parquet
+        self.parquet_dir = self.output_dir.with_name("parquet")
+
         self.meta_dir = Path(meta_dir)
         self.meta_dir.mkdir(parents=True, exist_ok=True)
 
         #archivo global de URLs vsitas segun la fuente
+        self.seen_urls_db = self.meta_dir / f"{self.source_name.lower()}_seen_urls.sqlite"
+        # formato viejo (una URL por línea); se migra al abrir el store
         self.seen_urls_file = self.meta_dir / f"{self.source_name.lower()}_seen_urls.txt"
+        # índice de casi-duplicados, compartido por todas las fuentes
+        self.near_duplicates_db = self.meta_dir / "near_duplicates.sqlite"
+        # URLs que fallaron en corridas anteriores; se reintentan primero
+        self.retry_queue_file = self.meta_dir / f"{self.source_name.lower()}_retry_queue.json"
+        # métricas por corrida en JSON-lines (ver base/metrics.py)
+        self.metrics_dir = self.meta_dir / "metrics"
+
+        # cuántos artículos se procesan a la vez (1 = modo secuencial clásico)
+        self.max_concurrency = max(1, max_concurrency)
+
+        # "incremental" corta la paginación temprano; "backfill" recorre todo;
+        # "refresh" no mira listados: revisa si cambiaron artículos ya guardados
+        if crawl_mode not in ("incremental", "backfill", "refresh"):
+            raise ValueError(f"crawl_mode desconocido: {crawl_mode}")
+        self.crawl_mode = crawl_mode
+        self.progress = CrawlProgress()
+
+        # cliente HTTP del fast path; se crea en run() si hace falta
+        self.static_fetcher: StaticFetcher | None = None
+
+        # filtro de requests de la corrida actual; se crea en run()
+        self.resource_filter: ResourceFilter | None = None
+
+        # URLs vistas de la corrida actual (para que los listados corten antes)
+        self.seen_urls: SeenUrlStore | None = None
+
+        # se abre tras muchas fallas transitorias seguidas contra la fuente;
+        # se crea en run() (tiene un lock y el scraper se manda por pickle a
+        # los procesos de run_scrapers)
+        self.breaker: CircuitBreaker | None = None
+        # cola persistida de la corrida actual; se abre en run()
+        self.retry_queue: RetryQueue | None = None
+        # URLs de la cola que se reintentan en esta corrida (fuera del orden del listado)
+        self.retry_urls: set[str] = set()
+
+        # ETag / Last-Modified de lo bajado en esta corrida, hasta el checkpoint
+        self.fetch_validators: dict[str, tuple[str | None, str | None]] = {}
+        # modo refresh: validadores guardados de las URLs a revisar y los
+        # nuevos de las que resultaron sin cambios (se guardan al final)
+        self.refresh_targets: dict[str, UrlValidators] = {}
+        self.unchanged: list[UrlValidators] = []
+
+        # pool de Chromium del proceso y contexto de la corrida; se asignan
+        # en run() (ver base/browser_pool.py)
+        self.browser_pool: BrowserPool | None = None
+        self.context_profile: ContextProfile | None = None
+
+        # tiempos por fase y contadores de la corrida; se crean en run()
+        self.metrics: ScraperMetrics | None = None
+        # si se pasa un puerto, run() expone /metrics para Prometheus
+        self.metrics_port = metrics_port
+
+        # grabación/reproducción offline de las respuestas (ver base/replay.py)
+        self.replay: Replay | None = None
 
     # ---------- Métodos que las subclases DEBEN implementar ----------
 
@@ -60,8 +228,56 @@ class BaseNewsScraper(ABC):
         """
         raise NotImplementedError
 
+    # ---------- Fast path estático (opcional) ----------
+
+    def extract_article_links_static(self, doc: StaticDocument) -> Iterable[str] | None:
+        """
+        Versión HTTP de extract_article_links.
+        Devolver None si el HTML no trae los links (p. ej. se cargan por JS).
+        """
+        return None
+
+    def extract_article_data_static(self, doc: StaticDocument, url: str) -> Article | None:
+        """
+        Versión HTTP de extract_article_data.
+        Devolver None si faltan los selectores necesarios.
+        """
+        return None
+
     # ---------- Métodos comunes reutilizables ----------
 
+    def is_seen(self, raw_url: str) -> bool:
+        """True si la URL ya se scrapeó en corridas anteriores."""
+        return self.seen_urls is not None and self._seen_before(raw_url, self.seen_urls)
+
+    def url_key(self, raw_url: str) -> str:
+        """
+        Forma con la que se identifica (y se baja) una URL de artículo en
+        todos lados: URLs vistas, CSV del día, cola de reintentos, frontier
+        y corpus. Es la canónica (ver base_models.canonical_url), así las
+        variantes con ?utm_=..., #fragmento o "/" final no se bajan de nuevo.
+        """
+        return canonical_url(self.normalize_url(raw_url))
+
+    def _seen_before(self, raw_url: str, seen_urls: SeenUrlStore) -> bool:
+        url = self.url_key(raw_url)
+        if url in seen_urls:
+            return True
+        # los stores de antes de usar la forma canónica guardaron la URL tal cual
+        absolute = self.normalize_url(raw_url)
+        return absolute != url and absolute in seen_urls
+
+    def extract_fields(self, page: Page, spec: Spec) -> dict:
+        """Todos los campos de `spec` con un único page.evaluate."""
+        return extract_fields(page, spec)
+
+    def iter_listing_urls(self) -> Iterator[str]:
+        """
+        URLs de listado a recorrer, generadas a demanda. Los scrapers
+        paginados lo sobrescriben para no armar todas las páginas de antemano.
+        """
+        yield from self.start_urls
+
     def normalize_url(self, url: str) -> str:
         """
         En caso de URL relativa, la subclase puede sobrescribir esto
@@ -75,20 +291,6 @@ class BaseNewsScraper(ABC):
         filename = f"{self.source_name.lower()}_{today}.csv"
         return self.output_dir / filename
 
-    def ensure_csv_header(self, path: Path):
-        if not path.exists():
-            with path.open("w", encoding="utf-8-sig", newline="") as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    "id",
-                    "source",
-                    "title",
-                    "url",
-                    "published_at",
-                    "text",
-                    "created_at",
-                ])
-
     def load_existing_urls(self, path: Path) -> set[str]:
         """
         Para evitar duplicados dentro del MISMO archivo de salida.
@@ -99,103 +301,770 @@ class BaseNewsScraper(ABC):
         with path.open("r", encoding="utf-8-sig", newline="") as f:
             reader = csv.DictReader(f)
             for row in reader:
-                urls.add(row["url"])
+                urls.add(canonical_url(row["url"]))
         return urls
 
-    def save_articles(self, path: Path, articles: list[Article]):
-        if not articles:
+    def open_sink(self, path: Path, seen_urls: SeenUrlStore) -> ArticleSink:
+        """
+        Sink donde se van escribiendo los artículos. Cada flush marca esas
+        URLs como vistas (checkpoint) para poder retomar una corrida cortada.
+        """
+        def checkpoint(batch: list[Article]):
+            seen_urls.add_many(canonical_url(art.url) for art in batch)
+            seen_urls.save_validators(self.validators_for(art) for art in batch)
+
+        if self.output_format == "parquet":
+            # import acá: pyarrow solo hace falta si se pide Parquet
+            from base.parquet_store import ParquetArticleSink
+            return ParquetArticleSink(self.parquet_dir, on_flush=checkpoint)
+        return CsvArticleSink(path, on_flush=checkpoint)
+
+    def open_seen_store(self) -> SeenUrlStore:
+        """URLs globales vistas (hoy + días anteriores) de esta fuente."""
+        store = SqliteSeenUrlStore(self.seen_urls_db)
+        migrated = store.migrate_text_file(self.seen_urls_file)
+        if migrated:
+            print(f"[{self.source_name}] Migradas {migrated} URLs de {self.seen_urls_file} a {self.seen_urls_db}")
+        return store
+
+    def open_dedup_index(self) -> ContextManager[NearDuplicateIndex | None]:
+        if self.near_duplicate_threshold is None:
+            return nullcontext(None)
+        return NearDuplicateIndex(self.near_duplicates_db, threshold=self.near_duplicate_threshold)
+
+    def get_metrics_file_for_today(self) -> Path:
+        today = datetime.utcnow().strftime("%Y-%m-%d")
+        return self.metrics_dir / f"{self.source_name.lower()}_{today}.jsonl"
+
+    # ---------- Métricas ----------
+
+    def phase(self, name: str) -> ContextManager[None]:
+        """Mide el bloque como fase `name` (no hace nada fuera de run())."""
+        if self.metrics is None:
+            return nullcontext()
+        return self.metrics.phase(name)
+
+    def count(self, counter: str, n: int = 1):
+        if self.metrics is not None:
+            self.metrics.incr(counter, n)
+
+    # ---------- Ritmo, reintentos y circuit breaker ----------
+
+    @contextmanager
+    def request_slot(self, url: str) -> Iterator[None]:
+        """Espera el turno del host (token bucket) y ocupa una de sus páginas."""
+        if self.requests_per_second is not None:
+            host_rate_limiter.acquire(limits.host_of(url), self.requests_per_second, self.request_burst)
+        with limits.host_slot(url):
+            yield
+
+    def call_with_retries(self, url: str, fetch_once: Callable[[], T]) -> T:
+        """
+        Ejecuta `fetch_once` reintentando las TransientFetchError con backoff
+        exponencial (o el Retry-After del servidor). Si el circuito de la
+        fuente está abierto, cada intento espera a que se pueda volver a
+        probar (la fuente se pausa, las URLs no se descartan). Si se agotan
+        los intentos, relanza la última falla.
+        """
+        for attempt in range(self.max_retries + 1):
+            self.wait_for_breaker()
+            try:
+                result = fetch_once()
+            except TransientFetchError as ex:
+                if self.breaker.record_failure():
+                    print(f"[{self.source_name}] {self.breaker.failures} fallas seguidas, pauso la fuente {self.breaker.cooldown:.0f}s.")
+                if attempt == self.max_retries:
+                    raise
+                self.count("retries")
+                delay = ex.retry_after if ex.retry_after is not None else backoff_delay(attempt, self.retry_backoff_base)
+                delay = min(delay, self.retry_backoff_cap)
+                print(f"[{self.source_name}] {ex} en {url}, reintento {attempt + 1}/{self.max_retries} en {delay:.1f}s.")
+                time.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    def wait_for_breaker(self):
+        """Si el circuito está abierto, pausa la fuente hasta que se pueda volver a probar."""
+        remaining = self.breaker.remaining_cooldown()
+        if remaining > 0:
+            print(f"[{self.source_name}] Circuito abierto, espero {remaining:.0f}s antes de seguir.")
+            time.sleep(remaining)
+
+    def defer_url(self, url: str, reason: str):
+        """Manda la URL a la cola de reintentos de la próxima corrida."""
+        # en refresh no hace falta: la URL sigue vencida y entra en el próximo refresh
+        if self.retry_queue is None or self.crawl_mode == "refresh":
             return
-        self.ensure_csv_header(path)
-        with path.open("a", encoding="utf-8-sig", newline="") as f:
-            writer = csv.writer(f)
-            for art in articles:
-                writer.writerow([
-                    art.id,
-                    art.source,
-                    art.title,
-                    art.url,
-                    art.published_at,
-                    art.text,
-                    art.created_at,
-                ])
-
-    def load_global_seen_urls(self) -> set[str]:
-        if not self.seen_urls_file.exists():
-            return set()
-        with self.seen_urls_file.open("r", encoding="utf-8-sig") as f:
-            return {line.strip() for line in f if line.strip()}
+        if self.retry_queue.push(url, reason):
+            print(f"[{self.source_name}] {url} queda en la cola de reintentos ({reason}).")
+        else:
+            print(f"[{self.source_name}] {url} falló en demasiadas corridas, la descarto ({reason}).")
+
+    # ---------- Validadores para el modo refresh ----------
+
+    def remember_validators(self, url: str, etag: str | None, last_modified: str | None):
+        """Se llama desde los hilos del pool; se guardan en el checkpoint."""
+        if etag or last_modified:
+            self.fetch_validators[url] = (etag, last_modified)
+
+    def validators_for(self, article: Article) -> UrlValidators:
+        etag, last_modified = self.fetch_validators.pop(article.url, (None, None))
+        published = parse_iso_datetime(article.published_at)
+        return UrlValidators(
+            url=article.url,
+            etag=etag,
+            last_modified=last_modified,
+            content_hash=article.fingerprint,
+            published_at=published.isoformat() if published is not None else None,
+        )
+
+    # ---------- Obtención de listados y artículos ----------
+
+    def static_fetch(self, url: str, etag: str | None = None, last_modified: str | None = None) -> StaticDocument | None:
+        """GET del fast path; con validadores es condicional y un 304 lanza NotModified."""
+        not_modified = False
+        with self.request_slot(url), self.phase("static_fetch"):
+            try:
+                doc = self.static_fetcher.fetch(url, etag, last_modified)
+            except NotModified:
+                not_modified = True
+        if not_modified:
+            self.count("pages_not_modified")
+            raise NotModified(url)
+        if doc is not None and self.metrics is not None:
+            self.metrics.incr("pages_loaded")
+            self.metrics.add_bytes(doc.nbytes, "static")
+        return doc
+
+    def fetch_listing_static(self, url: str) -> list[str] | None:
+        """Links del listado por HTTP, o None si hay que usar el navegador."""
+        if "listing" not in self.static_page_types or self.static_fetcher is None:
+            return None
+        doc = self.static_fetch(url)
+        with self.phase("link_extraction"):
+            links = self.extract_article_links_static(doc) if doc is not None else None
+        if links is None:
+            print(f"[{self.source_name}] Listado sin selectores en HTML estático, uso Playwright: {url}")
+            return None
+        return list(links)
+
+    def fetch_article_static(self, url: str) -> Article | None:
+        """Artículo por HTTP, o None si hay que usar el navegador."""
+        if "article" not in self.static_page_types or self.static_fetcher is None:
+            return None
+        doc = self.static_fetch(url)
+        if doc is not None:
+            self.remember_validators(url, doc.etag, doc.last_modified)
+        with self.phase("article_extraction"):
+            article = self.extract_article_data_static(doc, url) if doc is not None else None
+        if article is None:
+            print(f"[{self.source_name}] Artículo sin selectores en HTML estático, uso Playwright: {url}")
+        return article
+
+    def goto(self, page: Page, url: str, timeout: int, phase: str) -> Response | None:
+        """
+        page.goto medido como fase `phase`, que convierte timeouts, 429 y
+        5xx en TransientFetchError.
+        """
+        with self.phase(phase):
+            try:
+                response = page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+            except PlaywrightTimeoutError as ex:
+                raise TransientFetchError("timeout") from ex
+            if response is not None and is_transient_status(response.status):
+                raise TransientFetchError(
+                    f"HTTP {response.status}",
+                    status=response.status,
+                    retry_after=parse_retry_after(response.headers.get("retry-after")),
+                )
+        self.count("pages_loaded")
+        return response
+
+    def _fetch_article_browser(self, url: str, borrow_page: BorrowPage) -> Article | None:
+        with self.request_slot(url), borrow_page() as page:
+            response = self.goto(page, url, timeout=15000, phase="article_goto")
+            if response is not None:
+                self.remember_validators(url, response.headers.get("etag"), response.headers.get("last-modified"))
+            with self.phase("article_extraction"):
+                return self.extract_article_data(page, url)
+
+    def _fetch_article_once(self, url: str, borrow_page: BorrowPage) -> Article | None:
+        article = self.fetch_article_static(url)
+        if article is not None:
+            return article
+        return self._fetch_article_browser(url, borrow_page)
+
+    def _refresh_article_once(self, url: str, borrow_page: BorrowPage) -> Article | None:
+        """
+        Modo refresh: devuelve el artículo solo si cambió desde la última
+        versión guardada. Primero un GET condicional (un 304 no baja nada);
+        si hay que bajarlo, se compara el hash del texto extraído.
+        """
+        target = self.refresh_targets[url]
+        static_article = "article" in self.static_page_types
+        article = None
+
+        # sin validadores ni extracción por HTTP el GET no ahorra nada: directo al navegador
+        if static_article or target.etag or target.last_modified:
+            try:
+                doc = self.static_fetch(url, target.etag, target.last_modified)
+            except NotModified:
+                self.count("refresh_not_modified")
+                self.unchanged.append(UrlValidators(url))
+                return None
+            if doc is not None:
+                self.remember_validators(url, doc.etag, doc.last_modified)
+                if static_article:
+                    with self.phase("article_extraction"):
+                        article = self.extract_article_data_static(doc, url)
+
+        if article is None:
+            article = self._fetch_article_browser(url, borrow_page)
+        if article is None:
+            print(f"[{self.source_name}] Sin datos válidos en {url}, lo salto.")
+            self.count("articles_empty")
+            return None
+
+        if target.content_hash is None:
+            # URL sembrada sin hash: no hay con qué comparar, se registra esta versión
+            self.count("refresh_baseline")
+            self.unchanged.append(self.validators_for(article))
+            return None
+        if article.fingerprint == target.content_hash:
+            self.count("refresh_unchanged")
+            # con sus ETag / Last-Modified la próxima revisión puede ser un 304
+            self.unchanged.append(self.validators_for(article))
+            return None
+        print(f"[{self.source_name}] Cambió el contenido de {url}, se guarda la versión nueva.")
+        self.count("refresh_changed")
+        return article
+
+    def fetch_article(self, url: str, borrow_page: Callable[[], ContextManager[Page]]) -> Article | None:
+        """
+        Obtiene el artículo de `url`: primero por el fast path HTTP (si el
+        scraper lo activó) y si no, con una página de `borrow_page` y
+        extract_article_data.
+        Las fallas transitorias se reintentan (ver call_with_retries); si
+        igual falla, la URL va a la cola de reintentos y se devuelve None
+        para que el llamador simplemente la salte. Otros errores (un bug de
+        extracción, una página rota) se informan y se saltan sin encolar:
+        la próxima corrida fallaría igual.
+        """
+        fetch_once = self._refresh_article_once if self.crawl_mode == "refresh" else self._fetch_article_once
+        try:
+            article = self.call_with_retries(url, lambda: fetch_once(url, borrow_page))
+        except TransientFetchError as ex:
+            print(f"[{self.source_name}] {ex} al abrir {url}, lo salto.")
+            self.count("articles_failed")
+            self.defer_url(url, str(ex))
+            return None
+        except Exception as ex:
+            print(f"[{self.source_name}] Error abriendo {url}: {type(ex).__name__}: {ex}")
+            self.count("articles_failed")
+            # si venía de la cola de reintentos, tampoco se vuelve a intentar
+            if self.retry_queue is not None:
+                self.retry_queue.done(url)
+            return None
+
+        if self.retry_queue is not None:
+            self.retry_queue.done(url)
+        if self.crawl_mode == "refresh":
+            # _refresh_article_once ya informó por qué no hay artículo
+            return article
+        if article is None:
+            print(f"[{self.source_name}] Sin datos válidos en {url}, lo salto.")
+            self.count("articles_empty")
+        else:
+            self.count("articles_extracted")
+        return article
+
+    def _fetch_listing_once(self, url: str, borrow_page: BorrowPage) -> list[str]:
+        links = self.fetch_listing_static(url)
+        if links is not None:
+            return links
+
+        with self.request_slot(url), borrow_page() as listing_page:
+            self.goto(listing_page, url, timeout=30000, phase="listing_load")
+            with self.phase("link_extraction"):
+                return list(self.extract_article_links(listing_page))
+
+    def fetch_listing(self, url: str) -> list[str] | None:
+        """
+        Links de un listado; None si no se pudo cargar. Se resuelve en un
+        hilo del pool de navegadores, delante de los artículos en cola.
+        """
+        self.wait_for_breaker()
+        self.count("listings")
+
+        def fetch_once() -> list[str]:
+            fut = self.browser_pool.submit(
+                self.context_profile,
+                lambda borrow_page: self._fetch_listing_once(url, borrow_page),
+                priority=LISTING_PRIORITY,
+            )
+            return fut.result()
+
+        try:
+            return self.call_with_retries(url, fetch_once)
+        except TransientFetchError as ex:
+            print(f"[{self.source_name}] {ex} cargando listado {url}, lo salto.")
+            self.count("listings_failed")
+            return None
+
+    def context_options(self) -> dict:
+        """Opciones de browser.new_context para el perfil liviano."""
+        return {
+            "java_script_enabled": "script" in self.needed_resource_types,
+            "service_workers": "block",
+            "reduced_motion": "reduce",
+        }
+
+    def install_context_hooks(self, context: BrowserContext):
+        """Filtro de requests y contador de bytes en cada contexto nuevo."""
+        if self.resource_filter is not None:
+            self.resource_filter.install(context)
+        if self.metrics is not None:
+            self.metrics.install(context)
+        # último: en modo replay tiene que atender antes que el filtro
+        if self.replay is not None:
+            self.replay.install(context)
+
+    def new_context_profile(self) -> ContextProfile:
+        """Contexto liviano de esta corrida, con el filtro de requests instalado."""
+        return ContextProfile(
+            key=f"{self.source_name}-{uuid.uuid4().hex[:8]}",
+            options=self.context_options(),
+            on_context=self.install_context_hooks,
+        )
+
+    def browsers_needed(self) -> int:
+        """Chromium que usa una corrida: uno por hilo del pool (listado incluido); BrowserPool.run los reserva."""
+        return self.max_concurrency
+
+    def submit_article(self, url: str) -> Future[Article | None]:
+        """En modo secuencial el Future vuelve ya resuelto."""
+        fut = self.browser_pool.submit(
+            self.context_profile,
+            lambda borrow_page: self.fetch_article(url, borrow_page),
+        )
+        if self.max_concurrency == 1:
+            # como antes: el artículo termina antes de pasar al siguiente
+            # link, así el corte por watermark ve su published_at a tiempo
+            fut.exception()
+        return fut
+
+    def iter_new_urls(
+        self,
+        seen_urls: SeenUrlStore,
+        skip_urls: set[str],
+        in_flight: Container[str],
+    ) -> Iterator[str]:
+        """
+        Entrega las URLs de artículo que hay que procesar: primero las que
+        quedaron en la cola de reintentos y después las de los listados.
+        En modo refresh, las URLs ya guardadas que toca revisar.
+        """
+        if self.crawl_mode == "refresh":
+            yield from self.iter_refresh_urls(seen_urls, skip_urls)
+            return
+
+        for queued_url in self.retry_queue.urls() if self.retry_queue is not None else ():
+            url = self.url_key(queued_url)
+            if self._seen_before(queued_url, seen_urls) or url in skip_urls or url in self.retry_urls:
+                self.retry_queue.done(queued_url)
+                continue
+            if url != queued_url:
+                # entrada de antes de la forma canónica: se vuelve a encolar con ella si falla
+                self.retry_queue.done(queued_url)
+            print(f"[{self.source_name}] Reintento de corridas anteriores: {url}")
+            self.retry_urls.add(url)
+            yield url
+
+        for start_url in self.iter_listing_urls():
+            if self.should_stop_crawl():
+                break
+
+            print(f"[{self.source_name}] Listado: {start_url}")
+            links = self.fetch_listing(start_url)
+            if links is None:
+                continue
+
+            print(f"[{self.source_name}] Encontrados {len(links)} links en listado.")
+
+            total = len(links)
+            if total == 0 and self.paginated:
+                print(f"[{self.source_name}] Listado vacío, no hay más páginas.")
+                break
+
+            new_links = 0
+
+            for idx, raw_url in enumerate(links, start=1):
+                url = self.url_key(raw_url)
+
+                # evitar duplicados globales (días anteriores), de hoy y los que ya están en cola
+                if url in skip_urls or url in in_flight or url in self.retry_urls or self._seen_before(raw_url, seen_urls):
+                    print(f"[{self.source_name}] ({idx}/{total}) Ya visto antes, skip: {url}")
+                    self.count("links_seen")
+                    continue
+
+                print(f"[{self.source_name}] ({idx}/{total}) Procesando: {url}")
+                new_links += 1
+                self.count("links_new")
+                yield url
+
+            if new_links == 0:
+                self.progress.seen_pages_in_row += 1
+            else:
+                self.progress.seen_pages_in_row = 0
+
+    def iter_refresh_urls(self, seen_urls: SeenUrlStore, skip_urls: set[str]) -> Iterator[str]:
+        seeded = seen_urls.seed_validators()
+        if seeded:
+            print(f"[{self.source_name}] {seeded} URLs vistas entran al calendario de refresh.")
+
+        due = seen_urls.due_for_refresh(self.refresh_schedule, self.refresh_batch_size)
+        print(f"[{self.source_name}] {len(due)} artículos para revisar (tope {self.refresh_batch_size}).")
+        for target in due:
+            # lo que ya se bajó hoy está fresco
+            if canonical_url(target.url) in skip_urls:
+                continue
+            self.refresh_targets[target.url] = target
+            yield target.url
+
+    def should_stop_crawl(self) -> bool:
+        """Corte temprano del modo incremental (solo listados paginados)."""
+        if not self.paginated or self.crawl_mode == "backfill":
+            return False
+
+        p = self.progress
+        if p.seen_pages_in_row >= self.stop_after_seen_pages:
+            print(f"[{self.source_name}] {p.seen_pages_in_row} páginas seguidas sin links nuevos, corto la paginación.")
+            return True
+
+        last = parse_iso_datetime(p.last_published)
+        watermark = parse_iso_datetime(p.watermark)
+        if last is not None and watermark is not None and last < watermark - self.watermark_grace:
+            print(f"[{self.source_name}] Pasé el watermark ({p.watermark}), corto la paginación.")
+            return True
+        return False
+
+    def _track_published(self, article: Article, in_listing_order: bool = True):
+        p = self.progress
+        # los reintentos no siguen el orden del listado: no cuentan para el corte
+        if in_listing_order:
+            p.last_published = article.published_at
+        published = parse_iso_datetime(article.published_at)
+        if published is not None and (
+            p.newest_published is None or published > parse_iso_datetime(p.newest_published)
+        ):
+            p.newest_published = article.published_at
+
+    def save_watermark(self, seen_urls: SeenUrlStore):
+        """Se llama solo si la corrida terminó bien, para no saltear huecos."""
+        p = self.progress
+        newest = parse_iso_datetime(p.newest_published)
+        if newest is None:
+            return
+        watermark = parse_iso_datetime(p.watermark)
+        if watermark is None or newest > watermark:
+            seen_urls.set_state("watermark", p.newest_published)
+
+    def _accept_done(
+        self,
+        pending: deque[tuple[str, Future[Article | None]]],
+        in_flight: set[str],
+        skip_urls: set[str],
+        wait: bool,
+    ) -> Iterator[Article]:
+        """Entrega los resultados de la cabeza de la cola que ya terminaron (o todos si `wait`)."""
+        while pending and (wait or pending[0][1].done()):
+            url, fut = pending.popleft()
+            article = fut.result()
+            in_flight.discard(url)
+            if article is not None:
+                skip_urls.add(url)
+                self._track_published(article, in_listing_order=url not in self.retry_urls)
+                yield article
+
+    @contextmanager
+    def run_resources(self) -> Iterator[None]:
+        """
+        Circuit breaker, cliente HTTP, filtro de requests y contexto del pool
+        de navegadores de una corrida (iter_articles o un worker del frontier).
+        """
+        self.breaker = CircuitBreaker(self.breaker_failure_threshold, self.breaker_cooldown)
+        self.fetch_validators = {}
+
+        # el refresh necesita el cliente HTTP para los pedidos condicionales
+        if self.static_page_types or self.crawl_mode == "refresh":
+            pool_size = self.max_concurrency + 1
+            adapter = self.replay.adapter(pool_size) if self.replay is not None else None
+            self.static_fetcher = StaticFetcher(pool_size=pool_size, adapter=adapter)
+
+        self.resource_filter = ResourceFilter(self.needed_resource_types)
+
+        # Chromium calientes compartidos con las demás corridas del proceso;
+        # run() reserva sus lugares en el tope global mientras dure la corrida
+        self.browser_pool = get_browser_pool(self.max_concurrency)
+        self.context_profile = self.new_context_profile()
+        try:
+            with self.browser_pool.run(self.context_profile):
+                yield
+        finally:
+            self.browser_pool = None
+            self.context_profile = None
+            if self.static_fetcher is not None:
+                self.static_fetcher.close()
+                self.static_fetcher = None
+            self.breaker = None
+
+    def iter_articles(self, seen_urls: SeenUrlStore, skip_urls: set[str]) -> Iterator[Article]:
+        """
+        Genera los artículos nuevos a medida que se extraen, sin acumularlos.
+
+        En modo concurrente las URLs se mandan al pool en el orden del
+        listado y los resultados se entregan en ese mismo orden, así que la
+        secuencia de Article es igual a la de una corrida secuencial.
+        `skip_urls` se actualiza con cada URL entregada.
+        """
+        pending: deque[tuple[str, Future[Article | None]]] = deque()
+        in_flight: set[str] = set()
+        self.progress = CrawlProgress(watermark=seen_urls.get_state("watermark"))
+        self.seen_urls = seen_urls
+        self.retry_queue = RetryQueue(self.retry_queue_file)
+        self.retry_urls = set()
+        self.refresh_targets = {}
+        self.unchanged = []
+
+        with self.run_resources():
+            try:
+                for url in self.iter_new_urls(seen_urls, skip_urls, in_flight):
+                    in_flight.add(url)
+                    pending.append((url, self.submit_article(url)))
+                    # entregar lo que ya terminó sin romper el orden
+                    yield from self._accept_done(pending, in_flight, skip_urls, wait=False)
+
+                yield from self._accept_done(pending, in_flight, skip_urls, wait=True)
+            finally:
+                # si la corrida se corta, lo que quedó en cola no se procesa
+                for _, fut in pending:
+                    fut.cancel()
+                for _, fut in pending:
+                    if not fut.cancelled():
+                        fut.exception()
+                if self.unchanged:
+                    seen_urls.mark_checked(self.unchanged)
+                    print(f"[{self.source_name}] {len(self.unchanged)} artículos revisados sin cambios.")
+                self.seen_urls = None
+                self.retry_queue.save()
+                if len(self.retry_queue):
+                    print(f"[{self.source_name}] {len(self.retry_queue)} URLs en la cola de reintentos ({self.retry_queue_file}).")
+                self.retry_queue = None
 
-    def save_global_seen_urls(self, urls: set[str]):
-        with self.seen_urls_file.open("w", encoding="utf-8-sig") as f:
-            for u in sorted(urls):
-                f.write(u + "\n")   
     # ---------- Método principal de ejecución ----------
 
-    def run(self) -> list[Article]:
+    def save_article(
+        self,
+        article: Article,
+        sink: ArticleSink,
+        dedup: NearDuplicateIndex | None,
+        seen_urls: SeenUrlStore,
+    ) -> bool:
+        """Escribe el artículo salvo que sea casi duplicado de uno ya guardado."""
+        match = dedup.check_and_add(article) if dedup is not None else None
+        if match is not None:
+            dup_url, similarity = match
+            print(f"[{self.source_name}] Casi duplicado ({similarity:.0%}) de {dup_url}, no se guarda: {article.url}")
+            self.count("near_duplicates")
+            # se marca como vista para no volver a bajarla cada día
+            seen_urls.add(canonical_url(article.url))
+            seen_urls.save_validators([self.validators_for(article)])
+            return False
+        with self.phase("save"):
+            sink.write(article)
+        return True
+
+    def run(self) -> int:
+        """
+        Scrapea la fuente y va guardando cada artículo a medida que sale.
+        Devuelve cuántos artículos nuevos se guardaron.
+        """
         output_file = self.get_output_file_for_today()
         existing_urls_today = self.load_existing_urls(output_file)
-        # NUEVO: URLs globales vistas (hoy + días anteriores)
-        global_seen_urls = self.load_global_seen_urls()
-
-        collected: list[Article] = []
-
-        with sync_playwright() as pw:
-            browser = pw.chromium.launch(headless=True)
-            context = browser.new_context()
-            context.set_default_timeout(15000)
-            page = context.new_page()
-
-            for start_url in self.start_urls:
-                print(f"[{self.source_name}] Listado: {start_url}")
-                try:
-                    page.goto(start_url, wait_until="domcontentloaded", timeout=30000)
-                except PlaywrightTimeoutError:
-                    print(f"[{self.source_name}] Timeout cargando listado {start_url}, lo salto.")
-                    continue
 
-                links = list(self.extract_article_links(page))
-                print(f"[{self.source_name}] Encontrados {len(links)} links en listado.")
+        self.metrics = ScraperMetrics(self.source_name, self.get_metrics_file_for_today())
+        server = MetricsServer(self.metrics, self.metrics_port).start() if self.metrics_port is not None else None
 
-                total = len(links)
+        try:
+            # NUEVO: URLs globales vistas (hoy + días anteriores), indexadas en disco
+            with self.open_seen_store() as global_seen_urls, \
+                    self.open_dedup_index() as dedup, \
+                    self.open_sink(output_file, global_seen_urls) as sink:
+                for article in self.iter_articles(global_seen_urls, existing_urls_today):
+                    self.save_article(article, sink, dedup, global_seen_urls)
 
-                for idx, raw_url in enumerate(links, start=1):
-                    url = self.normalize_url(raw_url)
+                # la corrida terminó sin excepción: recién ahora avanza el watermark
+                with self.phase("save"):
+                    sink.flush()
+                self.save_watermark(global_seen_urls)
+                self.count("articles_saved", sink.written)
+        finally:
+            # el resumen se escribe también si la corrida se corta
+            self.metrics.finish()
+            self.metrics.write_summary()
+            self.metrics.close()
+            if server is not None:
+                server.stop()
 
-                    # evitar duplicados globales (días anteriores)
-                    if url in global_seen_urls:
-                        print(f"[{self.source_name}] ({idx}/{total}) Ya visto antes, skip: {url}")
-                        continue
+        destination = self.parquet_dir if self.output_format == "parquet" else output_file
+        print(f"[{self.source_name}] Guardados {sink.written} artículos nuevos en {destination}")
+        self.resource_filter.print_summary(self.source_name)
+        self.metrics.print_summary()
+        return sink.written
 
-                    print(f"[{self.source_name}] ({idx}/{total}) Procesando: {url}")
+    # ---------- Frontier compartido (varios procesos o máquinas) ----------
 
-                    article_page = context.new_page()
-                    try:
-                        article_page.goto(url, wait_until="domcontentloaded", timeout=15000)
-                        article = self.extract_article_data(article_page, url)
-                    except PlaywrightTimeoutError:
-                        print(f"[{self.source_name}] Timeout al abrir {url}, lo salto.")
-                        article_page.close()
-                        continue
-                    except Exception as ex:
-                        print(f"[{self.source_name}] Error abriendo {url}: {ex}")
-                        article_page.close()
-                        continue
-                    finally:
-                        article_page.close()
+    def discover(self, frontier: Frontier) -> int:
+        """
+        Solo descubrimiento: recorre los listados y encola en `frontier` las
+        URLs nuevas, sin abrir artículos (ver base/frontier.py). Sin
+        published_at no hay corte por watermark; el corte por páginas
+        seguidas sin links nuevos sí aplica (lo ya encolado cuenta como visto).
+        Devuelve cuántas URLs encoló.
+        """
+        if self.crawl_mode == "refresh":
+            raise ValueError("El modo refresh no usa el frontier")
 
-                    if article is None:
-                        print(f"[{self.source_name}] Sin datos válidos en {url}, lo salto.")
-                        continue
+        skip_urls = self.load_existing_urls(self.get_output_file_for_today())
+        self.progress = CrawlProgress()
+        self.retry_queue = RetryQueue(self.retry_queue_file)
+        self.retry_urls = set()
+        pushed = 0
+        with self.open_seen_store() as seen_urls, self.run_resources():
+            try:
+                for url in self.iter_new_urls(seen_urls, skip_urls, in_flight=frontier):
+                    pushed += frontier.push(self.source_name, [url])
+                    # desde acá los reintentos los maneja el frontier
+                    self.retry_queue.done(url)
+            finally:
+                self.retry_queue.save()
+                self.retry_queue = None
+        print(f"[{self.source_name}] {pushed} URLs nuevas en el frontier.")
+        return pushed
 
-                    existing_urls_today.add(url)
-                    global_seen_urls.add(url)
-                    collected.append(article)
+    def _work_one(self, url: str, borrow_page: BorrowPage) -> Article | None:
+        """Como fetch_article, pero las fallas se propagan para reportarlas al frontier."""
+        article = self.call_with_retries(url, lambda: self._fetch_article_once(url, borrow_page))
+        if article is None:
+            print(f"[{self.source_name}] Sin datos válidos en {url}, lo salto.")
+            self.count("articles_empty")
+        else:
+            self.count("articles_extracted")
+        return article
 
-            browser.close()
+    def work(
+        self,
+        frontier: Frontier,
+        worker_id: str | None = None,
+        lease_seconds: float = 300.0,
+        idle_timeout: float = 0.0,
+        poll_interval: float = 2.0,
+    ) -> int:
+        """
+        Worker del frontier: toma hasta `max_concurrency` URLs de esta fuente
+        con un lease, las extrae con el pool de navegadores (mismos
+        reintentos y circuit breaker que run()) y reporta cada resultado.
+        `lease_seconds` tiene que alcanzar para un lote con sus reintentos;
+        si el worker muere, al vencer el lease otro retoma esas URLs.
+
+        Termina cuando no queda nada en cola ni tomado por otros workers
+        durante `idle_timeout` segundos (más que 0 si el descubrimiento
+        sigue corriendo en otro lado). Devuelve cuántos artículos reportó.
+        """
+        if self.crawl_mode == "refresh":
+            raise ValueError("El modo refresh no usa el frontier")
 
-        self.save_articles(output_file, collected)
-        self.save_global_seen_urls(global_seen_urls)
+        worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.metrics = ScraperMetrics(self.source_name)
+        reported = 0
+        idle_since: float | None = None
+
+        with self.run_resources():
+            while True:
+                self.wait_for_breaker()
+                leases = frontier.lease(self.source_name, worker_id, self.max_concurrency, lease_seconds)
+                if not leases:
+                    if frontier.has_pending(self.source_name):
+                        # hay URLs tomadas por otros workers o esperando su backoff
+                        idle_since = None
+                    else:
+                        idle_since = idle_since if idle_since is not None else time.monotonic()
+                        if time.monotonic() - idle_since >= idle_timeout:
+                            break
+                    time.sleep(poll_interval)
+                    continue
 
-        print(f"[{self.source_name}] Guardados {len(collected)} artículos nuevos en {output_file}")
-        return collected
+                idle_since = None
+                submitted: list[tuple[Lease, Future[Article | None]]] = [
+                    (lease, self.browser_pool.submit(
+                        self.context_profile,
+                        lambda borrow_page, url=lease.url: self._work_one(url, borrow_page),
+                    ))
+                    for lease in leases
+                ]
+                for lease, fut in submitted:
+                    try:
+                        article = fut.result()
+                    except Exception as ex:
+                        print(f"[{self.source_name}] Error abriendo {lease.url} (intento {lease.attempts}): {ex}")
+                        self.count("articles_failed")
+                        frontier.fail(lease, f"{type(ex).__name__}: {ex}")
+                        continue
+                    if not frontier.complete(lease, article):
+                        print(f"[{self.source_name}] Se venció el lease de {lease.url}, lo retoma otro worker.")
+                        self.count("leases_lost")
+                    elif article is not None:
+                        reported += 1
+
+        self.metrics.finish()
+        print(f"[{self.source_name}] Worker {worker_id}: {reported} artículos reportados.")
+        self.metrics.print_summary()
+        return reported
+
+    def collect_frontier(self, frontier: Frontier, batch_size: int = 100) -> int:
+        """
+        Coordinador: guarda los artículos que reportaron los workers, con el
+        mismo filtro de casi-duplicados y checkpoint de URLs vistas que run().
+        Se marcan como guardados en el frontier recién después del flush; si
+        el proceso se corta en el medio, los ya vistos se saltean al reintentar.
+        El watermark avanza solo si no queda nada en cola ni tomado (como en
+        run(), para no saltear huecos). Devuelve cuántos artículos guardó.
+        """
+        output_file = self.get_output_file_for_today()
+        with self.open_seen_store() as seen_urls, \
+                self.open_dedup_index() as dedup, \
+                self.open_sink(output_file, seen_urls) as sink:
+            self.progress = CrawlProgress(watermark=seen_urls.get_state("watermark"))
+            while True:
+                articles = frontier.results(self.source_name, batch_size)
+                if not articles:
+                    break
+                for article in articles:
+                    # los workers no siguen el orden del listado
+                    self._track_published(article, in_listing_order=False)
+                    if canonical_url(article.url) in seen_urls:
+                        continue
+                    self.save_article(article, sink, dedup, seen_urls)
+                sink.flush()
+                frontier.mark_saved(art.url for art in articles)
+            if not frontier.has_pending(self.source_name):
+                self.save_watermark(seen_urls)
 
+        counts = frontier.counts(self.source_name)
+        destination = self.parquet_dir if self.output_format == "parquet" else output_file
+        print(
+            f"[{self.source_name}] Guardados {sink.written} artículos del frontier en {destination} "
+            f"(en cola: {counts['queued']}, tomadas: {counts['leased']}, fallidas: {counts['failed']})"
+        )
+        return sink.written
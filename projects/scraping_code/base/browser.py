@@ -0,0 +1,12 @@
+from __future__ import annotations
+
+# Perfil liviano: sin extensiones, sin tráfico de fondo y sin audio
+LIGHT_LAUNCH_ARGS = [
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--mute-audio",
+    "--no-first-run",
+]
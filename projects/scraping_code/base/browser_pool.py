@@ -0,0 +1,402 @@
+"""
+Pool de Chromium "calientes" compartido por todos los scrapers del proceso.
+
+Antes cada corrida lanzaba su propio Playwright + Chromium (uno para el
+listado y uno por worker) y los cerraba al terminar, así que correr varias
+fuentes seguidas pagaba el arranque una y otra vez.
+
+`BrowserPool` mantiene N hilos de larga vida, cada uno con su Chromium
+(la API sync de Playwright no se puede compartir entre hilos). Los
+scrapers mandan trabajos con `submit(profile, fn)`: `fn` recibe un
+`borrow_page()` (context manager, la misma interfaz que usa
+BaseNewsScraper.fetch_article) y se ejecuta en uno de esos hilos.
+
+- Chromium se lanza recién con la primera página pedida (un scraper que
+  resuelve todo por HTTP nunca abre navegador) y queda abierto para las
+  corridas siguientes.
+- Cada corrida usa su propio BrowserContext (opciones y route handlers
+  del scraper), descrito por un `ContextProfile`, dentro de `pool.run()`.
+- La página del contexto se recicla entre artículos: antes de volver al
+  pool se lleva a about:blank y se borran cookies y storage. Si un uso
+  termina con excepción (o el reseteo falla) se descarta y la próxima vez
+  se crea otra.
+- Tras `max_pages_per_context` páginas el contexto se cierra y se crea
+  uno nuevo: así la memoria (caché, cookies, storage) no crece sin límite.
+
+Con tope global de navegadores (base/limits.py, procesos de run_parallel
+y run_frontier) `run()` reserva de una vez un lugar por hilo del pool y
+los devuelve al terminar la última corrida del proceso, después de cerrar
+los Chromium: un proceso que quedó ocioso en el executor no retiene
+lugares que otras fuentes esperan. Sin tope (un `run()` suelto o
+run_sequential) los Chromium siguen calientes para la corrida siguiente.
+
+`get_browser_pool()` devuelve el pool del proceso y lo agranda si hace
+falta; `close_browser_pool()` lo cierra antes de tiempo (p. ej. para medir
+la memoria de los Chromium cuando ya terminaron).
+"""
+from __future__ import annotations
+
+import itertools
+import queue
+import threading
+from concurrent.futures import Future
+from contextlib import ExitStack, contextmanager
+from dataclasses import dataclass, field
+from multiprocessing import util as mp_util
+from typing import Callable, ContextManager, Iterator, TypeVar
+
+from playwright.sync_api import Browser, BrowserContext, Page, Playwright, sync_playwright
+
+from base import limits
+from base.browser import LIGHT_LAUNCH_ARGS
+
+T = TypeVar("T")
+BorrowPage = Callable[[], ContextManager[Page]]
+
+# prioridades de la cola: los listados pasan delante de los artículos
+# encolados para que el recorrido de páginas no se frene
+_CONTROL_PRIORITY = -1
+LISTING_PRIORITY = 0
+ARTICLE_PRIORITY = 1
+_SHUTDOWN_PRIORITY = 2
+
+
+@dataclass(frozen=True)
+class ContextProfile:
+    """Cómo crear el BrowserContext de una corrida (una por scraper y run())."""
+    key: str
+    options: dict = field(default_factory=dict, hash=False, compare=False)
+    on_context: Callable[[BrowserContext], None] | None = field(default=None, hash=False, compare=False)
+    default_timeout: int = 15000
+
+
+class _CloseBrowser:
+    """Trabajo de control: el hilo que lo toma cierra su Chromium y espera a los demás."""
+
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+
+
+class _ContextSlot:
+    def __init__(self, context: BrowserContext, js_enabled: bool = True):
+        self.context = context
+        # sin JS los scripts de la página no pueden escribir storage
+        self.js_enabled = js_enabled
+        self.page: Page | None = None
+        self.pages_served = 0
+
+
+class _Worker:
+    """Estado de un hilo del pool; solo se toca desde ese hilo."""
+
+    def __init__(self, pool: BrowserPool, name: str):
+        self.pool = pool
+        self._pw: Playwright | None = None
+        self._browser: Browser | None = None
+        self._contexts: dict[str, _ContextSlot] = {}
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    # ---------- navegador y contextos ----------
+
+    def _ensure_browser(self) -> Browser:
+        if self._browser is None:
+            # el lugar en el tope global lo reservó BrowserPool.run para todo el pool
+            try:
+                self._pw = sync_playwright().start()
+                self._browser = self._pw.chromium.launch(headless=True, args=self.pool.launch_args)
+            except BaseException:
+                # el error le llega al Future del trabajo; el hilo sigue vivo
+                # y el próximo trabajo vuelve a intentar el arranque
+                self._shutdown()
+                raise
+        return self._browser
+
+    def _new_slot(self, profile: ContextProfile) -> _ContextSlot:
+        context = self._ensure_browser().new_context(**profile.options)
+        context.set_default_timeout(profile.default_timeout)
+        if profile.on_context is not None:
+            profile.on_context(context)
+        return _ContextSlot(context, js_enabled=profile.options.get("java_script_enabled", True))
+
+    def _close_slot(self, key: str):
+        slot = self._contexts.pop(key, None)
+        if slot is not None:
+            slot.context.close()
+
+    @contextmanager
+    def borrow_page(self, profile: ContextProfile) -> Iterator[Page]:
+        slot = self._contexts.get(profile.key)
+        if slot is not None and slot.pages_served >= self.pool.max_pages_per_context:
+            # reinicio periódico del contexto para acotar la memoria
+            self._close_slot(profile.key)
+            slot = None
+        if slot is None:
+            slot = self._contexts[profile.key] = self._new_slot(profile)
+
+        if slot.page is None or slot.page.is_closed():
+            slot.page = slot.context.new_page()
+        slot.pages_served += 1
+        try:
+            yield slot.page
+        except BaseException:
+            # la página puede haber quedado a mitad de navegación: no se recicla
+            self._discard_page(slot)
+            raise
+        else:
+            try:
+                self._reset_page(slot)
+            except Exception:
+                self._discard_page(slot)
+
+    def _reset_page(self, slot: _ContextSlot):
+        """Deja la página limpia para el próximo artículo: sin storage, cookies ni documento."""
+        page = slot.page
+        if slot.js_enabled:
+            # el storage es del origen actual: se borra antes de salir de él
+            page.evaluate("() => { try { localStorage.clear(); sessionStorage.clear(); } catch (e) {} }")
+        page.goto("about:blank")
+        slot.context.clear_cookies()
+
+    def _discard_page(self, slot: _ContextSlot):
+        page, slot.page = slot.page, None
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def _close_browser(self):
+        for key in list(self._contexts):
+            self._close_slot(key)
+        if self._browser is not None:
+            self._browser.close()
+        if self._pw is not None:
+            self._pw.stop()
+        self._pw = self._browser = None
+
+    def _drop_released(self):
+        for key in [k for k in self._contexts if k in self.pool.released_profiles()]:
+            try:
+                self._close_slot(key)
+            except Exception as ex:
+                # un contexto que no cierra (Chromium caído) no puede matar al hilo
+                print(f"[browser-pool] No se pudo cerrar el contexto {key}: {ex}")
+
+    # ---------- loop ----------
+
+    def _run(self):
+        error: BaseException | None = None
+        fut: Future | None = None
+        try:
+            while True:
+                fut = None
+                try:
+                    _, _, job = self.pool.jobs.get(timeout=5)
+                except queue.Empty:
+                    self._drop_released()
+                    continue
+                if job is None:
+                    break
+                if isinstance(job, _CloseBrowser):
+                    self._run_close_browser(job)
+                    continue
+
+                profile, fn, fut = job
+                if not fut.set_running_or_notify_cancel():
+                    continue
+                try:
+                    self._drop_released()
+                    fut.set_result(fn(lambda: self.borrow_page(profile)))
+                except BaseException as ex:
+                    fut.set_exception(ex)
+        except BaseException as ex:
+            error = ex
+            # el trabajo que ya se sacó de la cola no puede quedar sin respuesta
+            if fut is not None and not fut.done():
+                if fut.running() or fut.set_running_or_notify_cancel():
+                    fut.set_exception(ex)
+            raise
+        finally:
+            try:
+                self._shutdown()
+            finally:
+                self.pool.worker_exited(self, error)
+
+    def _run_close_browser(self, job: _CloseBrowser):
+        try:
+            self._close_browser()
+        except Exception as ex:
+            print(f"[browser-pool] No se pudo cerrar Chromium en {self.thread.name}: {ex}")
+            self._pw = self._browser = None
+            self._contexts.clear()
+        try:
+            # hasta que todos cerraron: así cada hilo toma un solo trabajo de control
+            job.barrier.wait(timeout=_CLOSE_TIMEOUT)
+        except threading.BrokenBarrierError:
+            pass
+
+    def _shutdown(self):
+        self._close_browser()
+
+
+class BrowserPool:
+    """
+    Uso:
+        pool = get_browser_pool(size=4)
+        profile = ContextProfile("kotaku-1", options={...}, on_context=...)
+        with pool.run(profile):     # reserva en el tope global; al salir, release(profile)
+            fut = pool.submit(profile, lambda borrow_page: fetch(url, borrow_page))
+            ...
+    """
+
+    def __init__(self, size: int = 1, launch_args: list[str] | None = None, max_pages_per_context: int = 200):
+        self.launch_args = launch_args if launch_args is not None else LIGHT_LAUNCH_ARGS
+        self.max_pages_per_context = max_pages_per_context
+        self.jobs: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._released: set[str] = set()
+        self._workers: list[_Worker] = []
+        self._closed = False
+        # último error que mató a un hilo (para los Future que quedan sin atender)
+        self._dead_error: BaseException | None = None
+        # corridas en curso y lugares del tope global que tienen reservados
+        self._active_runs = 0
+        self._reserved = 0
+        self._reservation = ExitStack()
+        self._run_lock = threading.Lock()
+        self.grow(size)
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def grow(self, size: int):
+        """Agrega hilos hasta tener `size` (nunca achica)."""
+        with self._lock:
+            while len(self._workers) < size:
+                self._workers.append(_Worker(self, name=f"browser-pool-{len(self._workers)}"))
+
+    def submit(self, profile: ContextProfile, fn: Callable[[BorrowPage], T], priority: int = ARTICLE_PRIORITY) -> Future[T]:
+        if self._closed:
+            raise RuntimeError("BrowserPool cerrado")
+        fut: Future[T] = Future()
+        with self._lock:
+            if not any(w.thread.is_alive() for w in self._workers):
+                raise RuntimeError(f"BrowserPool sin hilos vivos: {self._dead_error}")
+            self.jobs.put((priority, next(self._seq), (profile, fn, fut)))
+        return fut
+
+    def worker_exited(self, worker: _Worker, error: BaseException | None):
+        """
+        Un hilo salió (píldora o error inesperado). Si era el último vivo,
+        lo que quedó en cola nunca se va a atender: esos Future reciben el
+        error en vez de dejar colgado a quien espera `fut.result()`.
+        """
+        with self._lock:
+            if error is not None:
+                self._dead_error = error
+                print(f"[browser-pool] El hilo {worker.thread.name} terminó con error: {error!r}")
+            if any(w is not worker and w.thread.is_alive() for w in self._workers):
+                return
+            pending = []
+            while True:
+                try:
+                    _, _, job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if isinstance(job, tuple):
+                    pending.append(job[2])
+                elif isinstance(job, _CloseBrowser):
+                    job.barrier.abort()
+        for fut in pending:
+            if fut.set_running_or_notify_cancel():
+                fut.set_exception(RuntimeError(f"BrowserPool sin hilos vivos: {self._dead_error}"))
+
+    @contextmanager
+    def run(self, profile: ContextProfile) -> Iterator[None]:
+        """
+        Una corrida con `profile`. Con tope global de navegadores, la
+        primera corrida reserva de una vez un lugar por hilo del pool (sin
+        quedarse con una parte esperando el resto) y la última, al salir,
+        cierra los Chromium y devuelve los lugares.
+        """
+        with self._run_lock:
+            if self._reserved < self.size:
+                # otra corrida del proceso agrandó el pool: se reserva lo que falta
+                self._reservation.enter_context(limits.browser_slots(self.size - self._reserved))
+                self._reserved = self.size
+            self._active_runs += 1
+        try:
+            yield
+        finally:
+            self.release(profile)
+            with self._run_lock:
+                self._active_runs -= 1
+                if self._active_runs == 0 and self._reserved:
+                    if limits.browsers_capped():
+                        self.close_browsers()
+                    self._reservation.close()
+                    self._reserved = 0
+
+    def close_browsers(self):
+        """Cada hilo cierra su Chromium (y sus contextos); vuelve cuando todos terminaron."""
+        workers = [w for w in self._workers if w.thread.is_alive()]
+        if not workers:
+            return
+        barrier = threading.Barrier(len(workers) + 1)
+        for _ in workers:
+            self.jobs.put((_CONTROL_PRIORITY, next(self._seq), _CloseBrowser(barrier)))
+        try:
+            barrier.wait(timeout=_CLOSE_TIMEOUT)
+        except threading.BrokenBarrierError:
+            print("[browser-pool] No todos los hilos cerraron su Chromium a tiempo.")
+
+    def release(self, profile: ContextProfile):
+        """La corrida terminó: cada hilo cierra su contexto de `profile` cuando se libera."""
+        with self._lock:
+            self._released.add(profile.key)
+
+    def released_profiles(self) -> frozenset[str]:
+        with self._lock:
+            return frozenset(self._released)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        # una "píldora" por hilo, detrás de todo lo que ya está en cola
+        for _ in self._workers:
+            self.jobs.put((_SHUTDOWN_PRIORITY, next(self._seq), None))
+        for w in self._workers:
+            w.thread.join()
+
+
+# espera máxima para que todos los hilos cierren su Chromium al quedar ocioso el pool
+_CLOSE_TIMEOUT = 60.0
+
+_pool: BrowserPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool(size: int = 1) -> BrowserPool:
+    """Pool del proceso (se crea la primera vez y se cierra al salir)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(size)
+            # Finalize y no atexit: los procesos hijos de run_scrapers salen
+            # con os._exit y solo corren los finalizadores de multiprocessing
+            mp_util.Finalize(None, _pool.close, exitpriority=10)
+        else:
+            _pool.grow(size)
+        return _pool
+
+
+def close_browser_pool():
+    """Cierra el pool del proceso (hilos, Chromium y driver de Playwright); el próximo get crea otro."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
@@ -0,0 +1,379 @@
+"""
+Índice consultable de todo el corpus de data/raw (`<fuente>_<fecha>.csv`).
+
+Los CSV diarios son cómodos para escribir pero no para buscar: la única
+lectura que había (`load_existing_urls`) recorre un archivo entero solo
+para juntar URLs. `CorpusIndex` los carga en un SQLite aparte
+(data/meta/corpus.sqlite por defecto) con:
+
+- tabla `articles` (una fila por URL) con índices por `source` y por
+  `published_utc` (published_at normalizado a UTC, comparable como texto)
+- índice de texto completo FTS5 sobre `title` y `text`, mantenido con
+  triggers (tabla de contenido externo: el texto no se guarda dos veces)
+- tabla `corpus_files` con tamaño y mtime de cada CSV ya cargado
+
+`ingest` parsea en paralelo (un proceso por archivo) solo los CSV nuevos
+o que cambiaron desde la última vez (el del día sigue creciendo mientras
+corre el scraper) y escribe todo desde el proceso principal. Una URL que
+aparece en varios archivos queda con la versión de `created_at` más nuevo;
+la misma versión leída de nuevo reemplaza a la anterior si cambió su texto
+(una fila leída mientras se escribía).
+
+Uso desde consola (desde scraping_code/):
+    python -m base.corpus ingest
+    python -m base.corpus search "zelda NOT dlc" --source kotaku-reviews --since 2025-11-01
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import multiprocessing
+import os
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from base.base_models import canonical_url, parse_iso_datetime
+
+DEFAULT_DB = Path("data/meta/corpus.sqlite")
+DEFAULT_RAW_DIR = Path("data/raw")
+
+# reviews largas pueden pasar el límite por defecto del módulo csv (128 KB)
+_CSV_FIELD_LIMIT = 16 * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    doc_id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    id TEXT,
+    source TEXT NOT NULL COLLATE NOCASE,
+    title TEXT,
+    published_at TEXT,
+    published_utc TEXT,
+    text TEXT,
+    created_at TEXT,
+    fingerprint TEXT,
+    file TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, published_utc);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_utc);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, text,
+    content='articles', content_rowid='doc_id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts (rowid, title, text) VALUES (new.doc_id, new.title, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, text)
+    VALUES ('delete', old.doc_id, old.title, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts (articles_fts, rowid, title, text)
+    VALUES ('delete', old.doc_id, old.title, old.text);
+    INSERT INTO articles_fts (rowid, title, text) VALUES (new.doc_id, new.title, new.text);
+END;
+
+CREATE TABLE IF NOT EXISTS corpus_files (
+    file TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%S', 'now'))
+) WITHOUT ROWID;
+"""
+
+# la versión más nueva de una URL (por created_at) pisa a la anterior;
+# volver a leer el mismo archivo no toca nada (ni el índice FTS)
+_UPSERT = """
+INSERT INTO articles
+    (url, id, source, title, published_at, published_utc, text, created_at, fingerprint, file)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (url) DO UPDATE SET
+    id = excluded.id,
+    source = excluded.source,
+    title = excluded.title,
+    published_at = excluded.published_at,
+    published_utc = excluded.published_utc,
+    text = excluded.text,
+    created_at = excluded.created_at,
+    fingerprint = excluded.fingerprint,
+    file = excluded.file
+WHERE excluded.created_at > articles.created_at
+    -- misma versión leída de nuevo: si el texto cambió es que la carga
+    -- anterior agarró la fila a medio escribir
+    OR (excluded.created_at = articles.created_at
+        AND (excluded.text IS NOT articles.text OR excluded.fingerprint IS NOT articles.fingerprint))
+"""
+
+_UTC_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def _to_utc_text(value: str | None) -> str | None:
+    dt = parse_iso_datetime(value)
+    return dt.strftime(_UTC_FORMAT) if dt is not None else None
+
+
+def read_corpus_file(path: str) -> list[tuple]:
+    """
+    Filas de un CSV listas para `_UPSERT`. Corre en los procesos del pool,
+    así que solo recibe y devuelve tipos simples.
+    """
+    csv.field_size_limit(_CSV_FIELD_LIMIT)
+    name = Path(path).name
+    rows = []
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        for row in csv.DictReader(f):
+            url = row.get("url")
+            if not url:
+                continue
+            # línea cortada (el scraper todavía la está escribiendo): le
+            # faltan columnas; entra en la próxima carga, cuando el archivo crezca
+            if None in row.values():
+                continue
+            rows.append((
+                # las variantes de una URL (tracking, fragmento) son la misma fila
+                canonical_url(url),
+                row.get("id"),
+                row.get("source") or "",
+                row.get("title"),
+                row.get("published_at"),
+                _to_utc_text(row.get("published_at")),
+                row.get("text"),
+                row.get("created_at") or "",
+                row.get("fingerprint"),
+                name,
+            ))
+    return rows
+
+
+@dataclass
+class CorpusHit:
+    url: str
+    source: str
+    title: str
+    published_at: str | None
+    # fragmento del texto con los términos marcados entre [ ] (solo con `text`)
+    snippet: str | None = None
+
+
+def _bound(value: str | date | datetime | None, end: bool = False) -> str | None:
+    """
+    Límite de un rango de fechas como texto UTC. Una fecha sola como `end`
+    incluye ese día entero (se compara contra el día siguiente).
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if len(value) == 10:
+            value = date.fromisoformat(value)
+        else:
+            parsed = parse_iso_datetime(value)
+            if parsed is None:
+                raise ValueError(f"Fecha inválida: {value}")
+            value = parsed
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+        if end:
+            value += timedelta(days=1)
+    elif value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime(_UTC_FORMAT)
+
+
+class CorpusIndex:
+    """
+    Uso:
+        with CorpusIndex() as corpus:
+            corpus.ingest("data/raw")
+            hits = corpus.search("zelda", source="Kotaku-Reviews", since="2025-11-01")
+    """
+
+    def __init__(self, path: str | Path = DEFAULT_DB):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    # ---------- carga ----------
+
+    def pending_files(self, raw_dir: str | Path = DEFAULT_RAW_DIR) -> list[Path]:
+        """CSV que no están cargados o cambiaron (tamaño o mtime) desde la última carga."""
+        known = {
+            file: (size, mtime_ns)
+            for file, size, mtime_ns in self.conn.execute("SELECT file, size, mtime_ns FROM corpus_files")
+        }
+        pending = []
+        for path in sorted(Path(raw_dir).glob("*.csv")):
+            st = path.stat()
+            if known.get(path.name) != (st.st_size, st.st_mtime_ns):
+                pending.append(path)
+        return pending
+
+    def ingest(self, raw_dir: str | Path = DEFAULT_RAW_DIR, workers: int | None = None) -> int:
+        """
+        Carga los CSV pendientes de `raw_dir`; devuelve cuántas filas leyó.
+        Cada archivo se parsea en su propio proceso y se escribe en una
+        transacción, así un corte a mitad de camino deja cargados los
+        archivos que ya terminaron.
+        """
+        files = self.pending_files(raw_dir)
+        if not files:
+            return 0
+        # el stat se toma antes de leer: si el archivo crece mientras se
+        # parsea, la próxima carga lo vuelve a ver como pendiente
+        stats = {path: path.stat() for path in files}
+
+        workers = min(len(files), workers or os.cpu_count() or 1)
+        total = 0
+        # spawn, como run_scrapers: los hijos no heredan la conexión SQLite
+        mp_context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as executor:
+            for path, rows in zip(files, executor.map(read_corpus_file, [str(p) for p in files])):
+                st = stats[path]
+                with self.conn:
+                    self.conn.executemany(_UPSERT, rows)
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO corpus_files (file, size, mtime_ns, rows) VALUES (?, ?, ?, ?)",
+                        (path.name, st.st_size, st.st_mtime_ns, len(rows)),
+                    )
+                total += len(rows)
+                print(f"[corpus] {path.name}: {len(rows)} filas")
+        return total
+
+    def optimize(self):
+        """Junta los segmentos del índice FTS (conviene después de cargas grandes)."""
+        with self.conn:
+            self.conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('optimize')")
+
+    # ---------- consultas ----------
+
+    def _where(
+        self,
+        text: str | None,
+        source: str | None,
+        since: str | date | datetime | None,
+        until: str | date | datetime | None,
+    ) -> tuple[str, list]:
+        clauses, params = [], []
+        if text:
+            clauses.append("articles_fts MATCH ?")
+            params.append(text)
+        if source:
+            clauses.append("a.source = ?")
+            params.append(source)
+        if since is not None:
+            clauses.append("a.published_utc >= ?")
+            params.append(_bound(since))
+        if until is not None:
+            clauses.append("a.published_utc < ?")
+            params.append(_bound(until, end=True))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def search(
+        self,
+        text: str | None = None,
+        source: str | None = None,
+        since: str | date | datetime | None = None,
+        until: str | date | datetime | None = None,
+        limit: int = 20,
+    ) -> list[CorpusHit]:
+        """
+        `text` usa la sintaxis de FTS5 ("zelda", "zelda NOT dlc",
+        '"open world"', "title:zelda"). Con `text` los resultados vienen por
+        relevancia (bm25); sin él, del más nuevo al más viejo. El rango de
+        fechas es `since` <= published_at < `until` (una fecha sola en
+        `until` incluye ese día).
+        """
+        where, params = self._where(text, source, since, until)
+        if text:
+            sql = (
+                "SELECT a.url, a.source, a.title, a.published_at,"
+                " snippet(articles_fts, 1, '[', ']', '…', 12)"
+                " FROM articles_fts JOIN articles a ON a.doc_id = articles_fts.rowid"
+                f"{where} ORDER BY bm25(articles_fts) LIMIT ?"
+            )
+        else:
+            sql = (
+                "SELECT a.url, a.source, a.title, a.published_at, NULL FROM articles a"
+                f"{where} ORDER BY a.published_utc DESC LIMIT ?"
+            )
+        return [CorpusHit(*row) for row in self.conn.execute(sql, (*params, limit))]
+
+    def count(
+        self,
+        text: str | None = None,
+        source: str | None = None,
+        since: str | date | datetime | None = None,
+        until: str | date | datetime | None = None,
+    ) -> int:
+        where, params = self._where(text, source, since, until)
+        if text:
+            sql = f"SELECT COUNT(*) FROM articles_fts JOIN articles a ON a.doc_id = articles_fts.rowid{where}"
+        else:
+            sql = f"SELECT COUNT(*) FROM articles a{where}"
+        return self.conn.execute(sql, params).fetchone()[0]
+
+    def sources(self) -> dict[str, int]:
+        return dict(self.conn.execute("SELECT source, COUNT(*) FROM articles GROUP BY source ORDER BY source"))
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Índice de búsqueda sobre los CSV de data/raw")
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_ingest = sub.add_parser("ingest", help="Carga los CSV nuevos o modificados")
+    p_ingest.add_argument("raw_dir", type=Path, nargs="?", default=DEFAULT_RAW_DIR)
+    p_ingest.add_argument("--workers", type=int, default=None)
+
+    p_search = sub.add_parser("search", help="Busca por palabras y/o rango de fechas")
+    p_search.add_argument("text", nargs="?", default=None)
+    p_search.add_argument("--source", default=None)
+    p_search.add_argument("--since", default=None, help="YYYY-MM-DD o ISO 8601")
+    p_search.add_argument("--until", default=None, help="YYYY-MM-DD (inclusive) o ISO 8601")
+    p_search.add_argument("--limit", type=int, default=20)
+
+    args = parser.parse_args()
+    with CorpusIndex(args.db) as corpus:
+        if args.command == "ingest":
+            start = time.perf_counter()
+            rows = corpus.ingest(args.raw_dir, workers=args.workers)
+            if rows:
+                corpus.optimize()
+            print(f"[corpus] {rows} filas leídas en {time.perf_counter() - start:.1f}s, {len(corpus)} artículos en el índice")
+        else:
+            start = time.perf_counter()
+            hits = corpus.search(args.text, args.source, args.since, args.until, args.limit)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            for hit in hits:
+                print(f"{hit.published_at or '-':<26} {hit.source:<18} {hit.title}")
+                print(f"    {hit.url}")
+                if hit.snippet:
+                    print(f"    {hit.snippet}")
+            print(f"[corpus] {len(hits)} resultados en {elapsed_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""
+Detección de casi-duplicados entre artículos (MinHash + LSH).
+
+Reviews sindicadas o republicadas llegan con otra URL, así que el filtro
+de URLs vistas no las detecta. Cada artículo se resume en una firma
+MinHash de sus shingles de palabras; la firma se parte en bandas y cada
+banda se guarda como un "bucket" indexado en SQLite. Buscar candidatos es
+una consulta por banda (índice), no un recorrido de todo el corpus, y
+solo a esos candidatos se les estima la similitud de Jaccard.
+
+El índice vive en disco y se comparte entre fuentes y corridas.
+
+Dependencias: numpy.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import struct
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+import numpy as np
+
+from base.base_models import Article
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_P = np.uint64(_MERSENNE_PRIME)
+_LOW32 = np.uint64(_MAX_HASH)
+_LOW29 = np.uint64((1 << 29) - 1)
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _mod_p(x: np.ndarray) -> np.ndarray:
+    """x mod (2^61 - 1) para x < 2^64: 2^61 ≡ 1, así que se suman los bits altos a los bajos."""
+    x = (x & _P) + (x >> np.uint64(61))
+    return np.where(x >= _P, x - _P, x)
+
+
+def _mulmod_p(a: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    a * x mod (2^61 - 1) con a, x < 2^61, sin pasar de 64 bits: se parte
+    cada factor en mitades de 32 bits y se usa 2^61 ≡ 1 (2^64 ≡ 8).
+    """
+    a_hi, a_lo = a >> np.uint64(32), a & _LOW32
+    x_hi, x_lo = x >> np.uint64(32), x & _LOW32
+    # a_hi * x_hi * 2^64 ≡ 8 * a_hi * x_hi (< 2^61)
+    high = (a_hi * x_hi) << np.uint64(3)
+    # mid * 2^32, con mid = m_hi * 2^29 + m_lo ≡ m_hi + m_lo * 2^32
+    mid = a_hi * x_lo + a_lo * x_hi
+    mid = (mid >> np.uint64(29)) + ((mid & _LOW29) << np.uint64(32))
+    low = _mod_p(a_lo * x_lo)
+    return _mod_p(_mod_p(high + mid) + low)
+
+
+class MinHasher:
+    """
+    Firma MinHash de `num_perm` valores sobre shingles de `shingle_size`
+    palabras. Las permutaciones salen de una semilla fija para que las
+    firmas sean comparables entre procesos y corridas.
+    """
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        perms = [
+            (_hash64(f"{seed}:a:{i}") % _MERSENNE_PRIME or 1, _hash64(f"{seed}:b:{i}") % _MERSENNE_PRIME)
+            for i in range(num_perm)
+        ]
+        # columnas (num_perm, 1): se aplican a todos los shingles de una vez
+        self._a = np.array([a for a, _ in perms], dtype=np.uint64)[:, None]
+        self._b = np.array([b for _, b in perms], dtype=np.uint64)[:, None]
+
+    def shingles(self, text: str) -> set[int]:
+        words = _WORD.findall(text.lower())
+        k = self.shingle_size
+        if len(words) < k:
+            return {_hash64(" ".join(words))} if words else set()
+        return {_hash64(" ".join(words[i:i + k])) for i in range(len(words) - k + 1)}
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        min sobre los shingles de ((a * h + b) mod p) & 0xFFFFFFFF, para las
+        `num_perm` permutaciones a la vez (uint32, mismos bytes que antes).
+        """
+        hashes = self.shingles(text)
+        if not hashes:
+            return np.full(self.num_perm, _MAX_HASH, dtype=np.uint32)
+        h = _mod_p(np.fromiter(hashes, dtype=np.uint64, count=len(hashes)))[None, :]
+        values = _mod_p(_mulmod_p(self._a, h) + self._b) & _LOW32
+        return values.min(axis=1).astype(np.uint32)
+
+    @staticmethod
+    def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+        """Estimación de Jaccard: fracción de posiciones iguales."""
+        return int(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class NearDuplicateIndex:
+    """
+    Índice LSH persistente en SQLite.
+
+    Con 128 permutaciones en 16 bandas de 8 filas, dos textos con Jaccard
+    0.85 caen en al menos un bucket común con probabilidad > 0.99, y los
+    de Jaccard < 0.5 casi nunca. `threshold` decide el corte final.
+    """
+
+    def __init__(self, path: str | Path, threshold: float = 0.85, bands: int = 16, rows: int = 8):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = rows
+        self.hasher = MinHasher(num_perm=bands * rows)
+
+        # timeout: varios procesos (run_scrapers en paralelo) comparten el archivo;
+        # las transacciones se abren a mano (ver _write_transaction)
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS signatures (
+                article_id  TEXT PRIMARY KEY,
+                url         TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                signature   BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_signatures_fingerprint ON signatures (fingerprint);
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band       INTEGER NOT NULL,
+                bucket     INTEGER NOT NULL,
+                article_id TEXT NOT NULL,
+                PRIMARY KEY (band, bucket, article_id)
+            ) WITHOUT ROWID;
+            """
+        )
+
+    @contextmanager
+    def _write_transaction(self) -> Iterator[None]:
+        """
+        BEGIN IMMEDIATE toma el lock de escritura antes de la primera
+        lectura: otro proceso no puede indexar una copia entre la búsqueda
+        y el alta.
+        """
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.conn.execute("COMMIT")
+
+    def _buckets(self, sig: np.ndarray) -> list[tuple[int, int]]:
+        result = []
+        for band in range(self.bands):
+            chunk = sig[band * self.rows:(band + 1) * self.rows]
+            digest = hashlib.blake2b(chunk.tobytes(), digest_size=8).digest()
+            result.append((band, struct.unpack("<q", digest)[0]))
+        return result
+
+    def find_duplicate(self, article: Article, sig: np.ndarray | None = None) -> tuple[str, float] | None:
+        """
+        URL del artículo ya indexado del que `article` es (casi) copia, con
+        su similitud; None si es nuevo. El mismo id nunca cuenta como copia
+        de sí mismo (p. ej. al re-scrapear una URL).
+        """
+        row = self.conn.execute(
+            "SELECT url FROM signatures WHERE fingerprint = ? AND article_id != ? LIMIT 1",
+            (article.fingerprint, article.id),
+        ).fetchone()
+        if row is not None:
+            return row[0], 1.0
+
+        if sig is None:
+            sig = self.hasher.signature(article.text)
+        candidates: set[str] = set()
+        for band, bucket in self._buckets(sig):
+            for (cand_id,) in self.conn.execute(
+                "SELECT article_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            ):
+                if cand_id != article.id:
+                    candidates.add(cand_id)
+
+        best: tuple[str, float] | None = None
+        for cand_id in candidates:
+            url, blob = self.conn.execute(
+                "SELECT url, signature FROM signatures WHERE article_id = ?", (cand_id,)
+            ).fetchone()
+            sim = MinHasher.similarity(sig, np.frombuffer(blob, dtype=np.uint32))
+            if sim >= self.threshold and (best is None or sim > best[1]):
+                best = (url, sim)
+        return best
+
+    def _insert(self, article: Article, sig: np.ndarray):
+        self.conn.execute(
+            "INSERT OR REPLACE INTO signatures (article_id, url, fingerprint, signature) VALUES (?, ?, ?, ?)",
+            (article.id, article.url, article.fingerprint, sig.tobytes()),
+        )
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO lsh_buckets (band, bucket, article_id) VALUES (?, ?, ?)",
+            [(band, bucket, article.id) for band, bucket in self._buckets(sig)],
+        )
+
+    def add(self, article: Article, sig: np.ndarray | None = None):
+        if sig is None:
+            sig = self.hasher.signature(article.text)
+        with self._write_transaction():
+            self._insert(article, sig)
+
+    def check_and_add(self, article: Article) -> tuple[str, float] | None:
+        """
+        find_duplicate + add (si es nuevo) en una sola transacción, calculando
+        la firma una sola vez (fuera del lock).
+        """
+        sig = self.hasher.signature(article.text)
+        with self._write_transaction():
+            match = self.find_duplicate(article, sig)
+            if match is None:
+                self._insert(article, sig)
+        return match
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self) -> NearDuplicateIndex:
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
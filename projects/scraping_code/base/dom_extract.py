@@ -0,0 +1,60 @@
+"""
+Extracción declarativa de campos del DOM en UNA sola llamada.
+
+Con locators, cada `anchors.nth(i).get_attribute("href")`, `count()` o
+`inner_text()` es un viaje de ida y vuelta al navegador. En cambio, un
+scraper describe qué quiere con un spec:
+
+    ARTICLE_SPEC = {
+        "title": Field("h1"),
+        "published_at": Field('meta[property="article:published_time"]', attr="content"),
+        "containers": Field("div.entry-content", count=True),
+        "paragraphs": Field("div.entry-content p", many=True),
+    }
+
+y `extract_fields(page, spec)` lo resuelve todo con un único
+`page.evaluate`. El mismo spec funciona sobre un StaticDocument (fast
+path HTTP), así que los dos caminos comparten selectores.
+"""
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from playwright.sync_api import Page
+
+
+@dataclass(frozen=True)
+class Field:
+    selector: str
+    attr: str | None = None   # None => textContent
+    many: bool = False        # True => lista con todos los matches
+    count: bool = False       # True => solo la cantidad de matches
+
+
+Spec = dict[str, Field]
+
+
+_EXTRACT_JS = """
+(spec) => {
+    const out = {};
+    for (const [name, f] of Object.entries(spec)) {
+        const els = (f.many || f.count)
+            ? Array.from(document.querySelectorAll(f.selector))
+            : [document.querySelector(f.selector)].filter(Boolean);
+        if (f.count) {
+            out[name] = els.length;
+            continue;
+        }
+        const values = els.map(el => f.attr ? el.getAttribute(f.attr) : el.textContent);
+        out[name] = f.many ? values : (values.length ? values[0] : null);
+    }
+    return out;
+}
+"""
+
+
+def extract_fields(page: Page, spec: Spec) -> dict[str, Any]:
+    """Todos los campos del spec en un solo evaluate."""
+    return page.evaluate(_EXTRACT_JS, {name: asdict(f) for name, f in spec.items()})
@@ -0,0 +1,299 @@
+"""
+Frontier de crawl compartido: separa el descubrimiento de URLs (listados)
+de la extracción de artículos, para repartir la extracción entre varios
+procesos o máquinas.
+
+Flujo (ver BaseNewsScraper.discover / work / collect_frontier):
+
+1) discover: recorre los listados y encola las URLs nuevas (`push`)
+2) work: N workers piden URLs con un lease (`lease`), llaman a
+   extract_article_data y reportan el resultado (`complete` / `fail`)
+3) collect: el coordinador toma los artículos reportados (`results`), los
+   pasa por el filtro de casi-duplicados y el sink, y los marca (`mark_saved`)
+
+Estados de una URL: queued -> leased -> done -> saved, o failed tras
+`max_attempts` intentos. Un discover posterior que la vuelve a encontrar
+la pone otra vez en cola con los intentos en cero. Un lease vence a los `lease_seconds`: si el worker
+murió, el próximo `lease` de cualquier otro worker vuelve a tomar la URL.
+Un worker lento cuyo lease venció ya no puede reportarla (el token no
+coincide), así que cada URL se guarda una sola vez.
+
+`Frontier` es la interfaz; `SqliteFrontier` sirve para varios procesos de
+una misma máquina (SQLite en WAL). Para varias máquinas hace falta un
+backend de red que implemente la misma interfaz y se registre con
+`register_backend("redis", factory)`; `open_frontier("redis://...")` lo usa.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable
+
+from base.base_models import Article
+from base.resilience import backoff_delay
+
+STATES = ("queued", "leased", "done", "saved", "failed")
+
+
+@dataclass(frozen=True)
+class Lease:
+    """Una URL tomada por un worker hasta `expires_at` (epoch)."""
+    url: str
+    source: str
+    token: str
+    attempts: int
+    expires_at: float
+
+
+class Frontier(ABC):
+    """Interfaz que usan BaseNewsScraper y run_scrapers."""
+
+    @abstractmethod
+    def push(self, source: str, urls: Iterable[str]) -> int:
+        """
+        Encola las URLs que el frontier todavía no conoce y vuelve a poner
+        en cola las que habían quedado "failed"; devuelve cuántas entraron.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def __contains__(self, url: str) -> bool:
+        """La URL ya está en el frontier y no quedó "failed" (esas se pueden volver a encolar)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def lease(self, source: str, owner: str, limit: int, lease_seconds: float) -> list[Lease]:
+        """Toma hasta `limit` URLs en cola (o con el lease vencido) de `source`."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, lease: Lease, article: Article | None) -> bool:
+        """
+        Reporta el resultado (None = la página no tenía datos válidos).
+        False si el lease ya no es de este worker.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str) -> bool:
+        """Vuelve a la cola con backoff, o queda "failed" si agotó los intentos."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def results(self, source: str, limit: int) -> list[Article]:
+        """Artículos reportados y todavía no guardados por el coordinador."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_saved(self, urls: Iterable[str]):
+        raise NotImplementedError
+
+    @abstractmethod
+    def counts(self, source: str) -> dict[str, int]:
+        """Cantidad de URLs de `source` por estado."""
+        raise NotImplementedError
+
+    def has_pending(self, source: str) -> bool:
+        """Queda trabajo en cola o tomado por algún worker (aunque haya muerto)."""
+        counts = self.counts(source)
+        return counts["queued"] + counts["leased"] > 0
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SqliteFrontier(Frontier):
+    """
+    Frontier en una tabla SQLite. Cada `lease` es una transacción
+    BEGIN IMMEDIATE, así dos procesos nunca toman la misma URL.
+    """
+
+    def __init__(self, path: str | Path, max_attempts: int = 5, retry_backoff_base: float = 5.0, retry_backoff_cap: float = 600.0):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.retry_backoff_base = retry_backoff_base
+        self.retry_backoff_cap = retry_backoff_cap
+        # autocommit: las transacciones se abren a mano con BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier ("
+            " url TEXT PRIMARY KEY,"
+            " source TEXT NOT NULL,"
+            " state TEXT NOT NULL DEFAULT 'queued',"
+            " attempts INTEGER NOT NULL DEFAULT 0,"
+            # epoch: no se vuelve a entregar antes (backoff tras una falla)
+            " not_before REAL NOT NULL DEFAULT 0,"
+            " lease_owner TEXT,"
+            " lease_token TEXT,"
+            " lease_expires REAL,"
+            " result TEXT,"
+            " last_error TEXT,"
+            " enqueued_at REAL NOT NULL,"
+            " updated_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_frontier_state ON frontier (source, state, enqueued_at)"
+        )
+
+    def _transaction(self):
+        return _ImmediateTransaction(self.conn)
+
+    def push(self, source: str, urls: Iterable[str]) -> int:
+        now = time.time()
+        with self._transaction():
+            cur = self.conn.executemany(
+                "INSERT INTO frontier (url, source, enqueued_at, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT (url) DO UPDATE SET state = 'queued', attempts = 0, not_before = 0,"
+                " enqueued_at = excluded.enqueued_at, updated_at = excluded.updated_at"
+                " WHERE frontier.state = 'failed'",
+                [(url, source, now, now) for url in urls],
+            )
+        return cur.rowcount
+
+    def __contains__(self, url: str) -> bool:
+        return self.conn.execute(
+            "SELECT 1 FROM frontier WHERE url = ? AND state != 'failed'", (url,)
+        ).fetchone() is not None
+
+    def lease(self, source: str, owner: str, limit: int, lease_seconds: float) -> list[Lease]:
+        now = time.time()
+        expires = now + lease_seconds
+        with self._transaction():
+            # leases vencidos que ya agotaron los intentos: el worker murió
+            # con esa URL demasiadas veces
+            self.conn.execute(
+                "UPDATE frontier SET state = 'failed', last_error = 'lease vencido', updated_at = ?"
+                " WHERE source = ? AND state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, source, now, self.max_attempts),
+            )
+            rows = self.conn.execute(
+                "SELECT url, attempts FROM frontier"
+                " WHERE source = ? AND ((state = 'queued' AND not_before <= ?)"
+                "  OR (state = 'leased' AND lease_expires < ?))"
+                " ORDER BY enqueued_at LIMIT ?",
+                (source, now, now, limit),
+            ).fetchall()
+            leases = []
+            for url, attempts in rows:
+                token = uuid.uuid4().hex
+                self.conn.execute(
+                    "UPDATE frontier SET state = 'leased', attempts = attempts + 1, lease_owner = ?,"
+                    " lease_token = ?, lease_expires = ?, updated_at = ? WHERE url = ?",
+                    (owner, token, expires, now, url),
+                )
+                leases.append(Lease(url, source, token, attempts + 1, expires))
+        return leases
+
+    def _finish(self, lease: Lease, sql: str, params: tuple) -> bool:
+        with self._transaction():
+            cur = self.conn.execute(
+                f"{sql} WHERE url = ? AND state = 'leased' AND lease_token = ?",
+                (*params, lease.url, lease.token),
+            )
+        return cur.rowcount == 1
+
+    def complete(self, lease: Lease, article: Article | None) -> bool:
+        result = json.dumps(asdict(article), ensure_ascii=False) if article is not None else None
+        # sin artículo no hay nada que guardar: pasa directo a "saved"
+        state = "done" if article is not None else "saved"
+        return self._finish(
+            lease,
+            "UPDATE frontier SET state = ?, result = ?, lease_token = NULL, updated_at = ?",
+            (state, result, time.time()),
+        )
+
+    def fail(self, lease: Lease, error: str) -> bool:
+        now = time.time()
+        if lease.attempts >= self.max_attempts:
+            return self._finish(
+                lease,
+                "UPDATE frontier SET state = 'failed', last_error = ?, lease_token = NULL, updated_at = ?",
+                (error, now),
+            )
+        delay = backoff_delay(lease.attempts - 1, self.retry_backoff_base, self.retry_backoff_cap)
+        return self._finish(
+            lease,
+            "UPDATE frontier SET state = 'queued', last_error = ?, not_before = ?, lease_token = NULL, updated_at = ?",
+            (error, now + delay, now),
+        )
+
+    def results(self, source: str, limit: int) -> list[Article]:
+        rows = self.conn.execute(
+            "SELECT result FROM frontier WHERE source = ? AND state = 'done' ORDER BY updated_at LIMIT ?",
+            (source, limit),
+        ).fetchall()
+        return [Article(**json.loads(result)) for (result,) in rows]
+
+    def mark_saved(self, urls: Iterable[str]):
+        now = time.time()
+        with self._transaction():
+            self.conn.executemany(
+                # el artículo ya está en el sink: no hace falta seguir guardándolo acá
+                "UPDATE frontier SET state = 'saved', result = NULL, updated_at = ? WHERE url = ? AND state = 'done'",
+                [(now, url) for url in urls],
+            )
+
+    def counts(self, source: str) -> dict[str, int]:
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(self.conn.execute(
+            "SELECT state, COUNT(*) FROM frontier WHERE source = ? GROUP BY state", (source,)
+        ))
+        return counts
+
+    def close(self):
+        self.conn.close()
+
+
+class _ImmediateTransaction:
+    """BEGIN IMMEDIATE ... COMMIT/ROLLBACK con una conexión en autocommit."""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def __exit__(self, exc_type, *exc):
+        self.conn.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+
+
+_BACKENDS: dict[str, Callable[[str], Frontier]] = {
+    "sqlite": SqliteFrontier,
+}
+
+
+def register_backend(scheme: str, factory: Callable[[str], Frontier]):
+    """`factory` recibe la URL completa (p. ej. "redis://host:6379/0")."""
+    _BACKENDS[scheme] = factory
+
+
+def open_frontier(spec: str | Path) -> Frontier:
+    """
+    Una ruta o "sqlite:///ruta" abre un SqliteFrontier; "<esquema>://..."
+    usa el backend registrado para ese esquema.
+    """
+    spec = str(spec)
+    if "://" not in spec:
+        return SqliteFrontier(spec)
+    scheme, rest = spec.split("://", 1)
+    if scheme not in _BACKENDS:
+        raise ValueError(f"Backend de frontier desconocido: {scheme}")
+    if scheme == "sqlite":
+        # sqlite:///data/meta/frontier.sqlite -> data/meta/frontier.sqlite
+        return SqliteFrontier(rest[1:] if rest.startswith("/") else rest)
+    return _BACKENDS[scheme](spec)
@@ -0,0 +1,89 @@
+"""
+Límites globales de recursos compartidos entre scrapers.
+
+Cuando run_scrapers ejecuta varias fuentes en paralelo (un proceso por
+scraper) necesitamos dos topes comunes a todos los procesos:
+
+- cuántos Chromium pueden estar abiertos a la vez
+- cuántas páginas pueden estar abiertas a la vez contra un mismo host
+
+Los semáforos se crean en el proceso padre con `create_shared` y cada
+proceso hijo los recibe mediante `configure` (initializer del pool).
+Si nadie llama a `configure`, los context managers no limitan nada, así
+que un `scraper.run()` suelto funciona igual que antes.
+"""
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+from urllib.parse import urlparse
+
+_max_browsers: int | None = None
+_browser_slots = None   # multiprocessing.Semaphore
+_reserve_lock = None    # multiprocessing.Lock
+_host_slots: dict = {}  # host -> multiprocessing.Semaphore
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc.lower()
+
+
+def create_shared(mp_context, max_browsers: int, hosts: Iterable[str], max_pages_per_host: int) -> tuple:
+    """
+    Crea los primitivos de sincronización en el proceso padre.
+    Devuelve la tupla que hay que pasar como `initargs` a `configure`.
+    """
+    browser_slots = mp_context.BoundedSemaphore(max_browsers)
+    reserve_lock = mp_context.Lock()
+    host_slots = {h: mp_context.BoundedSemaphore(max_pages_per_host) for h in set(hosts)}
+    return max_browsers, browser_slots, reserve_lock, host_slots
+
+
+def configure(max_browsers: int, browser_slots, reserve_lock, host_slots: dict):
+    global _max_browsers, _browser_slots, _reserve_lock, _host_slots
+    _max_browsers = max_browsers
+    _browser_slots = browser_slots
+    _reserve_lock = reserve_lock
+    _host_slots = host_slots
+
+
+def browsers_capped() -> bool:
+    """Hay un tope global de navegadores (el proceso es parte de run_parallel / run_frontier)."""
+    return _browser_slots is not None
+
+
+@contextmanager
+def browser_slots(n: int = 1) -> Iterator[None]:
+    """
+    Reserva `n` navegadores del cupo global durante el bloque.
+
+    Las `n` plazas se toman bajo un lock para que dos scrapers no queden
+    cada uno con la mitad de lo que necesita esperando al otro.
+    """
+    if _browser_slots is None:
+        yield
+        return
+
+    if n > _max_browsers:
+        raise ValueError(f"Se piden {n} navegadores pero el tope global es {_max_browsers}")
+
+    with _reserve_lock:
+        for _ in range(n):
+            _browser_slots.acquire()
+    try:
+        yield
+    finally:
+        for _ in range(n):
+            _browser_slots.release()
+
+
+@contextmanager
+def host_slot(url: str) -> Iterator[None]:
+    """Ocupa una de las páginas permitidas para el host de `url`."""
+    sem = _host_slots.get(host_of(url))
+    if sem is None:
+        yield
+        return
+
+    with sem:
+        yield
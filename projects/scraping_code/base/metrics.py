@@ -0,0 +1,271 @@
+"""
+Métricas de una corrida de scraper: tiempos por fase, contadores y bytes.
+
+Fases que mide BaseNewsScraper:
+
+- listing_load: goto del listado en el navegador
+- link_extraction: extract_article_links (incluye el scroll de IGN)
+- static_fetch: GET del fast path HTTP (listados y artículos)
+- article_goto: goto del artículo en el navegador
+- article_extraction: extract_article_data / extract_article_data_static
+- save: escritura en el sink (incluye los flush a disco)
+
+Cada muestra se agrega a un histograma por fase (p50/p95/p99) y, si se
+pasó `jsonl_path`, se escribe una línea JSON por evento. Al final de la
+corrida `write_summary` agrega una línea "summary" y `print_summary`
+imprime el reporte. `MetricsServer` expone lo mismo en formato texto de
+Prometheus mientras la corrida está viva.
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterator
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Response
+
+PERCENTILES = (0.50, 0.95, 0.99)
+
+
+class LatencyHistogram:
+    """
+    Latencias de una fase. Guarda hasta `max_samples` muestras (reservoir
+    sampling) para calcular percentiles sin crecer sin límite.
+    """
+
+    def __init__(self, max_samples: int = 10_000):
+        self.max_samples = max_samples
+        self.samples: list[float] = []
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < self.max_samples:
+            self.samples.append(seconds)
+        else:
+            i = random.randrange(self.count)
+            if i < self.max_samples:
+                self.samples[i] = seconds
+
+    def percentile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self) -> dict:
+        snap = {"count": self.count, "total_s": self.total, "max_s": self.max}
+        for q in PERCENTILES:
+            snap[f"p{int(q * 100)}_s"] = self.percentile(q)
+        return snap
+
+
+class ScraperMetrics:
+    """
+    Métricas de una fuente. Seguro de usar desde los workers del
+    BrowserPool y desde los callbacks de Playwright.
+    """
+
+    def __init__(self, source: str, jsonl_path: Path | None = None):
+        self.source = source
+        self.jsonl_path = Path(jsonl_path) if jsonl_path is not None else None
+        self.phases: dict[str, LatencyHistogram] = {}
+        self.counters: Counter[str] = Counter()
+        self.bytes_by_kind: Counter[str] = Counter()
+        self.started = time.monotonic()
+        self.finished: float | None = None
+
+        self._lock = threading.Lock()
+        self._jsonl = None
+        if self.jsonl_path is not None:
+            self.jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            self._jsonl = self.jsonl_path.open("a", encoding="utf-8")
+
+    # ---------- registro ----------
+
+    def _emit(self, event: dict):
+        # se llama con el lock tomado
+        if self._jsonl is not None:
+            event = {"ts": datetime.utcnow().isoformat(), "source": self.source, **event}
+            self._jsonl.write(json.dumps(event, ensure_ascii=False) + "\n")
+
+    def observe(self, phase: str, seconds: float, ok: bool = True):
+        with self._lock:
+            hist = self.phases.get(phase)
+            if hist is None:
+                hist = self.phases[phase] = LatencyHistogram()
+            hist.observe(seconds)
+            if not ok:
+                self.counters[f"{phase}_errors"] += 1
+            self._emit({"event": "phase", "phase": phase, "seconds": round(seconds, 6), "ok": ok})
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Mide el bloque; si lanza una excepción se cuenta como error de la fase."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe(name, time.perf_counter() - start, ok)
+
+    def incr(self, counter: str, n: int = 1):
+        with self._lock:
+            self.counters[counter] += n
+
+    def add_bytes(self, n: int, kind: str):
+        """`kind`: "static" (fast path HTTP) o "browser" (respuestas de Playwright)."""
+        with self._lock:
+            self.bytes_by_kind[kind] += n
+
+    def _on_response(self, response: Response):
+        # Content-Length evita pedir el body al navegador; las respuestas
+        # chunked no lo traen, así que el total de "browser" es un piso
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self.add_bytes(int(length), "browser")
+
+    def install(self, context: BrowserContext):
+        context.on("response", self._on_response)
+
+    # ---------- reporte ----------
+
+    @property
+    def elapsed(self) -> float:
+        end = self.finished if self.finished is not None else time.monotonic()
+        return end - self.started
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            elapsed = self.elapsed
+            pages = self.counters["pages_loaded"]
+            return {
+                "source": self.source,
+                "elapsed_s": elapsed,
+                "pages_per_second": pages / elapsed if elapsed > 0 else 0.0,
+                "bytes": dict(self.bytes_by_kind),
+                "counters": dict(self.counters),
+                "phases": {name: h.snapshot() for name, h in self.phases.items()},
+            }
+
+    def finish(self):
+        with self._lock:
+            if self.finished is None:
+                self.finished = time.monotonic()
+
+    def write_summary(self):
+        snap = self.snapshot()
+        with self._lock:
+            self._emit({"event": "summary", **snap})
+
+    def close(self):
+        with self._lock:
+            if self._jsonl is not None:
+                self._jsonl.close()
+                self._jsonl = None
+
+    def print_summary(self):
+        snap = self.snapshot()
+        mb = sum(snap["bytes"].values()) / 1_000_000
+        print(
+            f"[{self.source}] {snap['elapsed_s']:.1f}s, "
+            f"{snap['pages_per_second']:.2f} páginas/s, {mb:.1f} MB transferidos"
+        )
+        if snap["counters"]:
+            counters = ", ".join(f"{k}={v}" for k, v in sorted(snap["counters"].items()))
+            print(f"[{self.source}] Contadores: {counters}")
+        print(f"[{self.source}] {'Fase':<20} {'n':>6} {'total s':>9} {'p50':>8} {'p95':>8} {'p99':>8}")
+        for name, h in sorted(snap["phases"].items()):
+            print(
+                f"[{self.source}] {name:<20} {h['count']:>6} {h['total_s']:>9.2f} "
+                f"{h['p50_s']:>8.3f} {h['p95_s']:>8.3f} {h['p99_s']:>8.3f}"
+            )
+
+    def prometheus_text(self) -> str:
+        """Exposición en formato texto de Prometheus (sin dependencias)."""
+        snap = self.snapshot()
+        src = f'source="{self.source}"'
+        lines = [
+            "# TYPE scraper_elapsed_seconds gauge",
+            f"scraper_elapsed_seconds{{{src}}} {snap['elapsed_s']:.3f}",
+            "# TYPE scraper_pages_per_second gauge",
+            f"scraper_pages_per_second{{{src}}} {snap['pages_per_second']:.4f}",
+            "# TYPE scraper_bytes_total counter",
+        ]
+        lines += [f'scraper_bytes_total{{{src},kind="{k}"}} {v}' for k, v in sorted(snap["bytes"].items())]
+        lines.append("# TYPE scraper_events_total counter")
+        lines += [f'scraper_events_total{{{src},name="{k}"}} {v}' for k, v in sorted(snap["counters"].items())]
+        lines.append("# TYPE scraper_phase_seconds summary")
+        for name, h in sorted(snap["phases"].items()):
+            labels = f'{src},phase="{name}"'
+            for q in PERCENTILES:
+                lines.append(f'scraper_phase_seconds{{{labels},quantile="{q}"}} {h[f"p{int(q * 100)}_s"]:.6f}')
+            lines.append(f"scraper_phase_seconds_sum{{{labels}}} {h['total_s']:.6f}")
+            lines.append(f"scraper_phase_seconds_count{{{labels}}} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsServer:
+    """
+    Endpoint HTTP mínimo (GET /metrics) para que Prometheus lea las
+    métricas durante la corrida. Corre en un hilo daemon.
+    """
+
+    def __init__(self, metrics: ScraperMetrics, port: int, host: str = "0.0.0.0"):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self._server: ThreadingHTTPServer | None = None
+        self._thread: threading.Thread | None = None
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        metrics = self.metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> MetricsServer:
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"[{self.metrics.source}] Métricas Prometheus en http://{self.host}:{self.port}/metrics")
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> MetricsServer:
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,215 @@
+"""
+Salida columnar en Parquet (pyarrow) particionada por fuente y fecha.
+
+Estructura en disco (particionado "hive"):
+
+    data/parquet/source=Kotaku-Reviews/published_date=2025-11-20/part-<id>.parquet
+
+- `ParquetArticleSink`: sink alternativo al CSV (cada flush escribe un
+  archivo chico por partición).
+- `compact`: junta los archivos chicos de cada partición en uno solo.
+- `scan_articles` / `read_articles`: lectura con filtros empujados al
+  scan (solo se abren las particiones y columnas pedidas).
+
+Uso desde consola:
+    python -m base.parquet_store compact data/parquet
+"""
+from __future__ import annotations
+
+import argparse
+import re
+import uuid
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from base.base_models import Article
+from base.sinks import ArticleSink
+
+ARTICLE_SCHEMA = pa.schema([
+    ("id", pa.string()),
+    ("source", pa.string()),
+    ("title", pa.string()),
+    ("url", pa.string()),
+    ("published_at", pa.string()),
+    ("text", pa.string()),
+    ("created_at", pa.string()),
+    ("fingerprint", pa.string()),
+])
+
+PARTITIONING = ds.partitioning(
+    pa.schema([("source", pa.string()), ("published_date", pa.string())]),
+    flavor="hive",
+)
+
+# El texto es lo que más pesa: zstd con más nivel; el resto va liviano
+COMPRESSION = "zstd"
+COMPRESSION_LEVEL = {"text": 9, "title": 3}
+
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def partition_date(article: Article) -> str:
+    """YYYY-MM-DD de published_at (o de created_at si viene raro)."""
+    for value in (article.published_at, article.created_at):
+        if value and _DATE_RE.match(value):
+            return value[:10]
+    return "unknown"
+
+
+def _write_file(table: pa.Table, directory: Path, prefix: str = "part") -> Path:
+    """
+    Escribe a un temporal oculto y renombra, para no dejar archivos a
+    medias (los nombres con "." adelante los ignora pyarrow.dataset).
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    final = directory / f"{prefix}-{uuid.uuid4().hex}.parquet"
+    tmp = directory / f".{final.name}.tmp"
+    pq.write_table(
+        table,
+        tmp,
+        compression=COMPRESSION,
+        compression_level=COMPRESSION_LEVEL,
+        use_dictionary=["source", "published_at", "created_at"],
+    )
+    tmp.replace(final)
+    return final
+
+
+class ParquetArticleSink(ArticleSink):
+    """
+    Cada flush agrupa el buffer por (source, fecha) y escribe un archivo por
+    grupo. Conviene un buffer más grande que el del CSV para no generar
+    demasiados archivos chicos; igual se pueden juntar luego con `compact`.
+    """
+
+    def __init__(self, root: Path, buffer_size: int = 200, flush_interval: float = 120.0, **kwargs):
+        super().__init__(buffer_size=buffer_size, flush_interval=flush_interval, **kwargs)
+        self.root = Path(root)
+
+    def write_batch(self, articles: list[Article]):
+        groups: dict[tuple[str, str], list[Article]] = defaultdict(list)
+        for art in articles:
+            groups[(art.source, partition_date(art))].append(art)
+
+        for (source, date), arts in groups.items():
+            table = pa.Table.from_pydict(
+                {name: [getattr(a, name) for a in arts] for name in ARTICLE_SCHEMA.names},
+                schema=ARTICLE_SCHEMA,
+            )
+            _write_file(table, self.root / f"source={source}" / f"published_date={date}")
+
+
+# ---------- compactación ----------
+
+def compact(root: str | Path, min_files: int = 2) -> int:
+    """
+    Junta los archivos de cada partición que tenga al menos `min_files`.
+    Primero se escribe el archivo nuevo y recién después se borran los
+    viejos: si se corta a la mitad quedan filas duplicadas, nunca perdidas.
+    Devuelve cuántas particiones se compactaron.
+    """
+    root = Path(root)
+    compacted = 0
+    for partition in sorted(p for p in root.glob("source=*/published_date=*") if p.is_dir()):
+        files = sorted(partition.glob("*.parquet"))
+        if len(files) < min_files:
+            continue
+
+        table = pa.concat_tables(pq.read_table(f, schema=ARTICLE_SCHEMA) for f in files)
+        _write_file(table, partition, prefix="compacted")
+        for f in files:
+            f.unlink()
+
+        compacted += 1
+        print(f"[parquet] {partition.relative_to(root)}: {len(files)} archivos -> 1 ({table.num_rows} filas)")
+    return compacted
+
+
+# ---------- lectura ----------
+
+def _filter(
+    sources: Iterable[str] | None,
+    date_from: str | None,
+    date_to: str | None,
+) -> ds.Expression | None:
+    conditions = []
+    if sources:
+        conditions.append(ds.field("source").isin(list(sources)))
+    if date_from:
+        conditions.append(ds.field("published_date") >= date_from)
+    if date_to:
+        conditions.append(ds.field("published_date") <= date_to)
+
+    if not conditions:
+        return None
+    expr = conditions[0]
+    for cond in conditions[1:]:
+        expr = expr & cond
+    return expr
+
+
+def dataset(root: str | Path) -> ds.Dataset:
+    return ds.dataset(str(root), format="parquet", partitioning=PARTITIONING)
+
+
+def scanner(
+    root: str | Path,
+    sources: Iterable[str] | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    columns: list[str] | None = None,
+    batch_size: int = 10_000,
+) -> ds.Scanner:
+    """
+    Scanner con los filtros empujados: fuente/fecha descartan particiones
+    enteras antes de leer y `columns` evita descomprimir `text` cuando no
+    hace falta. Fechas en formato "YYYY-MM-DD" (ambos extremos inclusive).
+    """
+    return dataset(root).scanner(
+        columns=columns,
+        filter=_filter(sources, date_from, date_to),
+        batch_size=batch_size,
+    )
+
+
+def scan_articles(root: str | Path, **kwargs) -> Iterator[pa.RecordBatch]:
+    """Recorre los artículos por lotes, sin cargar todo en memoria."""
+    yield from scanner(root, **kwargs).to_batches()
+
+
+def read_articles(root: str | Path, **kwargs) -> pa.Table:
+    """Igual que scan_articles pero devuelve una sola tabla (para resultados chicos)."""
+    return scanner(root, **kwargs).to_table()
+
+
+def count_by_source(root: str | Path, **kwargs) -> dict[str, int]:
+    """Ejemplo de agregación leyendo solo la columna de partición."""
+    counts: dict[str, int] = defaultdict(int)
+    for batch in scan_articles(root, columns=["source"], **kwargs):
+        for value in pc.value_counts(batch.column("source")).to_pylist():
+            counts[value["values"]] += value["counts"]
+    return dict(counts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Utilidades para la salida Parquet de los scrapers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_compact = sub.add_parser("compact", help="Junta los archivos chicos de cada partición")
+    p_compact.add_argument("root", nargs="?", default="data/parquet")
+    p_compact.add_argument("--min-files", type=int, default=2)
+
+    args = parser.parse_args()
+    if args.command == "compact":
+        n = compact(args.root, min_files=args.min_files)
+        print(f"[parquet] Particiones compactadas: {n}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Grabación y reproducción de las respuestas que ve un scraper.
+
+Con `Replay(root, mode="record")` una corrida normal contra los sitios
+reales guarda cada respuesta (HTML del fast path HTTP y todo lo que el
+navegador deja pasar: documentos, scripts, XHR) en `root`. Con
+`mode="replay"` la misma corrida se sirve enteramente desde disco: lo que
+no se grabó responde 404 (HTTP) o se aborta (navegador), nunca sale a la
+red. Así los scrapers corren sin cambios y de forma reproducible (ver
+benchmarks/bench_scrapers.py).
+
+Se engancha en los dos caminos de red:
+
+- requests: un HTTPAdapter montado en la sesión del StaticFetcher
+- Playwright: `context.route` / `context.on("response")`
+
+Formato en disco: un archivo por respuesta en `<root>/<host>/` y un
+`manifest.json` con {clave: {file, status, headers}}. La clave es método +
+URL sin fragmento (+ hash del body en POST, para el scroll por XHR).
+
+El formato HAR de Playwright (`record_har_path` / `route_from_har`) solo
+cubre al navegador; este formato sirve también para el fast path HTTP.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING
+from urllib.parse import urldefrag, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+if TYPE_CHECKING:
+    from playwright.sync_api import BrowserContext, Response, Route
+
+# headers que hace falta reproducir; el resto (cookies, cache, etc.) no
+KEPT_HEADERS = ("content-type", "location", "retry-after")
+
+
+def replay_key(method: str, url: str, body: bytes | None = None) -> str:
+    key = f"{method.upper()} {urldefrag(url)[0]}"
+    if body:
+        key += " " + hashlib.sha1(body).hexdigest()[:12]
+    return key
+
+
+class ReplayStore:
+    """Respuestas grabadas en disco, indexadas por `replay_key`."""
+
+    def __init__(self, root: str | Path):
+        self.root = Path(root)
+        self.manifest_path = self.root / "manifest.json"
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        if self.manifest_path.exists():
+            with self.manifest_path.open("r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def save(self, key: str, url: str, status: int, headers: dict, body: bytes):
+        host = urlsplit(url).netloc.lower() or "_"
+        rel = f"{host}/{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
+        path = self.root / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+        kept = {k: v for k, v in ((k.lower(), v) for k, v in headers.items()) if k in KEPT_HEADERS}
+        with self._lock:
+            self.entries[key] = {"url": url, "file": rel, "status": status, "headers": kept}
+
+    def get(self, key: str) -> tuple[int, dict, bytes] | None:
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return entry["status"], entry["headers"], (self.root / entry["file"]).read_bytes()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def write_manifest(self):
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock:
+            tmp = self.manifest_path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=1, sort_keys=True)
+            tmp.replace(self.manifest_path)
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Adapter de requests que hace el request real y guarda la respuesta."""
+
+    def __init__(self, store: ReplayStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        resp = super().send(request, **kwargs)
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        self.store.save(
+            replay_key(request.method, request.url, body),
+            request.url,
+            resp.status_code,
+            dict(resp.headers),
+            resp.content,
+        )
+        return resp
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Adapter de requests que contesta desde el store (404 si no se grabó)."""
+
+    def __init__(self, store: ReplayStore, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+
+    def send(self, request, **kwargs):
+        body = request.body.encode("utf-8") if isinstance(request.body, str) else request.body
+        recorded = self.store.get(replay_key(request.method, request.url, body))
+        status, headers, content = recorded if recorded is not None else (404, {}, b"")
+
+        resp = requests.Response()
+        resp.status_code = status
+        resp.headers = CaseInsensitiveDict(headers)
+        resp._content = content
+        # no hay socket detrás: que close() no intente cerrar resp.raw
+        resp._content_consumed = True
+        resp.url = request.url
+        resp.request = request
+        resp.reason = "OK" if status == 200 else "Replay"
+        return resp
+
+
+class Replay:
+    """
+    Modo de grabación/reproducción de una corrida. BaseNewsScraper lo usa
+    si se le asigna en `scraper.replay` antes de run().
+    """
+
+    def __init__(self, root: str | Path, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"mode desconocido: {mode}")
+        self.mode = mode
+        self.store = ReplayStore(root)
+
+    def adapter(self, pool_size: int = 10) -> HTTPAdapter:
+        cls = RecordingAdapter if self.mode == "record" else ReplayAdapter
+        return cls(self.store, pool_connections=pool_size, pool_maxsize=pool_size)
+
+    # ---------- navegador ----------
+
+    def _record_response(self, response: Response):
+        request = response.request
+        if 300 <= response.status < 400:
+            # el redirect se reproduce con su Location; no tiene body
+            body = b""
+        else:
+            try:
+                body = response.body()
+            except Exception:
+                # respuestas ya descartadas por el navegador
+                return
+        self.store.save(
+            replay_key(request.method, request.url, request.post_data_buffer),
+            request.url,
+            response.status,
+            response.headers,
+            body,
+        )
+
+    def _serve(self, route: Route):
+        request = route.request
+        recorded = self.store.get(replay_key(request.method, request.url, request.post_data_buffer))
+        if recorded is None:
+            route.abort("internetdisconnected")
+            return
+        status, headers, body = recorded
+        route.fulfill(status=status, headers=headers, body=body)
+
+    def install(self, context: BrowserContext):
+        """
+        En replay se registra después del ResourceFilter, así que este
+        handler atiende primero todos los requests (Playwright corre los
+        routes en orden inverso) y nada llega a la red.
+        """
+        if self.mode == "record":
+            context.on("response", self._record_response)
+        else:
+            context.route("**/*", self._serve)
+
+    def close(self):
+        if self.mode == "record":
+            self.store.write_manifest()
+            print(f"[replay] {len(self.store)} respuestas grabadas en {self.store.root}")
@@ -0,0 +1,181 @@
+"""
+Ritmo y tolerancia a fallas para los requests de los scrapers.
+
+- `HostRateLimiter`: token bucket por host, compartido por todos los
+  scrapers e hilos del proceso. Es por proceso: con run_parallel cada
+  proceso lleva su propia cuenta, así que dos fuentes del mismo host en
+  procesos distintos suman sus ritmos (el tope entre procesos es el de
+  páginas abiertas por host, base/limits.py).
+- `backoff_delay`: espera exponencial con jitter ("full jitter") entre
+  reintentos de fallas transitorias.
+- `CircuitBreaker`: tras varias fallas seguidas (429, 5xx, timeouts) abre
+  el circuito y la fuente deja de pedir páginas durante `cooldown`.
+- `RetryQueue`: URLs que agotaron los reintentos; se guardan en disco y
+  la próxima corrida las procesa primero.
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+class TransientFetchError(Exception):
+    """Falla que vale la pena reintentar (429, 5xx, timeout, conexión)."""
+
+    def __init__(self, message: str, status: int | None = None, retry_after: float | None = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+def is_transient_status(status: int) -> bool:
+    return status == 429 or 500 <= status < 600
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Solo la forma en segundos de Retry-After (la de fecha se ignora)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 60.0) -> float:
+    """Full jitter: uniforme entre 0 y min(cap, base * 2^attempt)."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+# ---------- rate limiting ----------
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    def __init__(self):
+        self._buckets: dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, host: str, rate: float, burst: int):
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(rate, burst)
+        bucket.acquire()
+
+
+# un solo limitador por proceso: todos los scrapers que pegan al mismo
+# host comparten el ritmo
+host_rate_limiter = HostRateLimiter()
+
+
+# ---------- circuit breaker ----------
+
+class CircuitBreaker:
+    """
+    closed -> (failure_threshold fallas seguidas) -> open
+    open   -> (pasa cooldown)                     -> half-open: se deja pasar
+    half-open + éxito -> closed; half-open + falla -> open de nuevo
+    """
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 120.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._lock = threading.Lock()
+
+    def remaining_cooldown(self) -> float:
+        with self._lock:
+            if self.opened_at is None:
+                return 0.0
+            return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """Devuelve True si esta falla abrió el circuito."""
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold and (
+                self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown
+            ):
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+# ---------- cola de reintentos persistida ----------
+
+class RetryQueue:
+    """
+    {url: {"attempts": n, "last_error": "...", "last_try": iso}} en JSON.
+    Una URL que falla en `max_runs` corridas distintas se descarta.
+    """
+
+    def __init__(self, path: Path, max_runs: int = 5):
+        self.path = Path(path)
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self.entries: dict[str, dict] = {}
+        if self.path.exists():
+            with self.path.open("r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def urls(self) -> list[str]:
+        with self._lock:
+            return list(self.entries)
+
+    def push(self, url: str, error: str) -> bool:
+        """Encola (o re-encola) la URL. False si ya agotó sus corridas."""
+        with self._lock:
+            entry = self.entries.get(url, {"attempts": 0})
+            entry["attempts"] += 1
+            entry["last_error"] = error
+            entry["last_try"] = datetime.utcnow().isoformat()
+            if entry["attempts"] > self.max_runs:
+                self.entries.pop(url, None)
+                return False
+            self.entries[url] = entry
+            return True
+
+    def done(self, url: str):
+        with self._lock:
+            self.entries.pop(url, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def save(self):
+        with self._lock:
+            tmp = self.path.with_suffix(".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                json.dump(self.entries, f, ensure_ascii=False, indent=2)
+            tmp.replace(self.path)
@@ -0,0 +1,126 @@
+"""
+Filtro de requests para los contextos de Playwright.
+
+Los scrapers solo leen h1, metas y párrafos, pero cada página de IGN o
+Kotaku arrastra imágenes, fuentes, video, ads y analytics. Este filtro se
+instala con `context.route` y aborta todo request cuyo tipo de recurso no
+esté en los que el scraper declaró necesitar (`needed_resource_types`) o
+cuyo dominio esté en la lista de ads/trackers.
+
+Como un request abortado nunca llega a bajarse, los bytes ahorrados son
+una ESTIMACIÓN usando un tamaño típico por tipo de recurso.
+"""
+from __future__ import annotations
+
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext, Route
+
+# Tipos que reporta Playwright en request.resource_type
+ALL_RESOURCE_TYPES = frozenset({
+    "document", "stylesheet", "image", "media", "font", "script",
+    "texttrack", "xhr", "fetch", "eventsource", "websocket", "manifest", "other",
+})
+
+DEFAULT_BLOCKED_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagservices.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "amazon-adsystem.com",
+    "adnxs.com",
+    "criteo.com",
+    "taboola.com",
+    "outbrain.com",
+    "scorecardresearch.com",
+    "quantserve.com",
+    "chartbeat.com",
+    "facebook.net",
+    "hotjar.com",
+    "permutive.com",
+)
+
+# Tamaño típico (bytes) por tipo, solo para estimar lo ahorrado
+TYPICAL_BYTES = {
+    "image": 60_000,
+    "media": 500_000,
+    "font": 40_000,
+    "stylesheet": 30_000,
+    "script": 50_000,
+    "xhr": 5_000,
+    "fetch": 5_000,
+}
+DEFAULT_TYPICAL_BYTES = 10_000
+
+
+class ResourceFilter:
+    """
+    Route handler con estadísticas. Es seguro compartir una instancia
+    entre los contextos de varios hilos (los del pool de base/browser_pool.py).
+    """
+
+    def __init__(self, allowed_types: frozenset[str], blocked_domains: tuple[str, ...] = DEFAULT_BLOCKED_DOMAINS):
+        # sin "document" no carga ni la página principal
+        self.allowed_types = frozenset(allowed_types) | {"document"}
+        self.blocked_domains = blocked_domains
+
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.blocked_by_type: Counter[str] = Counter()
+        self.blocked_by_domain = 0
+        self.bytes_saved_estimate = 0
+
+    def is_blocked_domain(self, url: str) -> bool:
+        host = urlparse(url).hostname or ""
+        return any(host == d or host.endswith("." + d) for d in self.blocked_domains)
+
+    def handle_route(self, route: Route):
+        request = route.request
+        resource_type = request.resource_type
+
+        by_domain = self.is_blocked_domain(request.url)
+        blocked = by_domain or resource_type not in self.allowed_types
+
+        with self._lock:
+            if not blocked:
+                self.allowed += 1
+            else:
+                self.blocked_by_type[resource_type] += 1
+                self.blocked_by_domain += int(by_domain)
+                self.bytes_saved_estimate += TYPICAL_BYTES.get(resource_type, DEFAULT_TYPICAL_BYTES)
+
+        if blocked:
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    def install(self, context: BrowserContext):
+        context.route("**/*", self.handle_route)
+
+    @property
+    def blocked(self) -> int:
+        return sum(self.blocked_by_type.values())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "allowed": self.allowed,
+                "blocked": self.blocked,
+                "blocked_by_domain": self.blocked_by_domain,
+                "blocked_by_type": dict(self.blocked_by_type),
+                "bytes_saved_estimate": self.bytes_saved_estimate,
+            }
+
+    def print_summary(self, source_name: str):
+        s = self.stats()
+        if s["allowed"] == 0 and s["blocked"] == 0:
+            return
+        by_type = ", ".join(f"{t}={n}" for t, n in sorted(s["blocked_by_type"].items()))
+        print(
+            f"[{source_name}] Requests permitidos: {s['allowed']}, bloqueados: {s['blocked']} "
+            f"({by_type}; {s['blocked_by_domain']} por dominio), "
+            f"~{s['bytes_saved_estimate'] / 1_000_000:.1f} MB ahorrados (estimado)"
+        )
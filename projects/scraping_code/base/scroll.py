@@ -0,0 +1,72 @@
+"""
+Carga adaptativa de listados con scroll infinito.
+
+En vez de dormir un tiempo fijo después de cada scroll, se espera a que
+la cantidad de tarjetas crezca (o a que la red quede quieta) y se corta
+apenas pasa algo de esto:
+
+- se llegó a `target_count` tarjetas
+- venció el `deadline` total
+- la lista dejó de crecer (fin del listado)
+- `stop_when(hrefs)` devuelve True (p. ej. ya apareció una URL vista)
+"""
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from playwright.sync_api import Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from base.dom_extract import Field, extract_fields
+
+_COUNT_GREW_JS = "([selector, n]) => document.querySelectorAll(selector).length > n"
+
+
+def scroll_until(
+    page: Page,
+    selector: str,
+    deadline: float = 60.0,
+    target_count: int | None = None,
+    growth_timeout: float = 4.0,
+    stop_when: Callable[[list[str]], bool] | None = None,
+    attr: str = "href",
+) -> list[str]:
+    """
+    Scrollea hasta que se cumpla alguna condición de corte y devuelve el
+    atributo `attr` de todas las tarjetas cargadas (en orden).
+    Tiempos en segundos.
+    """
+    spec = {"values": Field(selector, attr=attr, many=True)}
+    end = time.monotonic() + deadline
+
+    values: list[str] = extract_fields(page, spec)["values"]
+    while True:
+        if target_count is not None and len(values) >= target_count:
+            break
+        if stop_when is not None and stop_when(values):
+            break
+
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            print(f"[scroll] Deadline de {deadline:.0f}s alcanzado con {len(values)} items")
+            break
+
+        page.mouse.wheel(0, 4000)
+        timeout_ms = min(growth_timeout, remaining) * 1000
+        try:
+            page.wait_for_function(_COUNT_GREW_JS, arg=[selector, len(values)], timeout=timeout_ms)
+        except PlaywrightTimeoutError:
+            # última chance: que terminen los XHR pendientes y volver a contar
+            try:
+                page.wait_for_load_state("networkidle", timeout=timeout_ms)
+            except PlaywrightTimeoutError:
+                pass
+
+        new_values = extract_fields(page, spec)["values"]
+        if len(new_values) <= len(values):
+            # la lista ya no crece: fin del listado
+            break
+        values = new_values
+
+    return values
@@ -0,0 +1,341 @@
+"""
+Registro persistente de URLs ya scrapeadas por fuente.
+
+Antes se leía todo `<fuente>_seen_urls.txt` a un set al inicio de cada
+corrida y se reescribía completo (ordenado) al final. Eso crece con el
+historial y, si el proceso muere antes de terminar, se pierden todas las
+URLs de la corrida.
+
+`SqliteSeenUrlStore` guarda cada URL en SQLite apenas se confirma
+(membresía por índice, sin cargar el historial) y opcionalmente pone
+delante un filtro de Bloom para responder rápido los "nunca visto".
+
+Para el modo "refresh" también guarda, por URL, los validadores HTTP
+(ETag / Last-Modified), el hash del contenido y cuándo se revisó por
+última vez (ver `UrlValidators`).
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+import sqlite3
+import struct
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+from typing import Iterable, Sequence
+
+
+@dataclass
+class UrlValidators:
+    """Lo necesario para preguntar barato si un artículo ya scrapeado cambió."""
+    url: str
+    etag: str | None = None
+    last_modified: str | None = None
+    # Article.fingerprint de la última versión guardada
+    content_hash: str | None = None
+    published_at: str | None = None
+
+
+# (antigüedad máxima del artículo, cada cuánto revisarlo); None = el resto
+RefreshSchedule = Sequence[tuple[timedelta | None, timedelta]]
+
+
+class SeenUrlStore(ABC):
+    """Interfaz mínima que usa BaseNewsScraper."""
+
+    @abstractmethod
+    def __contains__(self, url: str) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_many(self, urls: Iterable[str]):
+        """Inserta las URLs de forma durable (una transacción)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_state(self, key: str) -> str | None:
+        """Valor guardado junto a las URLs (p. ej. el watermark de published_at)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_state(self, key: str, value: str):
+        raise NotImplementedError
+
+    @abstractmethod
+    def save_validators(self, items: Iterable[UrlValidators]):
+        """Guarda la versión recién escrita de cada URL (revisada y cambiada ahora)."""
+        raise NotImplementedError
+
+    @abstractmethod
+    def mark_checked(self, items: Iterable[UrlValidators]):
+        """
+        Las URLs se revisaron ahora y no cambiaron. Se guardan los
+        validadores y el hash que traigan; los campos en None conservan
+        lo que ya estaba (un 304 no trae nada nuevo).
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def due_for_refresh(self, schedule: RefreshSchedule, limit: int) -> list[UrlValidators]:
+        """Las `limit` URLs que más tiempo llevan vencidas según `schedule`."""
+        raise NotImplementedError
+
+    def seed_validators(self) -> int:
+        """Pone en el calendario de refresh las URLs que todavía no están."""
+        return 0
+
+    def add(self, url: str):
+        self.add_many([url])
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BloomFilter:
+    """
+    Filtro de Bloom simple sobre un bytearray.
+    `might_contain` False => la URL seguro no está; True => hay que confirmar.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.capacity = max(capacity, 1000)
+        self.error_rate = error_rate
+        self.num_bits = math.ceil(-self.capacity * math.log(error_rate) / (math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # double hashing: h1 + i*h2 con un solo blake2b
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = struct.unpack("<QQ", digest)
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def might_contain(self, key: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    @property
+    def is_full(self) -> bool:
+        return self.count >= self.capacity
+
+    # --- persistencia: cabecera + bits ---
+
+    _HEADER = struct.Struct("<QdQ")  # capacity, error_rate, count
+
+    def save(self, path: Path):
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(self._HEADER.pack(self.capacity, self.error_rate, self.count))
+            f.write(self.bits)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> BloomFilter:
+        with path.open("rb") as f:
+            capacity, error_rate, count = cls._HEADER.unpack(f.read(cls._HEADER.size))
+            bloom = cls(capacity, error_rate)
+            bloom.bits = bytearray(f.read())
+            bloom.count = count
+        if len(bloom.bits) != (bloom.num_bits + 7) // 8:
+            raise ValueError(f"Archivo Bloom corrupto: {path}")
+        return bloom
+
+
+class SqliteSeenUrlStore(SeenUrlStore):
+    """
+    URLs vistas en una tabla SQLite (clave primaria = URL).
+
+    Con `use_bloom=True` se mantiene un filtro de Bloom en `<db>.bloom`; si
+    falta o no coincide con la cantidad de filas, se reconstruye leyendo la
+    tabla en streaming (sin armar un set en memoria).
+
+    Se usa desde varios hilos (el listado corre en un hilo del pool de
+    navegadores y el `stop_when` de IGN consulta `is_seen` ahí): la conexión
+    se abre sin `check_same_thread` y cada operación toma `_lock`.
+    """
+
+    def __init__(self, path: str | Path, use_bloom: bool = True):
+        self.path = Path(path)
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_urls ("
+            " url TEXT PRIMARY KEY,"
+            " added_at TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%S', 'now'))"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_state (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS url_validators ("
+            " url TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " content_hash TEXT,"
+            " published_at TEXT,"
+            " checked_at TEXT NOT NULL,"
+            " changed_at TEXT"
+            ") WITHOUT ROWID"
+        )
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_url_validators_checked ON url_validators (checked_at)"
+        )
+        self.conn.commit()
+
+        self.bloom_path = self.path.with_suffix(".bloom")
+        self.bloom: BloomFilter | None = self._open_bloom() if use_bloom else None
+
+    def _open_bloom(self) -> BloomFilter:
+        rows = len(self)
+        if self.bloom_path.exists():
+            try:
+                bloom = BloomFilter.load(self.bloom_path)
+                if bloom.count == rows and not bloom.is_full:
+                    return bloom
+            except (ValueError, struct.error):
+                pass
+        return self._rebuild_bloom(rows)
+
+    def _rebuild_bloom(self, rows: int) -> BloomFilter:
+        bloom = BloomFilter(capacity=max(rows * 2, 10_000))
+        for (url,) in self.conn.execute("SELECT url FROM seen_urls"):
+            bloom.add(url)
+        return bloom
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            if self.bloom is not None and not self.bloom.might_contain(url):
+                return False
+            row = self.conn.execute("SELECT 1 FROM seen_urls WHERE url = ?", (url,)).fetchone()
+        return row is not None
+
+    def add_many(self, urls: Iterable[str]):
+        urls = list(urls)
+        with self._lock:
+            with self.conn:
+                for url in urls:
+                    cur = self.conn.execute("INSERT OR IGNORE INTO seen_urls (url) VALUES (?)", (url,))
+                    if cur.rowcount and self.bloom is not None:
+                        self.bloom.add(url)
+
+            if self.bloom is not None and self.bloom.is_full:
+                self.bloom = self._rebuild_bloom(len(self))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0]
+
+    def get_state(self, key: str) -> str | None:
+        with self._lock:
+            row = self.conn.execute("SELECT value FROM crawl_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_state(self, key: str, value: str):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO crawl_state (key, value) VALUES (?, ?)", (key, value)
+            )
+
+    _NOW = "strftime('%Y-%m-%dT%H:%M:%S', 'now')"
+
+    def save_validators(self, items: Iterable[UrlValidators]):
+        items = list(items)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO url_validators"
+                " (url, etag, last_modified, content_hash, published_at, checked_at, changed_at)"
+                f" VALUES (?, ?, ?, ?, ?, {self._NOW}, {self._NOW})",
+                [(v.url, v.etag, v.last_modified, v.content_hash, v.published_at) for v in items],
+            )
+
+    def mark_checked(self, items: Iterable[UrlValidators]):
+        items = list(items)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE url_validators SET"
+                " etag = COALESCE(?, etag),"
+                " last_modified = COALESCE(?, last_modified),"
+                " content_hash = COALESCE(?, content_hash),"
+                " published_at = COALESCE(?, published_at),"
+                f" checked_at = {self._NOW}"
+                " WHERE url = ?",
+                [(v.etag, v.last_modified, v.content_hash, v.published_at, v.url) for v in items],
+            )
+
+    def seed_validators(self) -> int:
+        """
+        URLs vistas antes de que existiera el modo refresh: entran sin
+        validadores ni hash, como revisadas el día en que se agregaron. La
+        primera revisión solo registra el hash (no hay con qué comparar).
+        """
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO url_validators (url, checked_at)"
+                " SELECT url, added_at FROM seen_urls"
+            )
+        return cur.rowcount
+
+    def due_for_refresh(self, schedule: RefreshSchedule, limit: int) -> list[UrlValidators]:
+        # intervalo según la antigüedad de published_at, todo en días (julianday)
+        cases, params = [], []
+        default_days = None
+        for max_age, every in schedule:
+            if max_age is None:
+                default_days = every / timedelta(days=1)
+                continue
+            cases.append("WHEN julianday('now') - julianday(published_at) < ? THEN ?")
+            params += [max_age / timedelta(days=1), every / timedelta(days=1)]
+        if default_days is None:
+            default_days = schedule[-1][1] / timedelta(days=1)
+
+        interval = f"CASE {' '.join(cases)} ELSE ? END" if cases else "?"
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT url, etag, last_modified, content_hash, published_at FROM url_validators"
+                f" WHERE julianday('now') - julianday(checked_at) >= {interval}"
+                " ORDER BY checked_at LIMIT ?",
+                (*params, default_days, limit),
+            ).fetchall()
+        return [UrlValidators(*row) for row in rows]
+
+    def migrate_text_file(self, txt_path: Path) -> int:
+        """
+        Importa una sola vez el formato viejo (una URL por línea) y renombra
+        el .txt a .txt.migrated para no volver a leerlo.
+        """
+        if not txt_path.exists():
+            return 0
+        with txt_path.open("r", encoding="utf-8-sig") as f:
+            urls = [line.strip() for line in f if line.strip()]
+        before = len(self)
+        self.add_many(urls)
+        txt_path.replace(txt_path.with_name(txt_path.name + ".migrated"))
+        return len(self) - before
+
+    def close(self):
+        with self._lock:
+            if self.bloom is not None:
+                self.bloom.save(self.bloom_path)
+            self.conn.close()
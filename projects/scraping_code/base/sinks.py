@@ -0,0 +1,146 @@
+"""
+Destinos de escritura para los artículos que produce un scraper.
+
+BaseNewsScraper.iter_articles entrega los Article uno por uno y el sink
+los va acumulando en un buffer chico que se escribe a disco cada
+`buffer_size` artículos o cada `flush_interval` segundos. Después de
+cada flush se llama a `on_flush` con lo recién escrito: el scraper lo usa
+para marcar esas URLs como vistas, así el estado de URLs vistas nunca
+incluye artículos que no llegaron al disco y una corrida interrumpida
+retoma desde el último flush.
+"""
+from __future__ import annotations
+
+import csv
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable
+
+from base.base_models import Article
+
+if TYPE_CHECKING:
+    from base.article_batch import ArticleBatch
+
+CSV_COLUMNS = [
+    "id",
+    "source",
+    "title",
+    "url",
+    "published_at",
+    "text",
+    "created_at",
+    "fingerprint",
+]
+
+
+class ArticleSink(ABC):
+    """Buffer + flush periódico; las subclases solo implementan `write_batch`."""
+
+    def __init__(
+        self,
+        buffer_size: int = 20,
+        flush_interval: float = 30.0,
+        on_flush: Callable[[list[Article]], None] | None = None,
+    ):
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+
+        self.written = 0
+        self._buffer: list[Article] = []
+        self._last_flush = time.monotonic()
+
+    @abstractmethod
+    def write_batch(self, articles: list[Article]):
+        """Escribe el lote de forma durable (al volver, ya está en disco)."""
+        raise NotImplementedError
+
+    def write(self, article: Article):
+        self._buffer.append(article)
+        if (
+            len(self._buffer) >= self.buffer_size
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        self.write_batch(batch)
+        self.written += len(batch)
+        if self.on_flush is not None:
+            self.on_flush(batch)
+
+    def close(self):
+        # también se llama si la corrida se corta con una excepción:
+        # lo que ya se extrajo completo se guarda igual
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CsvArticleSink(ArticleSink):
+    """Un CSV por fuente y día (utf-8-sig, como siempre), abierto en modo append."""
+
+    def __init__(self, path: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.path = Path(path)
+        self._file = None
+        self._writer = None
+        self.columns = CSV_COLUMNS
+
+    def _existing_columns(self) -> list[str] | None:
+        if not self.path.exists() or self.path.stat().st_size == 0:
+            return None
+        with self.path.open("r", encoding="utf-8-sig", newline="") as f:
+            return next(csv.reader(f), None)
+
+    def _open(self):
+        # si el archivo de hoy se creó con columnas viejas se respetan,
+        # para no mezclar filas con distinta cantidad de columnas
+        existing = self._existing_columns()
+        self.columns = existing or CSV_COLUMNS
+        self._file = self.path.open("a", encoding="utf-8-sig", newline="")
+        self._writer = csv.writer(self._file)
+        if existing is None:
+            self._writer.writerow(self.columns)
+
+    def write_batch(self, articles: list[Article]):
+        if self._file is None:
+            self._open()
+        self._writer.writerows(
+            [getattr(art, col) for col in self.columns]
+            for art in articles
+        )
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def write_article_batch(self, batch: ArticleBatch):
+        """
+        Exporta un ArticleBatch entero con el escritor CSV de Arrow, sin
+        crear un Article por fila. Es para exportar lotes ya guardados:
+        no pasa por el buffer ni llama a `on_flush`.
+        """
+        self.flush()
+        if self._file is None:
+            self._open()
+        # el encabezado (y el BOM) ya los escribió el writer de texto
+        self._file.flush()
+        batch.write_csv(self._file.buffer, self.columns)
+        self._file.buffer.flush()
+        os.fsync(self._file.fileno())
+        self.written += len(batch)
+
+    def close(self):
+        super().close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,151 @@
+"""
+Fast path HTTP para páginas renderizadas en el servidor.
+
+En vez de abrir Chromium, se pide el HTML con un cliente HTTP con pool de
+conexiones (keep-alive + compresión) y se parsea con lxml. Los scrapers
+lo activan por tipo de página con `static_page_types` y, si faltan los
+selectores que necesitan, BaseNewsScraper cae de vuelta a Playwright.
+
+Dependencias: requests, lxml, cssselect.
+"""
+from __future__ import annotations
+
+import lxml.etree
+import lxml.html
+import requests
+from requests.adapters import HTTPAdapter
+
+from base.dom_extract import Spec
+from base.resilience import TransientFetchError, is_transient_status, parse_retry_after
+
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+)
+
+
+def _accept_encoding() -> str:
+    # urllib3 solo descomprime brotli si el paquete está instalado
+    try:
+        import brotli  # noqa: F401
+        return "gzip, deflate, br"
+    except ImportError:
+        return "gzip, deflate"
+
+
+class NotModified(Exception):
+    """El servidor contestó 304 a un pedido condicional: la página no cambió."""
+
+
+class StaticDocument:
+    """HTML ya parseado; los scrapers lo leen con `extract(spec)`, igual que la página."""
+
+    def __init__(self, url: str, html: bytes | str, etag: str | None = None, last_modified: str | None = None):
+        self.url = url
+        # tamaño de la respuesta (para las métricas de bytes transferidos)
+        self.nbytes = len(html)
+        # validadores para pedidos condicionales del modo refresh
+        self.etag = etag
+        self.last_modified = last_modified
+        self.tree = lxml.html.fromstring(html, base_url=url)
+
+    def select(self, css: str) -> list:
+        return self.tree.cssselect(css)
+
+    def extract(self, spec: Spec) -> dict:
+        """Mismo resultado que dom_extract.extract_fields, pero sobre el HTML estático."""
+        out = {}
+        for name, f in spec.items():
+            els = self.select(f.selector)
+            if f.count:
+                out[name] = len(els)
+                continue
+            if not f.many:
+                els = els[:1]
+            values = [el.get(f.attr) if f.attr else el.text_content() for el in els]
+            out[name] = values if f.many else (values[0] if values else None)
+        return out
+
+
+class StaticFetcher:
+    """
+    Cliente HTTP compartido por toda la corrida.
+    El pool de urllib3 mantiene las conexiones abiertas entre artículos
+    del mismo host, así que solo el primer request paga el handshake TLS.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 15.0,
+        pool_size: int = 10,
+        user_agent: str = DEFAULT_USER_AGENT,
+        adapter: HTTPAdapter | None = None,
+    ):
+        """`adapter` reemplaza al de urllib3 (p. ej. el de base/replay.py)."""
+        self.timeout = timeout
+        self.session = requests.Session()
+        if adapter is None:
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+            "Accept-Encoding": _accept_encoding(),
+            "Connection": "keep-alive",
+        })
+
+    def fetch(self, url: str, etag: str | None = None, last_modified: str | None = None) -> StaticDocument | None:
+        """
+        Devuelve el documento o None si la respuesta no sirve (error, no-200,
+        no-HTML, vacía o ilegible): el llamador cae al navegador.
+        Timeouts, errores de conexión, 429 y 5xx lanzan TransientFetchError
+        para que el llamador pueda reintentar.
+
+        Con `etag` / `last_modified` el pedido es condicional
+        (If-None-Match / If-Modified-Since) y un 304 lanza NotModified.
+        """
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        try:
+            resp = self.session.get(url, headers=headers, timeout=self.timeout)
+        except (requests.Timeout, requests.ConnectionError) as ex:
+            raise TransientFetchError(f"{type(ex).__name__}: {ex}") from ex
+        except requests.RequestException as ex:
+            print(f"[static] Error pidiendo {url}: {ex}")
+            return None
+
+        if is_transient_status(resp.status_code):
+            raise TransientFetchError(
+                f"HTTP {resp.status_code}",
+                status=resp.status_code,
+                retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+            )
+        if resp.status_code == 304 and headers:
+            raise NotModified(url)
+        if resp.status_code != 200:
+            print(f"[static] HTTP {resp.status_code} en {url}")
+            return None
+        if "html" not in resp.headers.get("Content-Type", ""):
+            return None
+
+        # un 200 vacío o que lxml no puede parsear: que lo resuelva el navegador
+        if not resp.content.strip():
+            print(f"[static] Respuesta vacía en {url}")
+            return None
+        try:
+            return StaticDocument(
+                resp.url,
+                resp.content,
+                etag=resp.headers.get("ETag"),
+                last_modified=resp.headers.get("Last-Modified"),
+            )
+        except (lxml.etree.ParserError, ValueError) as ex:
+            print(f"[static] HTML ilegible en {url}: {ex}")
+            return None
+
+    def close(self):
+        self.session.close()
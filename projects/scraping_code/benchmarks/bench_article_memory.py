@@ -0,0 +1,112 @@
+"""
+Micro-benchmark de memoria: N artículos como
+
+- dataclass "vieja" (con __dict__, source sin internar)
+- Article actual (frozen + slots, source internado)
+- ArticleBatch (columnas Arrow, base/article_batch.py)
+
+Los artículos son sintéticos y los strings se arman por fila, como cuando
+se leen de un CSV (cada fila trae su propia copia de "kotaku-reviews").
+Los objetos Python se miden con tracemalloc; ArticleBatch con el pool de
+memoria de Arrow, que no pasa por el allocator de Python. Desde scraping_code/:
+
+    python -m benchmarks.bench_article_memory --articles 50000 --text-chars 3000
+"""
+from __future__ import annotations
+
+import argparse
+import gc
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable
+
+import pyarrow as pa
+
+from base.article_batch import ArticleBatch
+from base.base_models import Article
+
+SOURCES = ("kotaku-reviews", "ign-reviews")
+
+
+@dataclass
+class LegacyArticle:
+    """Copia de la forma anterior de Article, solo para comparar."""
+    id: str
+    source: str
+    title: str
+    url: str
+    published_at: str
+    text: str
+    created_at: str
+    fingerprint: str
+
+
+def raw_rows(n: int, text_chars: int) -> list[tuple[str, ...]]:
+    body = "Texto del review con algo de contenido. "
+    text = (body * (text_chars // len(body) + 1))[:text_chars]
+    rows = []
+    for i in range(n):
+        rows.append((
+            f"{i:032x}",
+            "".join(SOURCES[i % len(SOURCES)]),  # copia nueva por fila
+            f"Review número {i}",
+            f"https://example.com/reviews/{i}",
+            f"2025-11-{1 + i % 28:02d}T10:00:00+00:00",
+            f"{text} {i}",
+            f"2025-11-20T12:00:{i % 60:02d}.000000",
+            f"{i:040x}",
+        ))
+    return rows
+
+
+def measure_python(build: Callable[[], object]) -> tuple[object, int]:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        obj = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return obj, current
+
+
+def measure_arrow(build: Callable[[], ArticleBatch]) -> tuple[ArticleBatch, int]:
+    gc.collect()
+    before = pa.total_allocated_bytes()
+    batch = build()
+    return batch, pa.total_allocated_bytes() - before
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--articles", type=int, default=50_000)
+    ap.add_argument("--text-chars", type=int, default=3000)
+    args = ap.parse_args()
+
+    n = args.articles
+    results: list[tuple[str, int]] = []
+
+    # las filas se generan dentro de cada medición: los strings del lote
+    # cuentan en cada variante, como si vinieran recién leídos
+    legacy, size = measure_python(lambda: [LegacyArticle(*r) for r in raw_rows(n, args.text_chars)])
+    results.append(("dataclass anterior", size))
+    del legacy
+
+    current, size = measure_python(lambda: [Article(*r) for r in raw_rows(n, args.text_chars)])
+    results.append(("Article (slots)", size))
+
+    # ArticleBatch: se mide aparte la memoria de Arrow; los Article de
+    # origen ya existen, así que solo se cuentan las columnas
+    batch, size = measure_arrow(lambda: ArticleBatch.from_articles(current))
+    results.append(("ArticleBatch (Arrow)", size))
+
+    base = results[0][1]
+    print(f"{n} artículos, {args.text_chars} caracteres de texto c/u")
+    print(f"{'Representación':<24} {'MB':>9} {'bytes/art':>10} {'vs. anterior':>13}")
+    for name, size in results:
+        print(f"{name:<24} {size / 1e6:>9.1f} {size / n:>10.0f} {size / base:>12.0%}")
+    print(f"(Arrow table.nbytes: {batch.nbytes / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark: locators (un round-trip por elemento) vs. un solo
+evaluate con spec declarativo (base/dom_extract.py).
+
+Usa HTML sintético con el markup de Kotaku cargado con page.set_content,
+así que no necesita red. Desde scraping_code/:
+
+    python -m benchmarks.bench_dom_extraction --cards 60 --paragraphs 40
+"""
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+from playwright.sync_api import Page, sync_playwright
+
+from scraper_models.kotaku_reviews_scraper import KotakuReviewsScraper
+from base.dom_extract import extract_fields
+
+
+def listing_html(cards: int) -> str:
+    items = "\n".join(
+        f'<a class="block" cmp-ltrk="archive-posts" href="https://kotaku.com/review-{i}">Review {i}</a>'
+        for i in range(cards)
+    )
+    return f"<html><body>{items}</body></html>"
+
+
+def article_html(paragraphs: int) -> str:
+    body = "\n".join(f"<p>Párrafo {i} del review con algo de texto.</p>" for i in range(paragraphs))
+    return (
+        '<html><head><meta property="article:published_time" content="2025-11-20T10:00:00+00:00"></head>'
+        f'<body><h1>Título del review</h1><div class="entry-content">{body}</div></body></html>'
+    )
+
+
+# --- forma anterior: locators elemento por elemento ---
+
+def links_with_locators(page: Page, selector: str) -> list[str]:
+    anchors = page.locator(selector)
+    count = anchors.count()
+    return [anchors.nth(i).get_attribute("href") for i in range(count)]
+
+
+def article_with_locators(page: Page) -> dict:
+    title = page.locator("h1").inner_text().strip()
+    meta = page.locator('meta[property="article:published_time"]')
+    published_at = meta.first.get_attribute("content") if meta.count() > 0 else None
+    container = page.locator("div.entry-content")
+    paragraphs = container.locator("p").all_text_contents() if container.count() else []
+    return {"title": title, "published_at": published_at, "paragraphs": paragraphs}
+
+
+def timed(fn, repeats: int) -> list[float]:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def report(name: str, before: list[float], after: list[float]):
+    b, a = statistics.median(before), statistics.median(after)
+    print(f"{name:<10} locators: {b:8.2f} ms   evaluate: {a:8.2f} ms   x{b / a:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cards", type=int, default=60)
+    parser.add_argument("--paragraphs", type=int, default=40)
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+
+    scraper = KotakuReviewsScraper(output_dir="/tmp/bench_raw", meta_dir="/tmp/bench_meta")
+
+    with sync_playwright() as pw:
+        browser = pw.chromium.launch(headless=True)
+        page = browser.new_page()
+
+        page.set_content(listing_html(args.cards))
+        before = timed(lambda: links_with_locators(page, scraper.CARD_LINK_SELECTOR), args.repeats)
+        after = timed(lambda: extract_fields(page, scraper.listing_spec), args.repeats)
+        report("listado", before, after)
+
+        page.set_content(article_html(args.paragraphs))
+        before = timed(lambda: article_with_locators(page), args.repeats)
+        after = timed(lambda: extract_fields(page, scraper.article_spec), args.repeats)
+        report("artículo", before, after)
+
+        browser.close()
+
+
+if __name__ == "__main__":
+    main()
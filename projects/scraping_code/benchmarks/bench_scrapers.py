@@ -0,0 +1,205 @@
+"""
+Benchmark end-to-end de los scrapers contra respuestas grabadas (offline).
+
+1) Grabar una vez contra los sitios reales (queda en benchmarks/fixtures/<fuente>):
+
+    python -m benchmarks.bench_scrapers record --scrapers kotaku ign
+
+2) Reproducir sin red, p. ej. en CI:
+
+    python -m benchmarks.bench_scrapers run --repeats 3 --json bench.json
+    python -m benchmarks.bench_scrapers run --baseline bench.json --max-regression 0.2
+
+Cada corrida va en su propio proceso (spawn) con directorios de salida y
+meta temporales, así empieza sin URLs vistas y el pico de RSS es solo de
+esa corrida. Se reporta artículos/s, pico de RSS (Python y, aparte, los
+Chromium hijos) y el tiempo por fase de base/metrics.py. Con
+`--baseline` el proceso sale con código 1 si artículos/s cae más que
+`--max-regression` respecto de la línea base.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from base.base_scraper import BaseNewsScraper
+from base.browser_pool import close_browser_pool
+from base.replay import Replay
+from scraper_models.ign_reviews_scraper import IgnReviewsScraper
+from scraper_models.kotaku_reviews_scraper import KotakuReviewsScraper
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures"
+
+# configuración fija para que grabación y reproducción pidan las mismas páginas
+SCRAPERS = {
+    "kotaku": lambda **kw: KotakuReviewsScraper(max_pages=3, crawl_mode="backfill", **kw),
+    "ign": lambda **kw: IgnReviewsScraper(scroll_deadline=20.0, target_items=40, crawl_mode="backfill", **kw),
+}
+
+
+def build_scraper(name: str, workdir: Path, max_concurrency: int, replay: Replay) -> BaseNewsScraper:
+    scraper = SCRAPERS[name](
+        output_dir=str(workdir / "raw"),
+        meta_dir=str(workdir / "meta"),
+        max_concurrency=max_concurrency,
+    )
+    scraper.replay = replay
+    if replay.mode == "replay":
+        # contra disco no tiene sentido esperar turnos del rate limiter
+        scraper.requests_per_second = None
+    return scraper
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _reap_children():
+    """Espera a los hijos que ya terminaron: RUSAGE_CHILDREN solo cuenta los esperados."""
+    while True:
+        try:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+
+
+def bench_once(name: str, fixtures: str, max_concurrency: int) -> dict:
+    """Una corrida en replay; se ejecuta en un proceso nuevo."""
+    replay = Replay(Path(fixtures) / name, mode="replay")
+    with tempfile.TemporaryDirectory(prefix=f"bench_{name}_") as tmp:
+        scraper = build_scraper(name, Path(tmp), max_concurrency, replay)
+        start = time.perf_counter()
+        articles = scraper.run()
+        seconds = time.perf_counter() - start
+
+    # sin tope de navegadores el pool deja los Chromium calientes: se cierran
+    # (con el driver de Playwright) y se esperan para que entren en la medición
+    close_browser_pool()
+    _reap_children()
+
+    snap = scraper.metrics.snapshot()
+    return {
+        "scraper": name,
+        "articles": articles,
+        "seconds": seconds,
+        "articles_per_second": articles / seconds if seconds > 0 else 0.0,
+        "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF),
+        "peak_rss_children_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN),
+        "phases": {p: {"total_s": h["total_s"], "p50_s": h["p50_s"], "p95_s": h["p95_s"]}
+                   for p, h in snap["phases"].items()},
+    }
+
+
+def record(names: list[str], fixtures: Path, max_concurrency: int):
+    for name in names:
+        replay = Replay(fixtures / name, mode="record")
+        with tempfile.TemporaryDirectory(prefix=f"record_{name}_") as tmp:
+            scraper = build_scraper(name, Path(tmp), max_concurrency, replay)
+            try:
+                articles = scraper.run()
+            finally:
+                replay.close()
+        print(f"[{name}] Grabada una corrida con {articles} artículos en {fixtures / name}")
+
+
+def summarize(runs: list[dict]) -> dict:
+    """Mediana de las repeticiones de un scraper."""
+    phases = sorted({p for r in runs for p in r["phases"]})
+    return {
+        "articles": runs[0]["articles"],
+        "articles_per_second": statistics.median(r["articles_per_second"] for r in runs),
+        "seconds": statistics.median(r["seconds"] for r in runs),
+        "peak_rss_mb": max(r["peak_rss_mb"] for r in runs),
+        "peak_rss_children_mb": max(r["peak_rss_children_mb"] for r in runs),
+        "phases": {
+            p: statistics.median(r["phases"].get(p, {}).get("total_s", 0.0) for r in runs)
+            for p in phases
+        },
+    }
+
+
+def print_report(results: dict[str, dict]):
+    print("=== Benchmark (replay) ===")
+    print(f"{'Scraper':<10} {'Artículos':>10} {'Art/s':>8} {'Segundos':>9} {'RSS MB':>8} {'Chromium MB':>12}")
+    for name, r in sorted(results.items()):
+        print(
+            f"{name:<10} {r['articles']:>10} {r['articles_per_second']:>8.2f} {r['seconds']:>9.2f} "
+            f"{r['peak_rss_mb']:>8.0f} {r['peak_rss_children_mb']:>12.0f}"
+        )
+        for phase, total in sorted(r["phases"].items()):
+            print(f"{'':<10} {phase:<20} {total:>8.2f}s")
+
+
+def check_regressions(results: dict[str, dict], baseline: dict[str, dict], max_regression: float) -> list[str]:
+    failures = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None or base["articles_per_second"] == 0:
+            continue
+        change = r["articles_per_second"] / base["articles_per_second"] - 1
+        if change < -max_regression:
+            failures.append(
+                f"{name}: {r['articles_per_second']:.2f} art/s vs {base['articles_per_second']:.2f} "
+                f"en la línea base ({change:+.0%})"
+            )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline de los scrapers")
+    parser.add_argument("command", choices=["record", "run"])
+    parser.add_argument("--scrapers", nargs="+", choices=sorted(SCRAPERS), default=sorted(SCRAPERS))
+    parser.add_argument("--fixtures", type=Path, default=FIXTURES_DIR)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--json", type=Path, help="Guardar los resultados en este archivo")
+    parser.add_argument("--baseline", type=Path, help="Resultados previos (--json) para comparar")
+    parser.add_argument("--max-regression", type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        record(args.scrapers, args.fixtures, args.concurrency)
+        return
+
+    missing = [n for n in args.scrapers if not (args.fixtures / n / "manifest.json").exists()]
+    if missing:
+        parser.error(f"Faltan fixtures para {', '.join(missing)}: correr primero `record`")
+
+    # un proceso nuevo por corrida: el pico de RSS no arrastra corridas anteriores
+    mp_context = multiprocessing.get_context("spawn")
+    results: dict[str, dict] = {}
+    for name in args.scrapers:
+        runs = []
+        for _ in range(args.repeats):
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp_context) as executor:
+                runs.append(executor.submit(bench_once, name, str(args.fixtures), args.concurrency).result())
+        results[name] = summarize(runs)
+
+    print_report(results)
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        failures = check_regressions(results, baseline, args.max_regression)
+        for failure in failures:
+            print(f"REGRESIÓN {failure}")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
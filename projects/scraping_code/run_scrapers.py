@@ -1,22 +1,247 @@
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from base import limits
+from base.base_scraper import BaseNewsScraper
+from base.corpus import CorpusIndex
+from base.frontier import open_frontier
 from scraper_models.ign_reviews_scraper import IgnReviewsScraper
 from scraper_models.kotaku_reviews_scraper import KotakuReviewsScraper
 # luego agregarán más:
 # from .pcgamer_reviews_scraper import PcGamerReviewsScraper
 # from .vandal_reviews_scraper import VandalReviewsScraper
 
+# Topes globales para todos los scrapers que corren a la vez
+MAX_BROWSERS = 6
+MAX_PAGES_PER_HOST = 4
+
+
+def run_one(scraper: BaseNewsScraper) -> dict:
+    """
+    Ejecuta un scraper dentro de un proceso del pool y devuelve el
+    resumen de la corrida (los artículos ya quedaron en disco).
+    """
+    print(f"=== Ejecutando {scraper.source_name} ===")
+    start = time.perf_counter()
+    error = None
+    articles = 0
+    try:
+        articles = scraper.run()
+    except Exception as ex:
+        error = f"{type(ex).__name__}: {ex}"
+        print(f"[{scraper.source_name}] Falló la corrida: {error}")
+
+    metrics = scraper.metrics.snapshot() if scraper.metrics is not None else None
+    return {
+        "source": scraper.source_name,
+        "articles": articles,
+        "seconds": time.perf_counter() - start,
+        "pages_per_second": metrics["pages_per_second"] if metrics else 0.0,
+        "error": error,
+    }
+
+
+def check_browsers(scrapers: list[BaseNewsScraper], max_browsers: int):
+    """Una corrida reserva todos sus navegadores juntos: si pide más que el tope, espera para siempre."""
+    for scraper in scrapers:
+        if scraper.browsers_needed() > max_browsers:
+            raise ValueError(
+                f"{scraper.source_name} necesita {scraper.browsers_needed()} navegadores "
+                f"y el tope global es {max_browsers}"
+            )
+
+
+def run_parallel(
+    scrapers: list[BaseNewsScraper],
+    max_browsers: int = MAX_BROWSERS,
+    max_pages_per_host: int = MAX_PAGES_PER_HOST,
+) -> list[dict]:
+    """
+    Corre cada scraper en su propio proceso, compartiendo entre todos un
+    tope de navegadores abiertos y de páginas abiertas por host.
+    """
+    check_browsers(scrapers, max_browsers)
+
+    hosts = {limits.host_of(url) for s in scrapers for url in s.start_urls}
+
+    # spawn: cada proceso arranca limpio, sin heredar estado de Playwright
+    mp_context = multiprocessing.get_context("spawn")
+    shared = limits.create_shared(mp_context, max_browsers, hosts, max_pages_per_host)
+
+    results: list[dict] = []
+    with ProcessPoolExecutor(
+        max_workers=len(scrapers),
+        mp_context=mp_context,
+        initializer=limits.configure,
+        initargs=shared,
+    ) as executor:
+        futures = [executor.submit(run_one, scraper) for scraper in scrapers]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+
+    return results
+
+
+def run_sequential(scrapers: list[BaseNewsScraper]) -> list[dict]:
+    """
+    Corre los scrapers uno tras otro en este proceso. Comparten el pool de
+    Chromium calientes (base/browser_pool.py): solo el primero paga el
+    arranque del navegador.
+    """
+    return [run_one(scraper) for scraper in scrapers]
+
+
+def frontier_worker(scraper: BaseNewsScraper, frontier_spec: str) -> int:
+    """Worker de un proceso del pool: abre su propia conexión al frontier."""
+    with open_frontier(frontier_spec) as frontier:
+        return scraper.work(frontier)
+
+
+def run_frontier(
+    scrapers: list[BaseNewsScraper],
+    frontier_spec: str,
+    role: str,
+    workers: int,
+    max_browsers: int = MAX_BROWSERS,
+    max_pages_per_host: int = MAX_PAGES_PER_HOST,
+):
+    """
+    Corrida repartida a través de un frontier (base/frontier.py):
+
+    - discover: encola las URLs nuevas de los listados
+    - work: hasta `workers` procesos por fuente extraen artículos de la
+      cola, sin que los navegadores de una fuente pasen `max_browsers`
+      (los que no entran solo esperarían su lugar); en otras máquinas se
+      corre solo este rol apuntando al mismo frontier
+    - collect: guarda lo que reportaron los workers
+    - all: los tres en orden
+    """
+    if role in ("discover", "all"):
+        with open_frontier(frontier_spec) as frontier:
+            for scraper in scrapers:
+                scraper.discover(frontier)
+
+    if role in ("work", "all"):
+        check_browsers(scrapers, max_browsers)
+        per_source = {}
+        for scraper in scrapers:
+            per_source[scraper.source_name] = min(workers, max_browsers // scraper.browsers_needed())
+            if per_source[scraper.source_name] < workers:
+                print(
+                    f"[{scraper.source_name}] {per_source[scraper.source_name]} workers en vez de {workers}: "
+                    f"cada uno usa {scraper.browsers_needed()} navegadores y el tope es {max_browsers}"
+                )
+
+        hosts = {limits.host_of(url) for s in scrapers for url in s.start_urls}
+        mp_context = multiprocessing.get_context("spawn")
+        shared = limits.create_shared(mp_context, max_browsers, hosts, max_pages_per_host)
+        with ProcessPoolExecutor(
+            max_workers=sum(per_source.values()),
+            mp_context=mp_context,
+            initializer=limits.configure,
+            initargs=shared,
+        ) as executor:
+            futures = {
+                executor.submit(frontier_worker, scraper, frontier_spec): scraper.source_name
+                for scraper in scrapers
+                for _ in range(per_source[scraper.source_name])
+            }
+            for fut in as_completed(futures):
+                try:
+                    fut.result()
+                except Exception as ex:
+                    # sus URLs vuelven a la cola cuando vence el lease
+                    print(f"[{futures[fut]}] Un worker falló: {type(ex).__name__}: {ex}")
+
+    if role in ("collect", "all"):
+        with open_frontier(frontier_spec) as frontier:
+            for scraper in scrapers:
+                scraper.collect_frontier(frontier)
+
+
+def print_summary(results: list[dict], total_seconds: float):
+    print("=== Resumen ===")
+    print(f"{'Fuente':<20} {'Artículos':>10} {'Segundos':>10} {'Págs/s':>8}  Estado")
+    for r in sorted(results, key=lambda r: r["source"]):
+        status = "OK" if r["error"] is None else r["error"]
+        print(f"{r['source']:<20} {r['articles']:>10} {r['seconds']:>10.1f} {r['pages_per_second']:>8.2f}  {status}")
+    total_articles = sum(r["articles"] for r in results)
+    print(f"{'TOTAL':<20} {total_articles:>10} {total_seconds:>10.1f}")
+
+
 def main():
-    
+    parser = argparse.ArgumentParser(description="Ejecuta los scrapers de reviews")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--backfill",
+        action="store_true",
+        help="Recorre todas las páginas de listado (sin corte temprano)",
+    )
+    mode.add_argument(
+        "--refresh",
+        action="store_true",
+        help="No mira listados: revisa si cambiaron artículos ya guardados",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        help="Expone /metrics (Prometheus) desde este puerto; un puerto por scraper",
+    )
+    parser.add_argument(
+        "--sequential",
+        action="store_true",
+        help="Una fuente tras otra en un solo proceso, reutilizando los navegadores",
+    )
+    parser.add_argument(
+        "--frontier",
+        default=None,
+        help="Reparte la corrida con un frontier (ruta SQLite o URL de otro backend)",
+    )
+    parser.add_argument(
+        "--role",
+        choices=("discover", "work", "collect", "all"),
+        default="all",
+        help="Con --frontier: qué parte de la corrida hace este proceso",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=2,
+        help="Con --frontier: procesos worker por fuente (menos si no entran en el tope de navegadores)",
+    )
+    parser.add_argument(
+        "--update-corpus",
+        action="store_true",
+        help="Al terminar, carga los CSV nuevos en el índice de búsqueda (base/corpus.py)",
+    )
+    args = parser.parse_args()
+    crawl_mode = "backfill" if args.backfill else "refresh" if args.refresh else "incremental"
+
     scrapers = [
-        #IgnReviewsScraper(),
-        KotakuReviewsScraper(max_pages=50),
+        #IgnReviewsScraper(crawl_mode=crawl_mode),
+        KotakuReviewsScraper(max_pages=50, max_concurrency=4, crawl_mode=crawl_mode),
         # PcGamerReviewsScraper(),
         # VandalReviewsScraper(),
     ]
+    if args.metrics_port is not None:
+        for i, scraper in enumerate(scrapers):
+            scraper.metrics_port = args.metrics_port + i
 
-    for scraper in scrapers:
-        print(f"=== Ejecutando {scraper.source_name} ===")
-        scraper.run()
+    if args.frontier is not None:
+        run_frontier(scrapers, args.frontier, args.role, args.workers)
+    else:
+        start = time.perf_counter()
+        results = run_sequential(scrapers) if args.sequential else run_parallel(scrapers)
+        print_summary(results, time.perf_counter() - start)
+
+    if args.update_corpus:
+        # los scrapers escriben todos en el mismo data/raw por defecto
+        with CorpusIndex() as corpus:
+            corpus.ingest(scrapers[0].output_dir)
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
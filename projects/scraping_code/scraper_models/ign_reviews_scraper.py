@@ -1,10 +1,12 @@
 # scraping/ign_reviews_scraper.py
 
-from datetime import datetime
+from datetime import datetime, timezone
 from playwright.sync_api import Page
 from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 from base.base_scraper import BaseNewsScraper
 from base.base_models import Article
+from base.dom_extract import Field
+from base.scroll import scroll_until
 
 
 class IgnReviewsScraper(BaseNewsScraper):
@@ -21,6 +23,38 @@ class IgnReviewsScraper(BaseNewsScraper):
 
     BASE_URL = "https://www.ign.com"
 
+    # El listado es una app JS con scroll infinito: scripts y XHR sí hacen falta
+    needed_resource_types = frozenset({"document", "script", "xhr", "fetch"})
+
+    CARD_LINK_SELECTOR = "a.item-body[data-cy='item-body']"
+
+    # Campos que se sacan de cada página en una sola llamada (ver base/dom_extract.py)
+    listing_spec = {
+        "links": Field(CARD_LINK_SELECTOR, attr="href", many=True),
+    }
+    article_spec = {
+        # Normalmente el título es un <h1> principal
+        "title": Field("h1"),
+        # Muchas webs usan meta "article:published_time"
+        "published_at": Field('meta[property="article:published_time"]', attr="content"),
+        # <div data-cy="article-content" ...> y sus <p data-cy="paragraph">
+        "containers": Field("div[data-cy='article-content']", count=True),
+        "paragraphs": Field("div[data-cy='article-content'] p[data-cy='paragraph']", many=True),
+    }
+
+    def __init__(self, scroll_deadline: float | None = None, target_items: int | None = None, **kwargs):
+        """
+        scroll_deadline: segundos máximos de scroll en el listado
+            (por defecto 30 en modo incremental y 600 en backfill).
+        target_items: dejar de scrollear al tener esta cantidad de reviews.
+        El resto de los argumentos van a BaseNewsScraper.
+        """
+        super().__init__(**kwargs)
+        if scroll_deadline is None:
+            scroll_deadline = 600.0 if self.crawl_mode == "backfill" else 30.0
+        self.scroll_deadline = scroll_deadline
+        self.target_items = target_items
+
     # ------------ Helpers específicos de IGN ------------
 
     def normalize_url(self, url: str) -> str:
@@ -30,38 +64,31 @@ class IgnReviewsScraper(BaseNewsScraper):
         return url
 
     def extract_article_links(self, page: Page):
-        CARD_LINK_SELECTOR = "a.item-body[data-cy='item-body']"
-
-        # Scroll progresivo
-        max_scrolls = 10
-        last_count = 0
-
-        for i in range(max_scrolls):
-            # espera a que haya al menos algunos items
-            try:
-                page.wait_for_selector(CARD_LINK_SELECTOR, timeout=5000)
-            except PlaywrightTimeoutError:
-                break
-
-            anchors = page.locator(CARD_LINK_SELECTOR)
-            count = anchors.count()
-
-            if count == last_count:
-                # ya no aparecen nuevos items → paramos
-                break
-
-            last_count = count
-            # scroll hacia abajo
-            page.mouse.wheel(0, 2000)
-            page.wait_for_timeout(1500)  # 1.5s para que carguen nuevos
-
-        # al final, tomamos todos los links cargados
-        anchors = page.locator(CARD_LINK_SELECTOR)
-        count = anchors.count()
-        print(f"[{self.source_name}] Total de reviews visibles tras scroll: {count}")
-
-        for i in range(count):
-            href = anchors.nth(i).get_attribute("href")
+        # espera a que haya al menos algunos items
+        try:
+            page.wait_for_selector(self.CARD_LINK_SELECTOR, timeout=5000)
+        except PlaywrightTimeoutError:
+            print(f"[{self.source_name}] No aparecieron reviews en el DOM, selector: {self.CARD_LINK_SELECTOR}")
+            return
+
+        # En modo incremental alcanza con llegar a la primera review ya vista:
+        # lo que sigue hacia abajo es más viejo
+        stop_when = None
+        if self.crawl_mode == "incremental":
+            def stop_when(hrefs: list[str]) -> bool:
+                return any(self.is_seen(h) for h in hrefs if h)
+
+        # Scroll adaptativo: espera a que crezca la lista, no un tiempo fijo
+        hrefs = scroll_until(
+            page,
+            self.CARD_LINK_SELECTOR,
+            deadline=self.scroll_deadline,
+            target_count=self.target_items,
+            stop_when=stop_when,
+        )
+        print(f"[{self.source_name}] Total de reviews visibles tras scroll: {len(hrefs)}")
+
+        for href in hrefs:
             if href:
                 yield href
 
@@ -73,41 +100,27 @@ class IgnReviewsScraper(BaseNewsScraper):
           <div data-cy="article-content" class="... article-content page-0">
         Párrafos:
           <p data-cy="paragraph" class="paragraph ...">...</p>
+        Todo sale de `article_spec` en un solo evaluate.
         """
+        fields = self.extract_fields(page, self.article_spec)
+
         # --- título ---
-        try:
-            # Normalmente el título es un <h1> principal
-            title = page.locator("h1").inner_text().strip()
-        except Exception:
+        title = (fields["title"] or "").strip()
+        if not title:
             print(f"[{self.source_name}] No se pudo obtener título para {url}")
             return None
 
         # --- fecha de publicación ---
-        published_at = None
-        try:
-            # Muchas webs usan meta "article:published_time"
-            meta = page.locator('meta[property="article:published_time"]')
-            if meta.count() > 0:
-                published_at = meta.first.get_attribute("content")
-        except Exception:
-            pass
-
+        published_at = fields["published_at"]
         if not published_at:
-            published_at = datetime.now(datetime.timezone.utc).isoformat()
+            published_at = datetime.now(timezone.utc).isoformat()
 
         # --- cuerpo del review ---
-        # Aquí también tienes que mirar el DOM:
-        #   - qué contenedor envuelve el texto del review
-        #   - de ahí puedes sacar todos los <p>
-        # <div data-cy="article-content" ...>
-        # EJEMPLO / PLANTILLA:
-
-        content_container = page.locator("div[data-cy='article-content']")
-        if content_container.count() == 0:
+        if fields["containers"] == 0:
             print(f"[{self.source_name}] No se encontró article-content para {url}")
             return None
-        
-        paragraphs = content_container.locator("p[data-cy='paragraph']").all_text_contents()
+
+        paragraphs = fields["paragraphs"]
         text = "\n".join(p.strip() for p in paragraphs if p and p.strip())
 
         if not text:
@@ -115,7 +128,7 @@ class IgnReviewsScraper(BaseNewsScraper):
             return None
 
         created_at = Article.now_iso()
-        article_id = str(hash(url))
+        article_id = Article.stable_id(url)
 
         return Article(
             id=article_id,
@@ -3,6 +3,8 @@ from playwright.sync_api import Page, TimeoutError as PlaywrightTimeoutError
 
 from base.base_scraper import BaseNewsScraper
 from base.base_models import Article
+from base.dom_extract import Field
+from base.static_fetch import StaticDocument
 
 
 class KotakuReviewsScraper(BaseNewsScraper):
@@ -13,21 +15,56 @@ class KotakuReviewsScraper(BaseNewsScraper):
     source_name = "Kotaku-Reviews"
     BASE_URL = "https://kotaku.com"
 
-    def __init__(self, max_pages: int = 5, output_dir: str = "data/raw", meta_dir: str = "data/meta"):
-        super().__init__(output_dir=output_dir, meta_dir=meta_dir)
+    # /reviews/page/N va del más nuevo al más viejo: corte temprano en modo incremental
+    paginated = True
+
+    # Listados y reviews vienen renderizados del servidor: no hace falta Chromium
+    static_page_types = frozenset({"listing", "article"})
+    # Solo se cae a Playwright cuando el HTML estático no trae los selectores,
+    # o sea cuando el contenido lo arma el JS: sin scripts (y sus XHR) el
+    # navegador vería el mismo HTML. Imágenes, CSS, fuentes y media se bloquean igual.
+    needed_resource_types = frozenset({"document", "script", "xhr", "fetch"})
+
+    CARD_LINK_SELECTOR = 'a.block[cmp-ltrk="archive-posts"][href]'
+    ARTICLE_CONTAINER_SELECTOR = "div.entry-content"
+
+    # Campos que se sacan de cada página en una sola llamada (ver base/dom_extract.py)
+    listing_spec = {
+        "links": Field(CARD_LINK_SELECTOR, attr="href", many=True),
+    }
+    article_spec = {
+        "title": Field("h1"),
+        "published_at": Field('meta[property="article:published_time"]', attr="content"),
+        "containers": Field(ARTICLE_CONTAINER_SELECTOR, count=True),
+        # todos los <p> dentro del contenedor
+        "paragraphs": Field(f"{ARTICLE_CONTAINER_SELECTOR} p", many=True),
+    }
+
+    def __init__(self, max_pages: int | None = 5, **kwargs):
+        """
+        max_pages: tope de páginas de listado (None = hasta que se acaben,
+        útil con crawl_mode="backfill"). El resto de los argumentos van a
+        BaseNewsScraper.
+        """
+        super().__init__(**kwargs)
         self.max_pages = max_pages
 
-    @property
-    def start_urls(self) -> list[str]:
+    def iter_listing_urls(self):
         """
-        Genera las URLs de las páginas de reviews:
+        Genera a demanda las URLs de las páginas de reviews:
         Página 1  -> https://kotaku.com/reviews
         Página 2+ -> https://kotaku.com/reviews/page/N
         """
-        urls: list[str] = ["https://kotaku.com/reviews"]
-        for page in range(2, self.max_pages + 1):
-            urls.append(f"https://kotaku.com/reviews/page/{page}")
-        return urls
+        yield "https://kotaku.com/reviews"
+        page = 2
+        while self.max_pages is None or page <= self.max_pages:
+            yield f"https://kotaku.com/reviews/page/{page}"
+            page += 1
+
+    @property
+    def start_urls(self) -> list[str]:
+        # Solo la primera página: el resto sale de iter_listing_urls
+        return ["https://kotaku.com/reviews"]
 
     def normalize_url(self, url: str) -> str:
         if url.startswith("/"):
@@ -46,62 +83,57 @@ class KotakuReviewsScraper(BaseNewsScraper):
            cmp-ltrk="archive-posts"
            ...>
         """
-        CARD_LINK_SELECTOR = 'a.block[cmp-ltrk="archive-posts"][href]'
-
         try:
-            page.wait_for_selector(CARD_LINK_SELECTOR, timeout=15000)
+            page.wait_for_selector(self.CARD_LINK_SELECTOR, timeout=15000)
         except PlaywrightTimeoutError:
-            print(f"[{self.source_name}] No aparecieron reviews en el DOM, selector: {CARD_LINK_SELECTOR}")
+            print(f"[{self.source_name}] No aparecieron reviews en el DOM, selector: {self.CARD_LINK_SELECTOR}")
             return []
 
-        anchors = page.locator(CARD_LINK_SELECTOR)
-        count = anchors.count()
-        print(f"[{self.source_name}] Encontrados {count} items en listado de reviews.")
-
-        for i in range(count):
-            href = anchors.nth(i).get_attribute("href")
-            if not href:
-                continue
+        hrefs = self.extract_fields(page, self.listing_spec)["links"]
+        print(f"[{self.source_name}] Encontrados {len(hrefs)} items en listado de reviews.")
+        return self.filter_links(hrefs)
 
-            # Evitar páginas de autor:
-            if "/author/" in href:
-                continue
-
-            yield href
+    def filter_links(self, hrefs: list[str]) -> list[str]:
+        # Evitar páginas de autor:
+        return [href for href in hrefs if href and "/author/" not in href]
 
     # ------------ REVIEW INDIVIDUAL ------------
 
     def extract_article_data(self, page: Page, url: str) -> Article | None:
+        return self.article_from_fields(self.extract_fields(page, self.article_spec), url)
+
+    # ------------ FAST PATH HTTP (mismos selectores, sin navegador) ------------
+
+    def extract_article_links_static(self, doc: StaticDocument):
+        hrefs = doc.extract(self.listing_spec)["links"]
+        if not hrefs:
+            # puede que el listado haya pasado a cargarse por JS
+            return None
+
+        print(f"[{self.source_name}] Encontrados {len(hrefs)} items en listado de reviews (HTML).")
+        return self.filter_links(hrefs)
+
+    def extract_article_data_static(self, doc: StaticDocument, url: str) -> Article | None:
+        return self.article_from_fields(doc.extract(self.article_spec), url)
+
+    def article_from_fields(self, fields: dict, url: str) -> Article | None:
         # --- título ---
-        try:
-            title = page.locator("h1").inner_text().strip()
-        except Exception:
+        title = (fields["title"] or "").strip()
+        if not title:
             print(f"[{self.source_name}] No se pudo obtener título para {url}")
             return None
 
         # --- fecha ---
-        published_at = None
-        try:
-            meta = page.locator('meta[property="article:published_time"]')
-            if meta.count() > 0:
-                published_at = meta.first.get_attribute("content")
-        except Exception:
-            pass
-
+        published_at = fields["published_at"]
         if not published_at:
             published_at = datetime.utcnow().isoformat()
 
         # --- cuerpo del review ---
-        ARTICLE_CONTAINER_SELECTOR = "div.entry-content"
-
-        # Usamos locator directamente en la page
-        container = page.locator(ARTICLE_CONTAINER_SELECTOR)
-        if container.count() == 0:
+        if fields["containers"] == 0:
             print(f"[{self.source_name}] No se encontró contenedor de artículo para {url}")
             return None
 
-        # Tomamos todos los <p> dentro de ese contenedor
-        paragraphs = container.locator("p").all_text_contents()
+        paragraphs = fields["paragraphs"]
         text = "\n".join(p.strip() for p in paragraphs if p and p.strip())
 
         if not text:
@@ -109,7 +141,7 @@ class KotakuReviewsScraper(BaseNewsScraper):
             return None
 
         created_at = Article.now_iso()
-        article_id = str(hash(url))
+        article_id = Article.stable_id(url)
 
         return Article(
             id=article_id,
@@ -120,4 +152,3 @@ class KotakuReviewsScraper(BaseNewsScraper):
             text=text,
             created_at=created_at,
         )
-
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# los módulos se importan como en run_scrapers.py: `from base... import ...`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
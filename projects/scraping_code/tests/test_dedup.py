@@ -0,0 +1,69 @@
+import random
+import threading
+
+from base.base_models import Article
+from base.dedup import _MAX_HASH, _MERSENNE_PRIME, MinHasher, NearDuplicateIndex, _hash64
+
+rng = random.Random(7)
+VOCAB = [f"palabra{i}" for i in range(2000)]
+TEXT = " ".join(rng.choice(VOCAB) for _ in range(400))
+OTHER = " ".join(rng.choice(VOCAB) for _ in range(400))
+
+
+def article(article_id: str, text: str) -> Article:
+    url = f"https://example.com/{article_id}"
+    return Article(article_id, "test", "Review", url, "2025-11-20T10:00:00+00:00", text, "2025-11-20T12:00:00")
+
+
+def edit(text: str, every: int) -> str:
+    """Cambia una palabra de cada `every` (como una review sindicada con retoques)."""
+    words = text.split()
+    for i in range(0, len(words), every):
+        words[i] = "cambiada"
+    return " ".join(words)
+
+
+def test_signature_matches_the_scalar_formula():
+    # las firmas ya guardadas en disco se calcularon así, de a un valor
+    hasher = MinHasher(num_perm=16)
+    perms = [(_hash64(f"1:a:{i}") % _MERSENNE_PRIME or 1, _hash64(f"1:b:{i}") % _MERSENNE_PRIME) for i in range(16)]
+    hashes = hasher.shingles(TEXT)
+    expected = [min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes) for a, b in perms]
+    assert hasher.signature(TEXT).tolist() == expected
+    assert hasher.signature("").tolist() == [_MAX_HASH] * 16
+
+
+def test_detects_near_duplicates_but_not_the_same_article(tmp_path):
+    with NearDuplicateIndex(tmp_path / "dedup.sqlite") as index:
+        assert index.check_and_add(article("a", TEXT)) is None
+        # re-scrapear la misma URL no la vuelve copia de sí misma
+        assert index.check_and_add(article("a", edit(TEXT, 60))) is None
+
+        # "a" quedó indexado con la versión nueva
+        assert index.check_and_add(article("b", edit(TEXT, 60))) == ("https://example.com/a", 1.0)
+        url, similarity = index.check_and_add(article("c", TEXT))
+        assert url == "https://example.com/a"
+        assert 0.85 <= similarity < 1.0
+        assert index.check_and_add(article("d", OTHER)) is None
+
+        # las copias no se indexan
+        rows = index.conn.execute("SELECT article_id FROM signatures ORDER BY article_id").fetchall()
+        assert rows == [("a",), ("d",)]
+
+
+def test_concurrent_copies_index_only_one(tmp_path):
+    # dos procesos de run_scrapers con la misma review sindicada: uno solo la guarda
+    barrier = threading.Barrier(4)
+    results = []
+
+    def worker(n):
+        with NearDuplicateIndex(tmp_path / "dedup.sqlite") as index:
+            barrier.wait()
+            results.append(index.check_and_add(article(f"copy-{n}", TEXT)))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(r is None for r in results) == [False, False, False, True]
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from base.base_models import Article
+from base.frontier import SqliteFrontier
+
+SOURCE = "kotaku-reviews"
+
+
+@pytest.fixture
+def frontier(tmp_path):
+    with SqliteFrontier(tmp_path / "frontier.sqlite", max_attempts=2, retry_backoff_base=0.0) as f:
+        yield f
+
+
+def article(url: str) -> Article:
+    return Article("1", SOURCE, "Review", url, "2025-11-20T10:00:00+00:00", "texto", "2025-11-20T12:00:00", "fp")
+
+
+def expire(frontier, lease):
+    """Deja vencido el lease sin esperar lease_seconds."""
+    frontier.conn.execute("UPDATE frontier SET lease_expires = ? WHERE url = ?", (time.time() - 1, lease.url))
+
+
+def test_lease_is_exclusive_until_it_expires(frontier):
+    frontier.push(SOURCE, ["https://a/1"])
+    (first,) = frontier.lease(SOURCE, "w1", limit=10, lease_seconds=300)
+    assert frontier.lease(SOURCE, "w2", limit=10, lease_seconds=300) == []
+
+    expire(frontier, first)
+    (second,) = frontier.lease(SOURCE, "w2", limit=10, lease_seconds=300)
+    assert second.url == first.url
+    assert second.attempts == 2
+    assert second.token != first.token
+
+
+def test_stale_token_cannot_report(frontier):
+    frontier.push(SOURCE, ["https://a/1"])
+    (first,) = frontier.lease(SOURCE, "w1", limit=10, lease_seconds=300)
+    expire(frontier, first)
+    (second,) = frontier.lease(SOURCE, "w2", limit=10, lease_seconds=300)
+
+    # el worker lento ya no puede reportar ni fallar la URL
+    assert not frontier.complete(first, article(first.url))
+    assert not frontier.fail(first, "timeout")
+    assert frontier.complete(second, article(second.url))
+    assert not frontier.complete(second, article(second.url))
+    assert [a.url for a in frontier.results(SOURCE, 10)] == ["https://a/1"]
+
+
+def test_expired_lease_without_attempts_left_fails(frontier):
+    frontier.push(SOURCE, ["https://a/1"])
+    for _ in range(2):
+        (lease,) = frontier.lease(SOURCE, "w1", limit=10, lease_seconds=300)
+        expire(frontier, lease)
+    assert frontier.lease(SOURCE, "w2", limit=10, lease_seconds=300) == []
+    assert frontier.counts(SOURCE)["failed"] == 1
+
+
+def test_push_requeues_failed_urls(frontier):
+    frontier.push(SOURCE, ["https://a/1", "https://a/2"])
+    for _ in range(2):
+        for lease in frontier.lease(SOURCE, "w1", limit=10, lease_seconds=300):
+            if lease.url == "https://a/1":
+                frontier.fail(lease, "500")
+            else:
+                frontier.complete(lease, None)
+    assert frontier.counts(SOURCE)["failed"] == 1
+    # discover solo saltea lo que el frontier todavía tiene entre manos
+    assert "https://a/1" not in frontier
+    assert "https://a/2" in frontier
+
+    assert frontier.push(SOURCE, ["https://a/1", "https://a/2"]) == 1
+    (lease,) = frontier.lease(SOURCE, "w1", limit=10, lease_seconds=300)
+    assert lease.url == "https://a/1"
+    assert lease.attempts == 1
@@ -0,0 +1,81 @@
+import pytest
+
+from base import resilience
+from base.resilience import CircuitBreaker, RetryQueue, backoff_delay
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(resilience.time, "monotonic", c)
+    return c
+
+
+def test_breaker_trip_half_open_and_reset(clock):
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    assert not breaker.record_failure()
+    assert breaker.remaining_cooldown() == 0
+
+    # closed -> open
+    assert breaker.record_failure()
+    assert breaker.remaining_cooldown() == 60
+    # mientras está abierto las fallas no lo vuelven a abrir ni alargan la pausa
+    clock.now += 30
+    assert not breaker.record_failure()
+    assert breaker.remaining_cooldown() == 30
+
+    # half-open: pasa el cooldown y una falla lo vuelve a abrir
+    clock.now += 30
+    assert breaker.remaining_cooldown() == 0
+    assert breaker.record_failure()
+    assert breaker.remaining_cooldown() == 60
+
+    # half-open + éxito -> closed, con la cuenta de fallas en cero
+    clock.now += 60
+    breaker.record_success()
+    assert breaker.remaining_cooldown() == 0
+    assert not breaker.record_failure()
+    assert breaker.remaining_cooldown() == 0
+
+
+def test_retry_queue_persists_between_runs(tmp_path):
+    path = tmp_path / "retry_queue.json"
+    queue = RetryQueue(path, max_runs=2)
+    assert queue.push("https://a/1", "HTTP 503")
+    assert queue.push("https://a/2", "timeout")
+    queue.done("https://a/2")
+    queue.save()
+
+    reopened = RetryQueue(path, max_runs=2)
+    assert reopened.urls() == ["https://a/1"]
+    assert reopened.entries["https://a/1"]["attempts"] == 1
+    assert reopened.entries["https://a/1"]["last_error"] == "HTTP 503"
+
+
+def test_retry_queue_drops_url_after_max_runs(tmp_path):
+    path = tmp_path / "retry_queue.json"
+    for _ in range(2):
+        queue = RetryQueue(path, max_runs=2)
+        assert queue.push("https://a/1", "HTTP 429")
+        queue.save()
+
+    queue = RetryQueue(path, max_runs=2)
+    assert not queue.push("https://a/1", "HTTP 429")
+    queue.save()
+    assert len(RetryQueue(path)) == 0
+
+
+def test_backoff_delay_grows_exponentially_up_to_cap(monkeypatch):
+    # el máximo del jitter
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    assert [backoff_delay(a, base=0.5, cap=3.0) for a in range(5)] == [0.5, 1.0, 2.0, 3.0, 3.0]
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: low)
+    assert backoff_delay(4, base=0.5, cap=3.0) == 0
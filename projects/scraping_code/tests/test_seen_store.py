@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+from base.browser_pool import BrowserPool, ContextProfile
+from base.seen_store import SqliteSeenUrlStore
+from scraper_models.ign_reviews_scraper import IgnReviewsScraper
+
+URL = "https://www.ign.com/articles/zelda-review"
+
+
+def test_migrates_legacy_text_file_once(tmp_path):
+    txt = tmp_path / "ign_seen_urls.txt"
+    # el formato viejo: una URL por línea, a veces con BOM y líneas en blanco
+    txt.write_text("\ufeff" + URL + "\n\n" + URL + "-2\n" + URL + "\n", encoding="utf-8")
+    with SqliteSeenUrlStore(tmp_path / "seen.sqlite") as store:
+        assert store.migrate_text_file(txt) == 2
+        assert not txt.exists()
+        assert (tmp_path / "ign_seen_urls.txt.migrated").exists()
+        assert store.migrate_text_file(txt) == 0
+        assert URL in store and URL + "-2" in store
+        assert len(store) == 2
+
+
+@pytest.mark.parametrize("use_bloom", [True, False])
+def test_membership_survives_reopen(tmp_path, use_bloom):
+    db = tmp_path / "seen.sqlite"
+    with SqliteSeenUrlStore(db, use_bloom=use_bloom) as store:
+        store.add_many([URL, URL + "-2"])
+    with SqliteSeenUrlStore(db, use_bloom=use_bloom) as store:
+        assert URL in store and URL + "-2" in store
+        assert URL + "-3" not in store
+        assert len(store) == 2
+
+
+def test_reopen_rebuilds_a_stale_bloom_filter(tmp_path):
+    db = tmp_path / "seen.sqlite"
+    with SqliteSeenUrlStore(db) as store:
+        store.add_many([URL])
+    # otra corrida escribió sin filtro: el .bloom quedó atrás
+    with SqliteSeenUrlStore(db, use_bloom=False) as store:
+        store.add_many([URL + "-2"])
+    with SqliteSeenUrlStore(db) as store:
+        assert URL + "-2" in store
+
+
+def test_add_and_check_from_many_threads(tmp_path):
+    with SqliteSeenUrlStore(tmp_path / "seen.sqlite") as store:
+        errors = []
+
+        def worker(n):
+            try:
+                urls = [f"{URL}-{n}-{i}" for i in range(50)]
+                for url in urls:
+                    store.add_many([url])
+                    assert url in store
+            except Exception as ex:
+                errors.append(ex)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert errors == []
+        assert len(store) == 200
+
+
+def test_is_seen_from_a_browser_pool_thread(tmp_path):
+    # el listado (y el stop_when de IGN) corre en un hilo del pool, no en
+    # el que abrió el store
+    scraper = IgnReviewsScraper(output_dir=str(tmp_path / "raw"), meta_dir=str(tmp_path / "meta"))
+    pool = BrowserPool(size=1)
+    with scraper.open_seen_store() as seen_urls:
+        seen_urls.add(URL)
+        scraper.seen_urls = seen_urls
+        try:
+            # el trabajo no pide página: no arranca Chromium
+            fut = pool.submit(ContextProfile("test"), lambda borrow_page: scraper.is_seen(URL + "?utm_source=x"))
+            assert fut.result(timeout=10)
+            fut = pool.submit(ContextProfile("test"), lambda borrow_page: scraper.is_seen(URL + "-2"))
+            assert not fut.result(timeout=10)
+        finally:
+            pool.close()
@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+from base.fixture_server import FixtureServer
+from base.static_fetch import NotModified, StaticFetcher
+from scraper_models.kotaku_reviews_scraper import KotakuReviewsScraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "kotaku"
+
+
+@pytest.fixture(scope="module")
+def server():
+    with FixtureServer(FIXTURES) as s:
+        yield s
+
+
+@pytest.fixture
+def fetcher():
+    f = StaticFetcher(timeout=5)
+    yield f
+    f.close()
+
+
+@pytest.fixture
+def scraper(tmp_path, fetcher):
+    s = KotakuReviewsScraper(output_dir=str(tmp_path / "raw"), meta_dir=str(tmp_path / "meta"))
+    s.requests_per_second = None
+    s.static_fetcher = fetcher
+    return s
+
+
+class FakePage:
+    """Lo mínimo que usan goto y los extractores: el contenido lo pone el test."""
+
+    def __init__(self):
+        self.visited = []
+
+    def goto(self, url, wait_until, timeout):
+        self.visited.append(url)
+        return None
+
+
+def fake_borrow_page():
+    page = FakePage()
+
+    @contextmanager
+    def borrow_page():
+        yield page
+
+    return page, borrow_page
+
+
+def test_fetch_parses_html_with_validators(server, fetcher):
+    doc = fetcher.fetch(server.url_for("/reviews/"))
+    assert doc is not None
+    assert doc.nbytes == (FIXTURES / "reviews" / "index.html").stat().st_size
+    assert doc.last_modified is not None
+    # con el validador de la respuesta anterior el servidor contesta 304
+    with pytest.raises(NotModified):
+        fetcher.fetch(server.url_for("/reviews/"), last_modified=doc.last_modified)
+
+
+def test_fetch_returns_none_for_unusable_responses(server, fetcher):
+    assert fetcher.fetch(server.url_for("/no-such-review/")) is None
+    assert fetcher.fetch(server.url_for("/robots.txt")) is None
+
+
+def test_static_listing_extractor_filters_author_pages(server, scraper, fetcher):
+    doc = fetcher.fetch(server.url_for("/reviews/"))
+    assert scraper.extract_article_links_static(doc) == [
+        "https://kotaku.com/zelda-tears-of-the-kingdom-review",
+        "https://kotaku.com/js-only-review",
+    ]
+
+
+def test_static_article_extractor(server, scraper, fetcher):
+    url = server.url_for("/zelda-tears-of-the-kingdom-review/")
+    article = scraper.extract_article_data_static(fetcher.fetch(url), url)
+    assert article.title == "The Legend Of Zelda: Tears Of The Kingdom Review"
+    assert article.published_at == "2023-05-11T12:00:00-04:00"
+    # sin párrafos vacíos ni lo que está fuera de div.entry-content
+    assert article.text == (
+        "Hyrule is back, and this time the sky is part of the map.\n"
+        "The new building powers turn every puzzle into a sandbox."
+    )
+
+
+def test_static_listing_does_not_borrow_a_page(server, scraper):
+    page, borrow_page = fake_borrow_page()
+    links = scraper._fetch_listing_once(server.url_for("/reviews/"), borrow_page)
+    assert len(links) == 2
+    assert page.visited == []
+
+
+def test_listing_without_selectors_falls_back_to_browser(server, scraper, monkeypatch):
+    url = server.url_for("/reviews/page/2/")
+    assert scraper.fetch_listing_static(url) is None
+
+    page, borrow_page = fake_borrow_page()
+    monkeypatch.setattr(scraper, "extract_article_links", lambda p: ["https://kotaku.com/from-browser"])
+    assert scraper._fetch_listing_once(url, borrow_page) == ["https://kotaku.com/from-browser"]
+    assert page.visited == [url]
+
+
+def test_article_without_selectors_falls_back_to_browser(server, scraper, monkeypatch):
+    url = server.url_for("/js-only-review/")
+    assert scraper.fetch_article_static(url) is None
+
+    page, borrow_page = fake_borrow_page()
+    monkeypatch.setattr(scraper, "extract_article_data", lambda p, u: ("browser", u))
+    assert scraper._fetch_article_once(url, borrow_page) == ("browser", url)
+    assert page.visited == [url]